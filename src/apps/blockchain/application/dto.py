@@ -12,6 +12,23 @@ class FaucetTransactionDTO(BaseEntityDTO):
         return cls(tx_hash=entity.tx_hash.value)
 
 
+@dataclass(frozen=True)
+class FaucetRequestDTO(BaseEntityDTO):
+    """Fund request in the queue, tx_hash is known after the transaction is sent."""
+
+    id: str
+    status: str
+    tx_hash: str | None
+
+    @classmethod
+    def from_entity(cls, entity) -> "FaucetRequestDTO":
+        return cls(
+            id=entity.pk.value,
+            status=entity.status.value,
+            tx_hash=entity.tx_hash.value if entity.tx_hash else None,
+        )
+
+
 @dataclass(frozen=True)
 class FaucetStatsDTO(BaseDTO):
     total_pending: int
@@ -27,3 +27,12 @@ class UndefinedError(BaseResponseError):
         self.error = error
         self.message = f"Undefined error: {error}"
         super().__init__(self.message)
+
+
+class FaucetOutOfFundsError(BaseResponseError):
+    code = 503
+
+    def __init__(self, required_wei: int):
+        self.required_wei = required_wei
+        self.message = f"No faucet account has {required_wei} wei to pay"
+        super().__init__(self.message)
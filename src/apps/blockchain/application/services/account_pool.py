@@ -0,0 +1,87 @@
+import logging
+from threading import Lock
+from time import monotonic
+
+from eth_account.signers.local import LocalAccount
+from web3 import AsyncWeb3, Web3
+
+from apps.blockchain.application.exceptions import FaucetOutOfFundsError
+
+logger = logging.getLogger(__name__)
+
+
+class AccountPool:
+    """AccountPool spreads payouts over several faucet accounts, each with its own nonce sequence.
+
+    Accounts are taken in turn, an account which can't pay the required amount is skipped. So one stuck
+    transaction delays only the payouts of its account, and throughput grows with the number of accounts.
+
+    Balances are fetched from the node when they are older than balance_ttl_seconds, in between
+    every sent transaction is subtracted from the known balance with the max fee it may cost.
+
+    Attributes:
+        accounts (list[LocalAccount]): Faucet accounts.
+        balance_ttl_seconds (float): How long a fetched balance is trusted.
+    """
+
+    def __init__(self, accounts: list[LocalAccount], balance_ttl_seconds: float):
+        if not accounts:
+            raise ValueError("At least one faucet account is required")
+        self.accounts = accounts
+        self.balance_ttl_seconds = balance_ttl_seconds
+        # address -> (fetched at, balance in wei)
+        self._balances: dict[str, tuple[float, int]] = {}
+        # index of the account whose turn is next
+        self._next = 0
+        self._lock = Lock()
+
+    @property
+    def addresses(self) -> list[str]:
+        return [account.address for account in self.accounts]
+
+    def next_account(self, web3: Web3, required_wei: int) -> LocalAccount:
+        for account in self._in_turn():
+            balance = self._get_known_balance(account.address)
+            if balance is None:
+                balance = self._set_balance(account.address, web3.eth.get_balance(account.address))
+            if balance >= required_wei:
+                self._pass_turn(account)
+                return account
+            logger.warning(f"Faucet account {account.address} has only {balance} wei, skipping it")
+        raise FaucetOutOfFundsError(required_wei)
+
+    async def anext_account(self, web3: AsyncWeb3, required_wei: int) -> LocalAccount:
+        for account in self._in_turn():
+            balance = self._get_known_balance(account.address)
+            if balance is None:
+                balance = self._set_balance(account.address, await web3.eth.get_balance(account.address))
+            if balance >= required_wei:
+                self._pass_turn(account)
+                return account
+            logger.warning(f"Faucet account {account.address} has only {balance} wei, skipping it")
+        raise FaucetOutOfFundsError(required_wei)
+
+    def spend(self, address: str, wei: int) -> None:
+        with self._lock:
+            if address in self._balances:
+                fetched_at, balance = self._balances[address]
+                self._balances[address] = (fetched_at, balance - wei)
+
+    def _in_turn(self) -> list[LocalAccount]:
+        start = self._next
+        return self.accounts[start:] + self.accounts[:start]
+
+    def _pass_turn(self, account: LocalAccount) -> None:
+        with self._lock:
+            self._next = (self.accounts.index(account) + 1) % len(self.accounts)
+
+    def _get_known_balance(self, address: str) -> int | None:
+        item = self._balances.get(address)
+        if item is None or monotonic() - item[0] >= self.balance_ttl_seconds:
+            return None
+        return item[1]
+
+    def _set_balance(self, address: str, balance: int) -> int:
+        with self._lock:
+            self._balances[address] = (monotonic(), balance)
+        return balance
@@ -0,0 +1,103 @@
+from asgiref.sync import sync_to_async
+from eth_account.signers.local import LocalAccount
+from eth_account.types import TransactionDictType
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3
+
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.blockchain_service import SentTransaction
+from apps.blockchain.application.services.fee_oracle import FeeOracle
+from apps.blockchain.application.services.nonce_manager import NonceManager
+from apps.blockchain.application.services.transactions import PLAIN_TRANSFER_GAS, max_cost, sent_fees, transaction_dict
+from apps.blockchain.domain.value_objects import TokenAmount, WalletAddress
+from apps.shared.cache import TTLCache
+from apps.shared.tracing import set_attributes, span
+
+
+class AsyncBlockchainService:
+    """
+    Async version of BlockchainService.send_funds for the async request path.
+
+    Node calls don't block the event loop, so one process keeps many fund requests in flight.
+    Nonces are still allocated by NonceManager in the database, these calls run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        web3: AsyncWeb3,
+        chain_id: int,
+        account_pool: AccountPool,
+        nonce_manager: NonceManager,
+        fee_oracle: FeeOracle,
+        recipient_code_cache: TTLCache[WalletAddress, bool],
+    ):
+        self.web3 = web3
+        self.account_pool = account_pool
+        self.chain_id = chain_id
+        self.nonce_manager = nonce_manager
+        self.fee_oracle = fee_oracle
+        self.recipient_code_cache = recipient_code_cache
+
+    async def send_funds(self, to_address: WalletAddress, amount: TokenAmount) -> SentTransaction:
+        account, tx = await self._build_transaction(to_address.checksum_address, amount.to_wei())
+        tx["gas"] = await self._get_gas_limit(to_address, tx)
+        return await self._send_transaction(account, tx)
+
+    async def is_contract(self, address: WalletAddress) -> bool:
+        """Check if the address has code, result is cached."""
+        is_contract = self.recipient_code_cache.get(address)
+        if is_contract is None:
+            is_contract = len(await self.web3.eth.get_code(address.checksum_address)) > 0
+            self.recipient_code_cache.set(address, is_contract)
+        return is_contract
+
+    async def _build_transaction(self, to: ChecksumAddress, value: int) -> tuple[LocalAccount, TransactionDictType]:
+        with span("fees"):
+            fees = await self.fee_oracle.aget_fees(self.web3)
+        tx = transaction_dict(self.chain_id, to, value, fees)
+        with span("account"):
+            account = await self.account_pool.anext_account(self.web3, max_cost(tx))
+        tx["from"] = account.address
+        return account, tx
+
+    async def _get_gas_limit(self, to_address: WalletAddress, tx: TransactionDictType) -> int:
+        with span("gas_limit"):
+            is_contract = await self.is_contract(to_address)
+            set_attributes(contract=is_contract)
+            # value transfer to EOA always costs the same, only contracts may run some code on receive
+            if not is_contract:
+                return PLAIN_TRANSFER_GAS
+            return await self.web3.eth.estimate_gas(tx)  # type: ignore
+
+    async def _send_transaction(self, account: LocalAccount, tx: TransactionDictType) -> SentTransaction:
+        try:
+            tx_hash, nonce = await self._sign_and_send(account, tx)
+        except Exception as e:
+            if not self.nonce_manager.resync_if_behind(account.address, e):
+                raise
+            tx_hash, nonce = await self._sign_and_send(account, tx)
+
+        self.account_pool.spend(account.address, max_cost(tx))
+        return SentTransaction(tx_hash=tx_hash, sender=account.address, nonce=nonce, fees=sent_fees(tx))
+
+    async def _sign_and_send(self, account: LocalAccount, tx: TransactionDictType) -> tuple[str, int]:
+        # nonce is allocated as late as possible, every failure after this point leaves a gap to release
+        with span("nonce"):
+            nonce = await self._allocate_nonce(account)
+        try:
+            with span("sign_transaction"):
+                signed_tx = account.sign_transaction({**tx, "nonce": nonce})
+            with span("send_raw_transaction", sender=account.address, nonce=nonce):
+                tx_hash = await self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            await sync_to_async(self.nonce_manager.send_failed)(account.address, nonce, e)
+            raise
+
+        return tx_hash.hex(), nonce
+
+    async def _allocate_nonce(self, account: LocalAccount) -> int:
+        nonce = await sync_to_async(self.nonce_manager.allocate)(account.address)
+        if nonce is None:
+            chain_nonce = await self.web3.eth.get_transaction_count(account.address, "pending")
+            nonce = await sync_to_async(self.nonce_manager.allocate_synced)(account.address, chain_nonce)
+        return nonce
@@ -1,56 +1,306 @@
 import logging
+from dataclasses import dataclass
+from itertools import batched
+from typing import Any, Iterable
 
 from eth_account.signers.local import LocalAccount
 from eth_account.types import TransactionDictType
+from eth_typing import ChecksumAddress
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
+from web3.types import RPCEndpoint
 
-from apps.blockchain.domain.value_objects import TokenAmount, TransactionHash, TransactionStatus, WalletAddress
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.fee_oracle import FeeOracle
+from apps.blockchain.application.services.nonce_manager import NonceManager
+from apps.blockchain.application.services.transactions import PLAIN_TRANSFER_GAS, max_cost, sent_fees, transaction_dict
+from apps.blockchain.domain.value_objects import GasFees, TokenAmount, TransactionHash, TransactionStatus, WalletAddress
+from apps.shared.cache import TTLCache
+from apps.shared.tracing import set_attributes, span
 
 logger = logging.getLogger(__name__)
 
+# Disperse (https://disperse.app) compatible contract, pays many recipients in one transaction
+DISPERSE_ABI = [
+    {
+        "name": "disperseEther",
+        "type": "function",
+        "stateMutability": "payable",
+        "inputs": [
+            {"name": "recipients", "type": "address[]"},
+            {"name": "values", "type": "uint256[]"},
+        ],
+        "outputs": [],
+    },
+]
+
+# a replacement pays this much more per gas than the transaction it replaces, geth requires 10%
+REPLACEMENT_FEE_BUMP_PERCENT = 12
+
+
+@dataclass(frozen=True)
+class SentTransaction:
+    tx_hash: str
+    # faucet account which signed the transaction
+    sender: str
+    nonce: int | None = None
+    fees: GasFees | None = None
+
+
+@dataclass(frozen=True)
+class SignedReplacement:
+    """Replacement of a stuck transaction which is signed but not sent, the hash is known from the signature."""
+
+    tx_hash: str
+    sender: str
+    nonce: int
+    fees: GasFees
+    raw_transaction: bytes
+    max_cost: int
+
 
 class BlockchainService:
-    def __init__(self, provider_url: str, chain_id: int, account: LocalAccount):
-        self.web3 = Web3(Web3.HTTPProvider(provider_url))
-        self.account = account
+    def __init__(
+        self,
+        web3: Web3,
+        chain_id: int,
+        account_pool: AccountPool,
+        nonce_manager: NonceManager,
+        fee_oracle: FeeOracle,
+        recipient_code_cache: TTLCache[WalletAddress, bool],
+        rpc_batch_size: int = 100,
+        disperse_contract_address: str | None = None,
+    ):
+        # web3 client is shared by the process, the service is cheap to create per request
+        self.web3 = web3
+        self.account_pool = account_pool
         self.chain_id = chain_id
+        self.nonce_manager = nonce_manager
+        self.fee_oracle = fee_oracle
+        self.recipient_code_cache = recipient_code_cache
+        self.rpc_batch_size = rpc_batch_size
+        self.disperse_contract = None
+        if disperse_contract_address:
+            self.disperse_contract = self.web3.eth.contract(
+                address=WalletAddress(disperse_contract_address).checksum_address,
+                abi=DISPERSE_ABI,
+            )
+
+    @property
+    def supports_batches(self) -> bool:
+        return self.disperse_contract is not None
+
+    def send_funds(self, to_address: WalletAddress, amount: TokenAmount) -> SentTransaction:
+        account, tx = self._build_transaction(to_address.checksum_address, amount.to_wei())
+        tx["gas"] = self._get_gas_limit(to_address, tx)
+        return self._send_transaction(account, tx)
+
+    def send_batch(self, payouts: list[tuple[WalletAddress, TokenAmount]]) -> SentTransaction:
+        """
+        Pay many recipients with one call of the disperse contract, returns the shared transaction.
+
+        Disperse forwards value with transfer(), so recipients should be EOAs,
+        a contract recipient with expensive receive reverts the whole batch.
+        """
+        if self.disperse_contract is None:
+            raise ValueError("Disperse contract is not configured")
+
+        recipients = [wallet.checksum_address for wallet, _ in payouts]
+        values = [amount.to_wei() for _, amount in payouts]
+
+        account, tx = self._build_transaction(self.disperse_contract.address, sum(values))
+        tx["data"] = self.disperse_contract.encode_abi("disperseEther", args=[recipients, values])
+        tx["gas"] = self.web3.eth.estimate_gas(tx)  # type: ignore
+        return self._send_transaction(account, tx)
+
+    def sign_replacement(
+        self, payouts: list[tuple[WalletAddress, TokenAmount]], sender: WalletAddress, nonce: int, fees: GasFees
+    ) -> SignedReplacement:
+        """
+        Sign the payouts of a stuck transaction again with its nonce and higher fees (replace-by-fee).
+
+        Only one transaction with the nonce can be mined, the node drops the stuck one from its mempool.
+        Several payouts are sent as a batch, like they were sent by send_batch.
+        The replacement is sent by send_replacement, after its hash is saved.
+        """
+        account = next(
+            (account for account in self.account_pool.accounts if account.address == sender.checksum_address), None
+        )
+        if account is None:
+            raise ValueError(f"Faucet account {sender.value} is not configured")
+
+        new_fees = fees.replacement(self.fee_oracle.get_fees(self.web3), REPLACEMENT_FEE_BUMP_PERCENT)
+        if len(payouts) == 1:
+            [(wallet, amount)] = payouts
+            tx = transaction_dict(self.chain_id, wallet.checksum_address, amount.to_wei(), new_fees)
+            tx["from"] = account.address
+            tx["gas"] = self._get_gas_limit(wallet, tx)
+        else:
+            if self.disperse_contract is None:
+                raise ValueError("Disperse contract is not configured")
+            recipients = [wallet.checksum_address for wallet, _ in payouts]
+            values = [amount.to_wei() for _, amount in payouts]
+            tx = transaction_dict(self.chain_id, self.disperse_contract.address, sum(values), new_fees)
+            tx["from"] = account.address
+            tx["data"] = self.disperse_contract.encode_abi("disperseEther", args=[recipients, values])
+            tx["gas"] = self.web3.eth.estimate_gas(tx)  # type: ignore
+
+        signed_tx = account.sign_transaction({**tx, "nonce": nonce})
+        return SignedReplacement(
+            tx_hash=signed_tx.hash.hex(),
+            sender=account.address,
+            nonce=nonce,
+            fees=new_fees,
+            raw_transaction=signed_tx.raw_transaction,
+            max_cost=max_cost(tx),
+        )
+
+    def send_replacement(self, replacement: SignedReplacement) -> None:
+        """
+        Raises a "nonce too low" error if the stuck transaction (or an earlier replacement) is mined meanwhile.
+        """
+        self.web3.eth.send_raw_transaction(replacement.raw_transaction)
+        self.account_pool.spend(replacement.sender, replacement.max_cost)
+
+    def _build_transaction(self, to: ChecksumAddress, value: int) -> tuple[LocalAccount, TransactionDictType]:
+        with span("fees"):
+            fees = self.fee_oracle.get_fees(self.web3)
+        tx = transaction_dict(self.chain_id, to, value, fees)
+        # the sender is needed to estimate gas, so it's chosen by the cost of a plain transfer
+        with span("account"):
+            account = self.account_pool.next_account(self.web3, max_cost(tx))
+        tx["from"] = account.address
+        return account, tx
 
-    def send_funds(self, to_address: WalletAddress, amount: TokenAmount) -> str:
-        nonce = self.web3.eth.get_transaction_count(self.account.address)
+    def _send_transaction(self, account: LocalAccount, tx: TransactionDictType) -> SentTransaction:
+        try:
+            tx_hash, nonce = self._sign_and_send(account, tx)
+        except Exception as e:
+            if not self.nonce_manager.resync_if_behind(account.address, e):
+                raise
+            tx_hash, nonce = self._sign_and_send(account, tx)
+
+        self.account_pool.spend(account.address, max_cost(tx))
+        return SentTransaction(tx_hash=tx_hash, sender=account.address, nonce=nonce, fees=sent_fees(tx))
+
+    def _sign_and_send(self, account: LocalAccount, tx: TransactionDictType) -> tuple[str, int]:
+        # nonce is allocated as late as possible, every failure after this point leaves a gap to release
+        with span("nonce"):
+            nonce = self._allocate_nonce(account)
+        try:
+            with span("sign_transaction"):
+                signed_tx = account.sign_transaction({**tx, "nonce": nonce})
+            with span("send_raw_transaction", sender=account.address, nonce=nonce):
+                tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            self.nonce_manager.send_failed(account.address, nonce, e)
+            raise
+
+        return tx_hash.hex(), nonce
 
-        tx: TransactionDictType = {
-            "nonce": nonce,
-            "to": to_address.checksum_address,
-            "value": amount.to_wei(),
-            "gasPrice": self.web3.eth.gas_price,
-            "chainId": self.chain_id,
-            "from": self.account.address,
-        }
+    def is_contract(self, address: WalletAddress) -> bool:
+        """Check if the address has code, result is cached."""
+        is_contract = self.recipient_code_cache.get(address)
+        if is_contract is None:
+            is_contract = len(self.web3.eth.get_code(address.checksum_address)) > 0
+            self.recipient_code_cache.set(address, is_contract)
+        return is_contract
 
-        gas_estimate = self.web3.eth.estimate_gas(tx)  # type: ignore
-        tx["gas"] = gas_estimate
+    def _get_gas_limit(self, to_address: WalletAddress, tx: TransactionDictType) -> int:
+        with span("gas_limit"):
+            is_contract = self.is_contract(to_address)
+            set_attributes(contract=is_contract)
+            # value transfer to EOA always costs the same, only contracts may run some code on receive
+            if not is_contract:
+                return PLAIN_TRANSFER_GAS
+            return self.web3.eth.estimate_gas(tx)  # type: ignore
 
-        signed_tx = self.account.sign_transaction(tx)
-        tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        return tx_hash.hex()
+    def _allocate_nonce(self, account: LocalAccount) -> int:
+        # every faucet account has its own nonce sequence
+        nonce = self.nonce_manager.allocate(account.address)
+        if nonce is None:
+            chain_nonce = self.web3.eth.get_transaction_count(account.address, "pending")
+            nonce = self.nonce_manager.allocate_synced(account.address, chain_nonce)
+        return nonce
 
     def get_transaction_status(self, tx_hash: TransactionHash) -> TransactionStatus:
         """
-        Check transaction status by hash.
+        Check transaction status by hash, PENDING while there is no receipt.
+
+        RPC errors are raised, an unknown status is not PENDING, the caller retries it later.
         """
         try:
-            # Get transaction
             tx_receipt = self.web3.eth.get_transaction_receipt(tx_hash.bytes)
+        except TransactionNotFound:
+            return TransactionStatus.PENDING
+        return self._receipt_to_status(tx_receipt)
+
+    def get_transaction_statuses(
+        self, tx_hashes: Iterable[TransactionHash]
+    ) -> dict[TransactionHash, TransactionStatus]:
+        """
+        Check statuses of many transactions with JSON-RPC batch requests, rpc_batch_size receipts per request.
 
-            if tx_receipt is None:
-                return TransactionStatus.PENDING
+        Transactions without receipt are PENDING. Transactions which couldn't be checked
+        because of an RPC error are not included in the result.
+        """
+        statuses: dict[TransactionHash, TransactionStatus] = {}
 
-            # Check transaction status
-            # status 1 = success, status 0 = failure
-            if tx_receipt.get("status") == 1:
-                return TransactionStatus.SUCCESS
-            return TransactionStatus.FAILED
-        except Exception as e:
-            logger.error(f"Error checking transaction status for {tx_hash.value}: {str(e)}")
-            # TODO: maybe better not to return PENDING here? OR some other status like UNKNOWN?
+        for chunk in batched(tx_hashes, self.rpc_batch_size):
+            # raw batch request, web3 formatters would fail the whole batch on the first missing receipt
+            requests = [(RPCEndpoint("eth_getTransactionReceipt"), [tx_hash.value]) for tx_hash in chunk]
+            try:
+                responses = self.web3.provider.make_batch_request(requests)
+                if not isinstance(responses, list):
+                    # node doesn't support batches or rejected the whole batch
+                    raise ValueError(f"Invalid batch response: {responses}")
+            except Exception as e:
+                logger.error(f"Error checking statuses of {len(chunk)} transactions: {str(e)}")
+                continue
+
+            for tx_hash, response in zip(chunk, responses):
+                if response.get("error"):
+                    logger.error(f"Error checking transaction status for {tx_hash.value}: {response['error']}")
+                    continue
+                statuses[tx_hash] = self._receipt_to_status(response.get("result"))
+
+        return statuses
+
+    def get_block_number(self) -> int:
+        return self.web3.eth.block_number
+
+    def get_blocks_transaction_hashes(self, block_numbers: Iterable[int]) -> dict[int, set[TransactionHash]]:
+        """
+        Get hashes of transactions included in the given blocks, with JSON-RPC batch requests.
+
+        Raises an error if any block can't be fetched, so the caller can retry from that block.
+        """
+        blocks: dict[int, set[TransactionHash]] = {}
+
+        for chunk in batched(block_numbers, self.rpc_batch_size):
+            requests = [(RPCEndpoint("eth_getBlockByNumber"), [hex(number), False]) for number in chunk]
+            responses = self.web3.provider.make_batch_request(requests)
+            if not isinstance(responses, list):
+                raise ValueError(f"Invalid batch response: {responses}")
+
+            for number, response in zip(chunk, responses):
+                block = response.get("result")
+                if response.get("error") or block is None:
+                    raise ValueError(f"Can't get block {number}: {response.get('error')}")
+                blocks[number] = {TransactionHash(tx_hash) for tx_hash in block["transactions"]}
+
+        return blocks
+
+    @staticmethod
+    def _receipt_to_status(tx_receipt: Any) -> TransactionStatus:
+        if tx_receipt is None:
             return TransactionStatus.PENDING
+
+        # status 1 = success, status 0 = failure
+        status = tx_receipt.get("status")
+        if isinstance(status, str):
+            # raw JSON-RPC responses are not formatted, so status is a hex string
+            status = int(status, 16)
+        if status == 1:
+            return TransactionStatus.SUCCESS
+        return TransactionStatus.FAILED
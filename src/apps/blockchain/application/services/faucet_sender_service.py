@@ -0,0 +1,149 @@
+import logging
+from time import sleep
+
+from apps.blockchain.application.services.blockchain_service import BlockchainService, SentTransaction
+from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.repository import IFaucetTransactionsRepository
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus, WalletAddress
+from apps.shared.value_objects.datetime import DomainDateTime
+
+logger = logging.getLogger(__name__)
+
+
+class FaucetSenderService:
+    """FaucetSenderService sends queued fund requests in the order they were accepted.
+
+    Requests are sent one by one by a single worker, so nonces follow the order of requests and
+    web workers never wait for the node. A request which can't be sent is marked as failed with the error.
+
+    Requests are claimed (moved to sending) before they are paid, so a request is paid at most once,
+    even with a second sender or when saving the sent transaction fails. Such a request stays in sending,
+    its hash is in the log.
+
+    If the blockchain service supports batches (disperse contract is configured), requests collected
+    during loop_timeout_seconds are paid with one transaction, up to batch_size recipients per batch.
+    All requests of a batch are linked to the same transaction hash. Contracts are still paid one by one,
+    disperse forwards only 2300 gas with the value, which is not enough for many receive functions.
+
+    Attributes:
+        blockchain_service (BlockchainService): Service to interact with the blockchain.
+        faucet_transactions_repository (IFaucetTransactionsRepository): Repository to manage faucet transactions.
+        loop_timeout_seconds (float): Pause between checks when the queue is empty.
+        batch_size (int): Max number of queued requests taken from the repository at once, also max batch size.
+    """
+
+    def __init__(
+        self,
+        blockchain_service: BlockchainService,
+        faucet_transactions_repository: IFaucetTransactionsRepository,
+        loop_timeout_seconds: float,
+        batch_size: int = 50,
+    ):
+        self.blockchain_service = blockchain_service
+        self.faucet_transactions_repository = faucet_transactions_repository
+        self.loop_timeout_seconds = loop_timeout_seconds
+        self.batch_size = batch_size
+        self._is_running = True
+
+    def run(self):
+        while self._is_running:
+            logger.debug("Sending queued transactions...")
+            try:
+                sent = self.send_queued()
+            except Exception:
+                logger.exception("Error sending queued transactions")
+                sent = 0
+
+            # don't wait while there is something left in the queue
+            if sent < self.batch_size:
+                sleep(self.loop_timeout_seconds)
+
+        logger.debug("FaucetSenderService stopped")
+
+    def stop(self):
+        self._is_running = False
+
+    def send_queued(self) -> int:
+        transactions = self.faucet_transactions_repository.claim_queued_transactions(self.batch_size)
+
+        batch, singles = self._split_batch(transactions)
+        if batch:
+            self._send_batch(batch)
+        for transaction in singles:
+            self._send_single(transaction)
+
+        return len(transactions)
+
+    def _split_batch(
+        self, transactions: list[FaucetTransaction]
+    ) -> tuple[list[FaucetTransaction], list[FaucetTransaction]]:
+        """
+        EOA recipients go to the batch, the rest are paid one by one.
+
+        A recipient which can't be checked is paid alone, send_funds checks it again and marks it failed
+        if the node is still down, so no claimed request is left in sending.
+        """
+        if not self.blockchain_service.supports_batches:
+            return [], transactions
+
+        batch_ids = set()
+        for transaction in transactions:
+            try:
+                if not self.blockchain_service.is_contract(transaction.wallet):
+                    batch_ids.add(transaction.pk)
+            except Exception:
+                logger.exception(f"Error checking code of {transaction.wallet.value}")
+
+        if len(batch_ids) < 2:
+            return [], transactions
+        return (
+            [tx for tx in transactions if tx.pk in batch_ids],
+            [tx for tx in transactions if tx.pk not in batch_ids],
+        )
+
+    def _send_single(self, transaction: FaucetTransaction) -> None:
+        try:
+            sent = self.blockchain_service.send_funds(transaction.wallet, transaction.amount)
+        except Exception as e:
+            logger.exception(f"Error sending funds to {transaction.wallet.value}")
+            self._mark_failed([transaction], e)
+        else:
+            self._mark_sent([transaction], sent)
+
+    def _send_batch(self, transactions: list[FaucetTransaction]) -> None:
+        try:
+            sent = self.blockchain_service.send_batch([(tx.wallet, tx.amount) for tx in transactions])
+        except Exception as e:
+            logger.exception(f"Error sending funds to {len(transactions)} recipients")
+            self._mark_failed(transactions, e)
+        else:
+            self._mark_sent(transactions, sent)
+
+    def _mark_sent(self, transactions: list[FaucetTransaction], sent: SentTransaction) -> None:
+        for transaction in transactions:
+            transaction.tx_hash = TransactionHash(sent.tx_hash)
+            transaction.sender = WalletAddress(sent.sender)
+            transaction.status = TransactionStatus.PENDING
+            transaction.nonce = sent.nonce
+            transaction.fees = sent.fees
+            transaction.broadcast_at = DomainDateTime.now()
+            try:
+                self.faucet_transactions_repository.update(transaction)
+            except Exception:
+                # the request is paid, it stays in sending and is never sent again
+                logger.exception(
+                    f"Queued request {transaction.pk} sent from {sent.sender} (nonce {sent.nonce}): {sent.tx_hash}, "
+                    "but not saved"
+                )
+            else:
+                logger.info(f"Queued request {transaction.pk} sent from {sent.sender}: {sent.tx_hash}")
+
+    def _mark_failed(self, transactions: list[FaucetTransaction], error: Exception) -> None:
+        for transaction in transactions:
+            transaction.status = TransactionStatus.FAILED
+            transaction.error = str(error)
+            try:
+                self.faucet_transactions_repository.update(transaction)
+            except Exception:
+                # the other requests are still marked, this one stays in sending and isn't paid
+                logger.exception(f"Queued request {transaction.pk} failed ({error}), but not saved")
@@ -1,11 +1,16 @@
 import logging
+from contextlib import asynccontextmanager, contextmanager
 from datetime import timedelta
+from time import perf_counter
+from typing import AsyncIterator, Iterator, NoReturn
+from uuid import uuid4
 
-from apps.blockchain.application.dto import FaucetStatsDTO, FaucetTransactionDTO
+from apps.blockchain.application.dto import FaucetRequestDTO, FaucetStatsDTO, FaucetTransactionDTO
 from apps.blockchain.application.exceptions import TooManyTransactionsFromIpError, TooManyTransactionsFromWalletError
+from apps.blockchain.application.services.async_blockchain_service import AsyncBlockchainService
 from apps.blockchain.application.services.blockchain_service import BlockchainService
 from apps.blockchain.domain.entities import FaucetTransaction
-from apps.blockchain.domain.repository import IFaucetTransactionsRepository
+from apps.blockchain.domain.repository import ICooldownRepository, IFaucetTransactionsRepository
 from apps.blockchain.domain.value_objects import (
     IPAddress,
     TokenAmount,
@@ -13,12 +18,18 @@ from apps.blockchain.domain.value_objects import (
     TransactionStatus,
     WalletAddress,
 )
+from apps.shared.cache import TTLCache
+from apps.shared.metrics import Metrics, NullMetrics
+from apps.shared.shared_memory_cache import SharedExpiryCache
+from apps.shared.tracing import span
 from apps.shared.value_objects.datetime import DomainDateTime
 from apps.shared.value_objects.id import Id
-from base.exceptions import BaseValidationError
+from base.exceptions import BaseNotFoundError, BaseResponseError, BaseValidationError
 
 logger = logging.getLogger(__name__)
 
+STATS_CACHE_KEY = "last_24_hours"
+
 
 class FaucetService:
     """FaucetService is responsible for managing faucet transactions and funding wallets with a specified amount of Ether.
@@ -28,6 +39,14 @@ class FaucetService:
         faucet_transactions_repository (IFaucetTransactionsRepository): Repository to manage faucet transactions.
         threshold_timeout_minutes (int): Timeout threshold in minutes to prevent too many transactions from the same IP or wallet.
         amount_eth (str): Amount of Ether to fund the wallet.
+        cooldown_cache (SharedExpiryCache | None): Active cooldowns shared by all workers of the host,
+            checked before the repository. A missing key falls back to the repository.
+        stats_cache (TTLCache[str, FaucetStatsDTO] | None): Keeps stats for a few seconds, they are requested often.
+        async_blockchain_service (AsyncBlockchainService | None): Used by the async methods (afund_wallet).
+        metrics (Metrics | None): Receives fund_wallet time by outcome and cooldown rejections by reason.
+        cooldown_repository (ICooldownRepository | None): Reserves the IP and wallet of a request before the
+            cooldown check, until its transaction is saved, so parallel requests can't all pass the check.
+        reservation_seconds (float): A reservation of a worker which crashed is taken over after this time.
 
     Methods:
         fund_wallet(ip_address: str, wallet_address: str) -> FaucetTransactionDTO:
@@ -40,6 +59,12 @@ class FaucetService:
                 TooManyTransactionsFromIpError: If there are too many transactions from the same IP address.
                 TooManyTransactionsFromWalletError: If there are too many transactions from the same wallet address.
                 UndefinedError: If an undefined error occurs during the transaction process.
+        enqueue_funding(ip_address: str, wallet_address: str) -> FaucetRequestDTO:
+            Same checks as fund_wallet, but the request is only saved as queued and sent later.
+            Returns:
+                FaucetRequestDTO: Data transfer object with the request id to check its state.
+        afund_wallet, aenqueue_funding, aget_stats:
+            Async versions for async views, they use async repository methods and AsyncBlockchainService.
     """
 
     def __init__(
@@ -48,59 +73,379 @@ class FaucetService:
         faucet_transactions_repository: IFaucetTransactionsRepository,
         threshold_timeout_minutes: int,
         amount_eth: str,
+        cooldown_cache: SharedExpiryCache | None = None,
+        stats_cache: TTLCache[str, FaucetStatsDTO] | None = None,
+        async_blockchain_service: AsyncBlockchainService | None = None,
+        metrics: Metrics | None = None,
+        cooldown_repository: ICooldownRepository | None = None,
+        reservation_seconds: float = 120,
     ):
         self.blockchain_service = blockchain_service
         self.faucet_transactions_repository = faucet_transactions_repository
         self.threshold_timeout_minutes = threshold_timeout_minutes
         self.amount_eth = amount_eth
+        self.cooldown_cache = cooldown_cache
+        self.stats_cache = stats_cache
+        self.async_blockchain_service = async_blockchain_service
+        self.metrics = metrics or NullMetrics()
+        self.cooldown_repository = cooldown_repository
+        self.reservation_seconds = reservation_seconds
 
     def fund_wallet(self, wallet_address: str, ip_address: str) -> FaucetTransactionDTO:
         """
         Creates a new faucet transaction and funds the wallet with the given amount.
         """
-        tx_hash = None
+        started_at = perf_counter()
+        try:
+            ip = IPAddress(ip_address)
+            wallet = WalletAddress(wallet_address)
+            with self._cooldown(ip, wallet):
+                # Send funds to the wallet
+                token_amount = TokenAmount.from_ether(self.amount_eth)
+                with span("send_funds"):
+                    sent = self.blockchain_service.send_funds(wallet, token_amount)
+
+                # Create a new faucet transaction
+                faucet_transaction = FaucetTransaction(
+                    id=Id(),
+                    tx_hash=TransactionHash(sent.tx_hash),
+                    sender=WalletAddress(sent.sender),
+                    ip_address=ip,
+                    wallet=wallet,
+                    amount=token_amount,
+                    status=TransactionStatus.PENDING,
+                    nonce=sent.nonce,
+                    fees=sent.fees,
+                    broadcast_at=DomainDateTime.now(),
+                )
+                tx = self.faucet_transactions_repository.create(faucet_transaction)
+                self._start_cooldown(ip, wallet)
+        except BaseResponseError as e:
+            # cooldowns and an empty faucet are answered with their own status code
+            self._observe_funding(started_at, e)
+            raise
+        except Exception as e:
+            self._observe_funding(started_at, e)
+            logger.exception("Error funding wallet")
+            raise BaseValidationError(message="Error funding wallet: %s" % str(e)) from e
+        else:
+            self._observe_funding(started_at)
+            return FaucetTransactionDTO.from_entity(tx)
 
+    def enqueue_funding(self, wallet_address: str, ip_address: str) -> FaucetRequestDTO:
+        """
+        Validates the request and puts it into the queue, the transaction is sent later by FaucetSenderService.
+        """
         try:
-            # Check if there are too many transactions from the same IP address or wallet address
             ip = IPAddress(ip_address)
-            last_ip_tx = self.faucet_transactions_repository.get_last_by_ip(ip.value)
-            if last_ip_tx:
-                minimum_next_tx_time = last_ip_tx.created_at + timedelta(minutes=self.threshold_timeout_minutes)
-                if DomainDateTime.now() < minimum_next_tx_time:
-                    raise TooManyTransactionsFromIpError(ip)
+            wallet = WalletAddress(wallet_address)
+            with self._cooldown(ip, wallet):
+                faucet_transaction = FaucetTransaction(
+                    id=Id(),
+                    tx_hash=None,
+                    ip_address=ip,
+                    wallet=wallet,
+                    amount=TokenAmount.from_ether(self.amount_eth),
+                    status=TransactionStatus.QUEUED,
+                )
+                tx = self.faucet_transactions_repository.create(faucet_transaction)
+                self._start_cooldown(ip, wallet)
+        except BaseResponseError:
+            raise
+        except Exception as e:
+            logger.exception("Error queueing funding request")
+            raise BaseValidationError(message="Error funding wallet: %s" % str(e)) from e
+        else:
+            return FaucetRequestDTO.from_entity(tx)
+
+    async def afund_wallet(self, wallet_address: str, ip_address: str) -> FaucetTransactionDTO:
+        """
+        Async version of fund_wallet, the node and the database are not waited in a blocked thread.
+        """
+        if self.async_blockchain_service is None:
+            raise RuntimeError("Async blockchain service is not configured")
 
-            # Check if there are too many transactions from the same wallet address
+        started_at = perf_counter()
+        try:
+            ip = IPAddress(ip_address)
             wallet = WalletAddress(wallet_address)
-            last_wallet_tx = self.faucet_transactions_repository.get_last_by_wallet(wallet.value)
-            if last_wallet_tx:
-                minimum_next_tx_time = last_wallet_tx.created_at + timedelta(minutes=self.threshold_timeout_minutes)
-                if DomainDateTime.now() < minimum_next_tx_time:
-                    raise TooManyTransactionsFromWalletError(wallet)
-
-            # Send funds to the wallet
-            token_amount = TokenAmount.from_ether(self.amount_eth)
-            tx_hash = self.blockchain_service.send_funds(wallet, token_amount)
-
-            # Create a new faucet transaction
-            faucet_transaction = FaucetTransaction(
-                id=Id(),
-                tx_hash=TransactionHash(tx_hash),
-                ip_address=ip,
-                wallet=wallet,
-                amount=token_amount,
-                status=TransactionStatus.PENDING,
-            )
-            tx = self.faucet_transactions_repository.create(faucet_transaction)
+            async with self._acooldown(ip, wallet):
+                token_amount = TokenAmount.from_ether(self.amount_eth)
+                with span("send_funds"):
+                    sent = await self.async_blockchain_service.send_funds(wallet, token_amount)
+
+                faucet_transaction = FaucetTransaction(
+                    id=Id(),
+                    tx_hash=TransactionHash(sent.tx_hash),
+                    sender=WalletAddress(sent.sender),
+                    ip_address=ip,
+                    wallet=wallet,
+                    amount=token_amount,
+                    status=TransactionStatus.PENDING,
+                    nonce=sent.nonce,
+                    fees=sent.fees,
+                    broadcast_at=DomainDateTime.now(),
+                )
+                tx = await self.faucet_transactions_repository.acreate(faucet_transaction)
+                self._start_cooldown(ip, wallet)
+        except BaseResponseError as e:
+            # cooldowns and an empty faucet are answered with their own status code
+            self._observe_funding(started_at, e)
+            raise
         except Exception as e:
+            self._observe_funding(started_at, e)
             logger.exception("Error funding wallet")
             raise BaseValidationError(message="Error funding wallet: %s" % str(e)) from e
         else:
+            self._observe_funding(started_at)
             return FaucetTransactionDTO.from_entity(tx)
 
+    async def aenqueue_funding(self, wallet_address: str, ip_address: str) -> FaucetRequestDTO:
+        """
+        Async version of enqueue_funding.
+        """
+        try:
+            ip = IPAddress(ip_address)
+            wallet = WalletAddress(wallet_address)
+            async with self._acooldown(ip, wallet):
+                faucet_transaction = FaucetTransaction(
+                    id=Id(),
+                    tx_hash=None,
+                    ip_address=ip,
+                    wallet=wallet,
+                    amount=TokenAmount.from_ether(self.amount_eth),
+                    status=TransactionStatus.QUEUED,
+                )
+                tx = await self.faucet_transactions_repository.acreate(faucet_transaction)
+                self._start_cooldown(ip, wallet)
+        except BaseResponseError:
+            raise
+        except Exception as e:
+            logger.exception("Error queueing funding request")
+            raise BaseValidationError(message="Error funding wallet: %s" % str(e)) from e
+        else:
+            return FaucetRequestDTO.from_entity(tx)
+
+    def get_request(self, request_id: str) -> FaucetRequestDTO:
+        """
+        Fetches the current state of a fund request.
+        """
+        tx = self.faucet_transactions_repository.get_by_id(Id(request_id))
+        if tx is None:
+            raise BaseNotFoundError(f"Fund request {request_id} not found")
+        return FaucetRequestDTO.from_entity(tx)
+
+    @contextmanager
+    def _cooldown(self, ip: IPAddress, wallet: WalletAddress) -> Iterator[None]:
+        """
+        Checks the cooldowns, the IP and the wallet stay reserved until the block exits.
+
+        The block saves the transaction, after that the transaction itself holds the cooldown,
+        so the reservation is released whether the payout was made or not.
+        """
+        with span("cooldown"):
+            token = self._check_cooldown(ip, wallet)
+        try:
+            yield
+        finally:
+            if token is not None:
+                self._release_cooldown(self._cooldown_slots(ip, wallet), token)
+
+    @asynccontextmanager
+    async def _acooldown(self, ip: IPAddress, wallet: WalletAddress) -> AsyncIterator[None]:
+        with span("cooldown"):
+            token = await self._acheck_cooldown(ip, wallet)
+        try:
+            yield
+        finally:
+            if token is not None:
+                await self._arelease_cooldown(self._cooldown_slots(ip, wallet), token)
+
+    def _check_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> str | None:
+        self._check_cached_cooldown(ip, wallet)
+        # the slots are reserved before the transactions are read, a parallel request either
+        # can't reserve them or comes after the release and sees the saved transaction
+        token = self._reserve_cooldown(ip, wallet)
+        try:
+            state = self.faucet_transactions_repository.get_cooldown_state(
+                ip.value, wallet.value, self._cooldown_since()
+            )
+            self._check_last_ip_tx(ip, state.last_ip_tx_at)
+            self._check_last_wallet_tx(wallet, state.last_wallet_tx_at)
+        except Exception:
+            if token is not None:
+                self._release_cooldown(self._cooldown_slots(ip, wallet), token)
+            raise
+        return token
+
+    async def _acheck_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> str | None:
+        self._check_cached_cooldown(ip, wallet)
+        token = await self._areserve_cooldown(ip, wallet)
+        try:
+            state = await self.faucet_transactions_repository.aget_cooldown_state(
+                ip.value, wallet.value, self._cooldown_since()
+            )
+            self._check_last_ip_tx(ip, state.last_ip_tx_at)
+            self._check_last_wallet_tx(wallet, state.last_wallet_tx_at)
+        except Exception:
+            if token is not None:
+                await self._arelease_cooldown(self._cooldown_slots(ip, wallet), token)
+            raise
+        return token
+
+    def _reserve_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> str | None:
+        if self.cooldown_repository is None:
+            return None
+        token = uuid4().hex
+        claimed = self.cooldown_repository.reserve(self._cooldown_slots(ip, wallet), token, self._reservation_until())
+        if len(claimed) < 2:
+            self._release_cooldown(list(claimed), token)
+            self._reject_reserved(ip, wallet, claimed)
+        return token
+
+    async def _areserve_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> str | None:
+        if self.cooldown_repository is None:
+            return None
+        token = uuid4().hex
+        claimed = await self.cooldown_repository.areserve(
+            self._cooldown_slots(ip, wallet), token, self._reservation_until()
+        )
+        if len(claimed) < 2:
+            await self._arelease_cooldown(list(claimed), token)
+            self._reject_reserved(ip, wallet, claimed)
+        return token
+
+    def _reject_reserved(self, ip: IPAddress, wallet: WalletAddress, claimed: set[str]) -> NoReturn:
+        # the slot is held by a request in progress from the same IP or to the same wallet
+        if self._ip_key(ip) not in claimed:
+            self.metrics.increment("cooldown_rejections", reason="ip", source="reservation")
+            raise TooManyTransactionsFromIpError(ip)
+        self.metrics.increment("cooldown_rejections", reason="wallet", source="reservation")
+        raise TooManyTransactionsFromWalletError(wallet)
+
+    def _release_cooldown(self, slots: list[str], token: str) -> None:
+        if not slots or self.cooldown_repository is None:
+            return
+        try:
+            self.cooldown_repository.release(slots, token)
+        except Exception:
+            # the payout may be already made, the reservation expires anyway
+            logger.exception("Error releasing cooldown reservation")
+
+    async def _arelease_cooldown(self, slots: list[str], token: str) -> None:
+        if not slots or self.cooldown_repository is None:
+            return
+        try:
+            await self.cooldown_repository.arelease(slots, token)
+        except Exception:
+            logger.exception("Error releasing cooldown reservation")
+
+    def _reservation_until(self) -> DomainDateTime:
+        return DomainDateTime(DomainDateTime.now().dt + timedelta(seconds=self.reservation_seconds))
+
+    def _cooldown_slots(self, ip: IPAddress, wallet: WalletAddress) -> list[str]:
+        # always in the same order, so requests sharing slots can't wait for each other
+        return [self._ip_key(ip), self._wallet_key(wallet)]
+
+    def _cooldown_since(self) -> DomainDateTime:
+        # older transactions can't hold a cooldown, the database doesn't have to look at them
+        return DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=self.threshold_timeout_minutes))
+
+    def _check_cached_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> None:
+        # Repeat requests are rejected by the shared cache without touching the database
+        if self._is_cached_cooldown(self._ip_key(ip)):
+            self.metrics.increment("cooldown_rejections", reason="ip", source="cache")
+            raise TooManyTransactionsFromIpError(ip)
+        if self._is_cached_cooldown(self._wallet_key(wallet)):
+            self.metrics.increment("cooldown_rejections", reason="wallet", source="cache")
+            raise TooManyTransactionsFromWalletError(wallet)
+
+    def _check_last_ip_tx(self, ip: IPAddress, last_ip_tx_at: DomainDateTime | None) -> None:
+        # Check if there are too many transactions from the same IP address
+        if last_ip_tx_at:
+            minimum_next_tx_time = last_ip_tx_at + timedelta(minutes=self.threshold_timeout_minutes)
+            if DomainDateTime.now() < minimum_next_tx_time:
+                self._cache_cooldown(self._ip_key(ip), minimum_next_tx_time)
+                self.metrics.increment("cooldown_rejections", reason="ip", source="database")
+                raise TooManyTransactionsFromIpError(ip)
+
+    def _check_last_wallet_tx(self, wallet: WalletAddress, last_wallet_tx_at: DomainDateTime | None) -> None:
+        # Check if there are too many transactions from the same wallet address
+        if last_wallet_tx_at:
+            minimum_next_tx_time = last_wallet_tx_at + timedelta(minutes=self.threshold_timeout_minutes)
+            if DomainDateTime.now() < minimum_next_tx_time:
+                self._cache_cooldown(self._wallet_key(wallet), minimum_next_tx_time)
+                self.metrics.increment("cooldown_rejections", reason="wallet", source="database")
+                raise TooManyTransactionsFromWalletError(wallet)
+
+    def _start_cooldown(self, ip: IPAddress, wallet: WalletAddress) -> None:
+        minimum_next_tx_time = DomainDateTime.now() + timedelta(minutes=self.threshold_timeout_minutes)
+        self._cache_cooldown(self._ip_key(ip), minimum_next_tx_time)
+        self._cache_cooldown(self._wallet_key(wallet), minimum_next_tx_time)
+
+    def _is_cached_cooldown(self, key: str) -> bool:
+        if self.cooldown_cache is None:
+            return False
+        try:
+            return self.cooldown_cache.get(key) is not None
+        except Exception:
+            # the cache is only a shortcut, the database has the answer
+            logger.exception("Error reading cooldown cache")
+            return False
+
+    def _cache_cooldown(self, key: str, until: DomainDateTime) -> None:
+        if self.cooldown_cache is None:
+            return
+        try:
+            self.cooldown_cache.set(key, until.dt.timestamp())
+        except Exception:
+            logger.exception("Error writing cooldown cache")
+
+    def _observe_funding(self, started_at: float, error: Exception | None = None) -> None:
+        if error is None:
+            outcome = "sent"
+        elif isinstance(error, (TooManyTransactionsFromIpError, TooManyTransactionsFromWalletError)):
+            outcome = "rejected"
+        else:
+            outcome = "failed"
+        self.metrics.observe("fund_wallet_seconds", perf_counter() - started_at, outcome=outcome)
+
+    @staticmethod
+    def _ip_key(ip: IPAddress) -> str:
+        return f"ip:{ip.value}"
+
+    @staticmethod
+    def _wallet_key(wallet: WalletAddress) -> str:
+        return f"wallet:{wallet.value}"
+
     def get_stats(self) -> FaucetStatsDTO:
         """
         Fetches statistics for the last 24 hours.
         """
-        last_24_hours = DomainDateTime(DomainDateTime.now().dt - timedelta(hours=24))
-        succeeded_tx, pending_tx, total_failed = self.faucet_transactions_repository.cnt_stats(last_24_hours)
-        return FaucetStatsDTO(total_successful=succeeded_tx, total_pending=pending_tx, total_failed=total_failed)
+        if self.stats_cache is not None and (stats := self.stats_cache.get(STATS_CACHE_KEY)) is not None:
+            return stats
+
+        counts = self.faucet_transactions_repository.cnt_stats(self._stats_since())
+        return self._cache_stats(counts)
+
+    async def aget_stats(self) -> FaucetStatsDTO:
+        """
+        Async version of get_stats.
+        """
+        if self.stats_cache is not None and (stats := self.stats_cache.get(STATS_CACHE_KEY)) is not None:
+            return stats
+
+        counts = await self.faucet_transactions_repository.acnt_stats(self._stats_since())
+        return self._cache_stats(counts)
+
+    @staticmethod
+    def _stats_since() -> DomainDateTime:
+        return DomainDateTime(DomainDateTime.now().dt - timedelta(hours=24))
+
+    def _cache_stats(self, counts: tuple[int, int, int]) -> FaucetStatsDTO:
+        succeeded_tx, pending_tx, total_failed = counts
+        stats = FaucetStatsDTO(total_successful=succeeded_tx, total_pending=pending_tx, total_failed=total_failed)
+
+        if self.stats_cache is not None:
+            self.stats_cache.set(STATS_CACHE_KEY, stats)
+        return stats
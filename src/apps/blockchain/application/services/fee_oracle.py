@@ -0,0 +1,114 @@
+import logging
+from asyncio import Lock as AsyncLock
+from statistics import median
+from threading import Lock
+from time import monotonic
+
+from web3 import AsyncWeb3, Web3
+from web3.types import FeeHistory
+
+from apps.blockchain.domain.value_objects import GasFees
+
+logger = logging.getLogger(__name__)
+
+
+class FeeOracle:
+    """FeeOracle keeps EIP-1559 fees in memory, so sending funds doesn't have to ask the node for gas price.
+
+    Fees are refreshed with eth_feeHistory when they are older than ttl_seconds. If the refresh fails,
+    cached fees are still used until they are older than max_stale_seconds, after that the error is raised.
+
+    Attributes:
+        ttl_seconds (float): How long fetched fees are considered fresh.
+        max_stale_seconds (float): Upper bound for the age of fees used when the node is not available.
+        history_blocks (int): Number of recent blocks used to calculate the priority fee.
+        priority_fee_percentile (int): Percentile of priority fees paid in recent blocks.
+        base_fee_multiplier (int): Max fee covers this many consecutive base fee increases.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_stale_seconds: float,
+        history_blocks: int = 5,
+        priority_fee_percentile: int = 50,
+        base_fee_multiplier: int = 2,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max(max_stale_seconds, ttl_seconds)
+        self.history_blocks = history_blocks
+        self.priority_fee_percentile = priority_fee_percentile
+        self.base_fee_multiplier = base_fee_multiplier
+        self._fees: GasFees | None = None
+        self._fetched_at = 0.0
+        self._lock = Lock()
+        self._async_lock = AsyncLock()
+
+    def get_fees(self, web3: Web3) -> GasFees:
+        if self._is_fresh():
+            return self._fees  # type: ignore
+
+        with self._lock:
+            # fees could be refreshed by another thread while we were waiting for the lock
+            if self._is_fresh():
+                return self._fees  # type: ignore
+
+            try:
+                self._set_fees(self.fetch_fees(web3))
+            except Exception as e:
+                self._use_stale_fees(e)
+
+            return self._fees  # type: ignore
+
+    async def aget_fees(self, web3: AsyncWeb3) -> GasFees:
+        """Same as get_fees for AsyncWeb3, concurrent requests wait for one refresh."""
+        if self._is_fresh():
+            return self._fees  # type: ignore
+
+        async with self._async_lock:
+            if self._is_fresh():
+                return self._fees  # type: ignore
+
+            try:
+                self._set_fees(await self.afetch_fees(web3))
+            except Exception as e:
+                self._use_stale_fees(e)
+
+            return self._fees  # type: ignore
+
+    def fetch_fees(self, web3: Web3) -> GasFees:
+        history = web3.eth.fee_history(self.history_blocks, "latest", [self.priority_fee_percentile])
+        # empty blocks, let the node suggest something
+        priority_fee = self._median_priority_fee(history) or web3.eth.max_priority_fee
+        return self._to_fees(history, priority_fee)
+
+    async def afetch_fees(self, web3: AsyncWeb3) -> GasFees:
+        history = await web3.eth.fee_history(self.history_blocks, "latest", [self.priority_fee_percentile])
+        priority_fee = self._median_priority_fee(history) or await web3.eth.max_priority_fee
+        return self._to_fees(history, priority_fee)
+
+    @staticmethod
+    def _median_priority_fee(history: FeeHistory) -> int:
+        rewards = [block_rewards[0] for block_rewards in history.get("reward", []) if block_rewards]
+        return int(median(rewards)) if rewards else 0
+
+    def _to_fees(self, history: FeeHistory, priority_fee: int) -> GasFees:
+        # the last item is the base fee of the next block
+        base_fee = history["baseFeePerGas"][-1]
+        return GasFees(
+            max_fee_per_gas=base_fee * self.base_fee_multiplier + priority_fee,
+            max_priority_fee_per_gas=priority_fee,
+        )
+
+    def _set_fees(self, fees: GasFees) -> None:
+        self._fees = fees
+        self._fetched_at = monotonic()
+
+    def _use_stale_fees(self, error: Exception) -> None:
+        age = monotonic() - self._fetched_at
+        if self._fees is None or age > self.max_stale_seconds:
+            raise error
+        logger.warning(f"Error refreshing gas fees, using fees fetched {age:.1f}s ago: {error}")
+
+    def _is_fresh(self) -> bool:
+        return self._fees is not None and monotonic() - self._fetched_at < self.ttl_seconds
@@ -0,0 +1,101 @@
+import logging
+
+from apps.blockchain.application.services.transactions import is_nonce_too_low_error, may_be_broadcast
+from apps.blockchain.domain.repository import INonceRepository
+
+logger = logging.getLogger(__name__)
+
+
+class NonceManager:
+    """NonceManager hands out nonces for faucet accounts without asking the node every time.
+
+    The counter itself lives in the nonce repository, so all workers share it. The manager only
+    remembers which addresses were already synced with the node by the current process.
+
+    Resync from the node is needed:
+        - the first time the address is used by the process (startup)
+        - after the node rejected a transaction with "nonce too low"
+        - when an allocated nonce can't be given back, so there is a gap in the sequence
+        - when the send of a transaction timed out, it may have reached the node or not
+    """
+
+    def __init__(self, nonce_repository: INonceRepository):
+        self.nonce_repository = nonce_repository
+        self._synced_addresses: set[str] = set()
+        self._force_sync_addresses: set[str] = set()
+
+    def needs_sync(self, address: str) -> bool:
+        return address not in self._synced_addresses
+
+    def sync(self, address: str, chain_nonce: int, force: bool = False) -> None:
+        """
+        Sync the counter with the pending nonce from the node.
+
+        Without force the counter is only moved forward, other workers may have
+        nonces in flight which the node doesn't know about yet.
+        """
+        force = force or address in self._force_sync_addresses
+        self.nonce_repository.set_next_nonce(address, chain_nonce, only_forward=not force)
+        self._synced_addresses.add(address)
+        self._force_sync_addresses.discard(address)
+        logger.info(f"Nonce for {address} synced with node: {chain_nonce} (force={force})")
+
+    def invalidate(self, address: str, force: bool = False) -> None:
+        """Require resync on the next allocation, with force the counter may be moved back."""
+        self._synced_addresses.discard(address)
+        if force:
+            self._force_sync_addresses.add(address)
+
+    def allocate(self, address: str) -> int | None:
+        """Return the next nonce or None if the address has to be synced first."""
+        if self.needs_sync(address):
+            return None
+
+        nonce = self.nonce_repository.allocate(address)
+        if nonce is None:
+            self.invalidate(address)
+        return nonce
+
+    def allocate_synced(self, address: str, chain_nonce: int) -> int:
+        """Sync the counter with the pending nonce from the node and return the next nonce."""
+        self.sync(address, chain_nonce)
+        nonce = self.allocate(address)
+        if nonce is None:
+            raise RuntimeError(f"Can't allocate nonce for {address}")
+        return nonce
+
+    def release(self, address: str, nonce: int) -> None:
+        """Give back a nonce which wasn't broadcasted."""
+        if not self.nonce_repository.release(address, nonce):
+            # later nonces are already in use, so this one is a gap now
+            logger.warning(f"Nonce {nonce} for {address} can't be released, resync is required")
+            self.invalidate(address, force=True)
+
+    def abandon(self, address: str, nonce: int) -> None:
+        """
+        Drop a nonce whose transaction may have reached the node.
+
+        Giving it back could replace that transaction, keeping the counter could leave a gap,
+        so the next allocation takes the pending nonce of the node, which knows if it was broadcasted.
+        """
+        logger.warning(f"Nonce {nonce} for {address} may be in use, resync is required")
+        self.invalidate(address, force=True)
+
+    def send_failed(self, address: str, nonce: int, error: Exception) -> None:
+        """Give back the nonce of a failed send, or abandon it if the transaction may have reached the node."""
+        if may_be_broadcast(error):
+            self.abandon(address, nonce)
+        else:
+            self.release(address, nonce)
+
+    def resync_if_behind(self, address: str, error: Exception) -> bool:
+        """
+        Require resync if the node rejected a transaction because the nonce was used by someone else
+        (another process, manual tx). True if the send is worth one more try.
+        """
+        if not is_nonce_too_low_error(error):
+            return False
+
+        logger.warning(f"Nonce for {address} is behind the node, resyncing: {error}")
+        self.invalidate(address)
+        return True
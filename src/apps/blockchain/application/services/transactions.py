@@ -0,0 +1,46 @@
+from aiohttp import ClientError
+from eth_account.types import TransactionDictType
+from eth_typing import ChecksumAddress
+from requests import RequestException
+
+from apps.blockchain.domain.value_objects import GasFees
+
+# gas used by a plain ETH transfer to an address without code
+PLAIN_TRANSFER_GAS = 21_000
+
+# node error messages which mean that our local nonce is behind the chain
+NONCE_TOO_LOW_ERRORS = ("nonce too low", "oldnonce", "replacement transaction underpriced")
+
+# transport errors of a send, the node may have accepted the transaction before the answer was lost
+MAYBE_BROADCAST_ERRORS = (TimeoutError, ConnectionError, RequestException, ClientError)
+
+
+def transaction_dict(chain_id: int, to: ChecksumAddress, value: int, fees: GasFees) -> TransactionDictType:
+    """EIP-1559 transaction without sender, gas and nonce, the same for the sync and async services."""
+    return {
+        "type": 2,
+        "to": to,
+        "value": value,
+        "maxFeePerGas": fees.max_fee_per_gas,
+        "maxPriorityFeePerGas": fees.max_priority_fee_per_gas,
+        "chainId": chain_id,
+    }
+
+
+def max_cost(tx: TransactionDictType) -> int:
+    """The most the sender may pay for the transaction, value and gas at max fee."""
+    return tx["value"] + tx.get("gas", PLAIN_TRANSFER_GAS) * tx["maxFeePerGas"]  # type: ignore
+
+
+def sent_fees(tx: TransactionDictType) -> GasFees:
+    return GasFees(max_fee_per_gas=tx["maxFeePerGas"], max_priority_fee_per_gas=tx["maxPriorityFeePerGas"])  # type: ignore
+
+
+def is_nonce_too_low_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in NONCE_TOO_LOW_ERRORS)
+
+
+def may_be_broadcast(error: Exception) -> bool:
+    """False when the transaction surely didn't reach the node, e.g. it answered with an error."""
+    return isinstance(error, MAYBE_BROADCAST_ERRORS)
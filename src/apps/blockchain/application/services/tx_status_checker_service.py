@@ -1,37 +1,83 @@
 import logging
-from time import sleep
+from datetime import timedelta
+from itertools import batched
+from time import monotonic, perf_counter, sleep
+from typing import Sequence
 
 from apps.blockchain.application.services.blockchain_service import BlockchainService
+from apps.blockchain.domain.entities import FaucetTransaction, PendingTransaction
 from apps.blockchain.domain.repository import IFaucetTransactionsRepository
-from apps.blockchain.domain.value_objects import TransactionStatus
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
+from apps.shared.metrics import Metrics, NullMetrics
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
 
 logger = logging.getLogger(__name__)
 
 
 class TxStatusCheckerService:
+    """TxStatusCheckerService follows new blocks and resolves statuses of pending faucet transactions.
+
+    Instead of asking for a receipt of every pending transaction on every loop, it fetches
+    transaction hashes of each new block once and checks receipts of our transactions found there.
+
+    Receipts of the other pending transactions are checked only when they are due: a new transaction
+    right away (it could be mined in an already processed block), then after backoff_seconds, doubled
+    with every check which didn't resolve it up to max_backoff_seconds. A check failed by an RPC error
+    counts as an attempt too. Due times are stored with the transactions and only due ones are read,
+    so the work of a sweep depends on the block rate and on the transactions which can change,
+    not on the size of the backlog.
+
+    All pending transactions are checked on start or when the checker is more than max_blocks_behind
+    blocks behind, the blocks they could be mined in are not followed.
+
+    Pending transactions are streamed from the repository and handled chunk_size at a time,
+    so a long backlog doesn't have to fit in memory at once.
+
+    After every sweep the number of checked transactions, the pending backlog and the sweep duration
+    are reported to metrics.
+
+    A transaction pending for longer than stuck_after_seconds (e.g. underpriced) blocks all later nonces
+    of its account, so it's sent again with the same nonce and higher fees, at most max_replacements times.
+    Whichever of its hashes is mined resolves the status, and the transaction gets that hash.
+    """
+
     def __init__(
         self,
         blockchain_service: BlockchainService,
         faucet_transactions_repository: IFaucetTransactionsRepository,
-        loop_timeout_seconds: int,
+        loop_timeout_seconds: float,
+        max_blocks_behind: int = 100,
+        chunk_size: int = 1000,
+        metrics: Metrics | None = None,
+        stuck_after_seconds: float = 0,
+        max_replacements: int = 5,
+        backoff_seconds: float = 5,
+        max_backoff_seconds: float = 300,
     ):
         self.blockchain_service = blockchain_service
         self.faucet_transactions_repository = faucet_transactions_repository
         self.loop_timeout_seconds = loop_timeout_seconds
+        self.max_blocks_behind = max_blocks_behind
+        self.chunk_size = chunk_size
+        self.metrics = metrics or NullMetrics()
+        self.stuck_after_seconds = stuck_after_seconds
+        self.max_replacements = max_replacements
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
         self._is_running = True
+        self._last_block: int | None = None
+        # hashes whose replacement failed, they are retried after stuck_after_seconds, not on every loop
+        self._failed_replacements: dict[TransactionHash, float] = {}
 
     def run(self):
         while self._is_running:
             logger.debug("Checking pending transactions...")
             try:
-                transactions_to_check = self.faucet_transactions_repository.get_pending_transactions()
-                for transaction in transactions_to_check:
-                    tx_hash = transaction.tx_hash
-                    tx_status = self.blockchain_service.get_transaction_status(tx_hash)
-                    if tx_status != TransactionStatus.PENDING:
-                        transaction.status = tx_status
-                        self.faucet_transactions_repository.update(transaction)
-                        logger.info(f"Transaction {tx_hash.value} status: {tx_status.value}")
+                self.check_transactions()
+            except Exception:
+                # node or database hiccup, the same blocks will be checked on the next loop
+                logger.exception("Error checking pending transactions")
             finally:
                 sleep(self.loop_timeout_seconds)
 
@@ -39,3 +85,147 @@ class TxStatusCheckerService:
 
     def stop(self):
         self._is_running = False
+
+    def check_transactions(self):
+        started_at = perf_counter()
+        now = DomainDateTime.now()
+        head = self.blockchain_service.get_block_number()
+        last_block = self._last_block
+        check_all = last_block is None or head - last_block > self.max_blocks_behind
+        mined_ids: set[Id] = set()
+
+        if check_all:
+            logger.info(f"Checking all pending transactions at block {head}")
+        elif last_block is not None and head > last_block:
+            blocks = self.blockchain_service.get_blocks_transaction_hashes(range(last_block + 1, head + 1))
+            block_hashes: set[TransactionHash] = set().union(*blocks.values())
+            # our transactions mined in the new blocks are checked whether they are due or not
+            for hashes in batched(block_hashes, self.chunk_size):
+                mined = self.faucet_transactions_repository.get_pending_by_hashes(set(hashes))
+                if mined:
+                    self._check_chunk(mined, now, block_hashes)
+                    mined_ids.update(tx.id for tx in mined)
+
+        checked = len(mined_ids)
+        pending = self.faucet_transactions_repository.iter_pending_transactions(
+            self.chunk_size, due_before=None if check_all else now
+        )
+        for chunk in batched(pending, self.chunk_size):
+            due = [tx for tx in chunk if tx.id not in mined_ids]
+            if due:
+                self._check_chunk(due, now, set())
+                checked += len(due)
+
+        # state moves forward only when all chunks are checked, otherwise the same blocks are checked again
+        self._last_block = head
+
+        self.metrics.set("tx_checker_checked_transactions", checked)
+        self.metrics.set("pending_transactions", self.faucet_transactions_repository.count_pending_transactions())
+        self.metrics.set("tx_checker_sweep_seconds", perf_counter() - started_at)
+
+        if self.stuck_after_seconds:
+            self.replace_stuck_transactions()
+
+    def replace_stuck_transactions(self) -> int:
+        """Send transactions pending for longer than stuck_after_seconds again with higher fees."""
+        broadcast_before = DomainDateTime(DomainDateTime.now().dt - timedelta(seconds=self.stuck_after_seconds))
+        stuck = self.faucet_transactions_repository.get_stuck_transactions(
+            broadcast_before, self.max_replacements, self.chunk_size
+        )
+
+        # requests paid by one batch share the transaction, it's replaced once for all of them
+        by_hash: dict[TransactionHash, list[FaucetTransaction]] = {}
+        for transaction in stuck:
+            if transaction.tx_hash is not None:
+                by_hash.setdefault(transaction.tx_hash, []).append(transaction)
+
+        # kept while not stuck too, a failed send is saved under the hash of the replacement
+        self._failed_replacements = {
+            tx_hash: failed_at
+            for tx_hash, failed_at in self._failed_replacements.items()
+            if monotonic() - failed_at < self.stuck_after_seconds
+        }
+        replaced = 0
+        for tx_hash, transactions in by_hash.items():
+            if tx_hash not in self._failed_replacements:
+                replaced += self._replace(tx_hash, transactions)
+        return replaced
+
+    def _replace(self, tx_hash: TransactionHash, transactions: list[FaucetTransaction]) -> bool:
+        stuck = transactions[0]
+        if stuck.sender is None or stuck.nonce is None or stuck.fees is None:
+            return False
+
+        try:
+            replacement = self.blockchain_service.sign_replacement(
+                [(transaction.wallet, transaction.amount) for transaction in transactions],
+                stuck.sender,
+                stuck.nonce,
+                stuck.fees,
+            )
+        except Exception as e:
+            logger.warning(f"Can't replace transaction {tx_hash.value}: {e}")
+            self._failed_replacements[tx_hash] = monotonic()
+            self.metrics.increment("transaction_replacements", outcome="failed")
+            return False
+
+        # the hash is saved before the send, a replacement which reaches the node is never lost,
+        # one which doesn't is never mined and the request is resolved by the replaced hash
+        broadcast_at = DomainDateTime.now()
+        for transaction in transactions:
+            transaction.tx_hash = TransactionHash(replacement.tx_hash)
+            transaction.nonce = replacement.nonce
+            transaction.fees = replacement.fees
+            transaction.broadcast_at = broadcast_at
+        self.faucet_transactions_repository.save_replacement(transactions, tx_hash)
+
+        try:
+            self.blockchain_service.send_replacement(replacement)
+        except Exception as e:
+            # "nonce too low" means it's mined meanwhile, the status is resolved on the next loop.
+            # The unsent replacement counts toward max_replacements, the node may have got it,
+            # and one which rejected it would likely reject the next one too
+            logger.warning(f"Can't send replacement {replacement.tx_hash} of transaction {tx_hash.value}: {e}")
+            self._failed_replacements[TransactionHash(replacement.tx_hash)] = monotonic()
+            self.metrics.increment("transaction_replacements", outcome="failed")
+            return False
+
+        self.metrics.increment("transaction_replacements", outcome="sent")
+        logger.info(f"Transaction {tx_hash.value} with nonce {stuck.nonce} replaced by {replacement.tx_hash}")
+        return True
+
+    def _check_chunk(
+        self, chunk: Sequence[PendingTransaction], now: DomainDateTime, block_hashes: set[TransactionHash]
+    ) -> None:
+        """Resolve statuses of the chunk, the next check of unresolved transactions is scheduled."""
+        statuses = self.blockchain_service.get_transaction_statuses({h for tx in chunk for h in tx.hashes})
+
+        resolved: dict[Id, TransactionStatus] = {}
+        replaced_mined: dict[Id, TransactionHash] = {}
+        checks: dict[Id, tuple[int, DomainDateTime]] = {}
+        for transaction in chunk:
+            for tx_hash in transaction.hashes:
+                tx_status = statuses.get(tx_hash, TransactionStatus.PENDING)
+                if tx_status != TransactionStatus.PENDING:
+                    resolved[transaction.id] = tx_status
+                    if tx_hash != transaction.tx_hash:
+                        replaced_mined[transaction.id] = tx_hash
+                    logger.info(f"Transaction {tx_hash.value} status: {tx_status.value}")
+                    break
+            else:
+                if any(tx_hash in block_hashes for tx_hash in transaction.hashes):
+                    # mined, but the node can't give the receipt yet, it's checked again on the next loop
+                    checks[transaction.id] = (transaction.attempts, now)
+                else:
+                    # no receipt yet or an RPC error (the hash is missing in statuses), both are attempts
+                    attempts = transaction.attempts + 1
+                    checks[transaction.id] = (attempts, self._next_check_at(now, attempts))
+
+        if resolved:
+            self.faucet_transactions_repository.update_statuses(resolved, replaced_mined or None)
+        if checks:
+            self.faucet_transactions_repository.schedule_checks(checks)
+
+    def _next_check_at(self, now: DomainDateTime, attempts: int) -> DomainDateTime:
+        delay = min(self.backoff_seconds * 2 ** min(attempts - 1, 32), self.max_backoff_seconds)
+        return DomainDateTime(now.dt + timedelta(seconds=delay))
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 
 from apps.blockchain.domain.value_objects import (
+    GasFees,
     IPAddress,
     TokenAmount,
     TransactionHash,
@@ -8,15 +9,46 @@ from apps.blockchain.domain.value_objects import (
     WalletAddress,
 )
 from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
 from base.entity import BaseEntity
 
 
 @dataclass
 class FaucetTransaction(BaseEntity):
-    tx_hash: TransactionHash
+    tx_hash: TransactionHash | None  # None until queued transaction is sent
     status: TransactionStatus
     ip_address: IPAddress
     wallet: WalletAddress
     amount: TokenAmount
     created_at: DomainDateTime = field(default_factory=DomainDateTime.now)
     error: str | None = None
+    sender: WalletAddress | None = None  # faucet account which sent the transaction
+    # nonce and fees of tx_hash, a stuck transaction is replaced with the same nonce and higher fees
+    nonce: int | None = None
+    fees: GasFees | None = None
+    broadcast_at: DomainDateTime | None = None  # when tx_hash was sent
+    replacements: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class CooldownState:
+    """Creation times of the last transactions from the IP and to the wallet within the cooldown window."""
+
+    last_ip_tx_at: DomainDateTime | None
+    last_wallet_tx_at: DomainDateTime | None
+
+
+@dataclass(frozen=True, slots=True)
+class PendingTransaction:
+    """What the status checker needs to know about a pending faucet transaction."""
+
+    id: Id
+    tx_hash: TransactionHash
+    # hashes the transaction was sent with before it was replaced, any of them may be mined
+    replaced_hashes: tuple[TransactionHash, ...] = ()
+    # receipt checks which didn't resolve the status, the next one is postponed exponentially
+    attempts: int = 0
+
+    @property
+    def hashes(self) -> tuple[TransactionHash, ...]:
+        return (self.tx_hash, *self.replaced_hashes)
@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Iterator
 
-from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.entities import CooldownState, FaucetTransaction, PendingTransaction
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
 from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
 
 
 class IFaucetTransactionsRepository(ABC):
@@ -19,13 +22,123 @@ class IFaucetTransactionsRepository(ABC):
     def update(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction: ...
 
     @abstractmethod
-    def get_last_by_ip(self, ip_address: str) -> FaucetTransaction | None: ...
+    def update_statuses(
+        self, statuses: dict[Id, TransactionStatus], mined_hashes: dict[Id, TransactionHash] | None = None
+    ) -> None:
+        """
+        Set new statuses of many transactions at once, nothing else is changed
+        but the hash of transactions which were mined with a replaced hash.
+        """
 
     @abstractmethod
-    def get_last_by_wallet(self, wallet_address: str) -> FaucetTransaction | None: ...
+    def get_by_id(self, transaction_id: Id) -> FaucetTransaction | None: ...
+
+    @abstractmethod
+    def get_cooldown_state(self, ip_address: str, wallet_address: str, since: DomainDateTime) -> CooldownState:
+        """Times of the last transactions from the IP and to the wallet created since the given time, in one query."""
 
     @abstractmethod
     def get_pending_transactions(self) -> list[FaucetTransaction]: ...
 
+    @abstractmethod
+    def iter_pending_transactions(
+        self, chunk_size: int, due_before: DomainDateTime | None = None
+    ) -> Iterator[PendingTransaction]:
+        """
+        Stream pending transactions in the order of id, at most chunk_size of them are loaded at once.
+
+        With due_before only transactions never checked or whose next check is due by then are streamed.
+        """
+
+    @abstractmethod
+    def count_pending_transactions(self) -> int: ...
+
+    @abstractmethod
+    def get_pending_by_hashes(self, tx_hashes: set[TransactionHash]) -> list[PendingTransaction]:
+        """Pending transactions sent with any of the hashes, their current or a replaced one."""
+
+    @abstractmethod
+    def schedule_checks(self, checks: dict[Id, tuple[int, DomainDateTime]]) -> None:
+        """Save the number of attempts and the time of the next receipt check of pending transactions."""
+
+    @abstractmethod
+    def get_stuck_transactions(
+        self, broadcast_before: DomainDateTime, max_replacements: int, limit: int
+    ) -> list[FaucetTransaction]:
+        """Pending transactions sent before the given time and replaced less than max_replacements times."""
+
+    @abstractmethod
+    def save_replacement(self, transactions: list[FaucetTransaction], replaced_tx_hash: TransactionHash) -> None:
+        """
+        Save new hash, nonce and fees of the transactions, the replaced hash is kept with them.
+
+        The new hash is checked on the next sweep, the attempts of the replaced one are reset.
+        """
+
+    @abstractmethod
+    def claim_queued_transactions(self, limit: int) -> list[FaucetTransaction]:
+        """
+        Move the oldest queued transactions to sending and return them, in the order they were requested.
+
+        A transaction is claimed once, rows claimed by another sender are skipped.
+        """
+
     @abstractmethod
     def cnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]: ...
+
+    # async versions for the async request path, named like Django async ORM methods
+
+    @abstractmethod
+    async def acreate(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction: ...
+
+    @abstractmethod
+    async def aget_cooldown_state(
+        self, ip_address: str, wallet_address: str, since: DomainDateTime
+    ) -> CooldownState: ...
+
+    @abstractmethod
+    async def acnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]: ...
+
+
+class INonceRepository(ABC):
+    """
+    Interface for the shared nonce counter of faucet accounts.
+
+    Implementations must be safe to use from several processes at once,
+    every allocated nonce has to be unique for the address.
+    """
+
+    @abstractmethod
+    def allocate(self, address: str) -> int | None:
+        """Return the next nonce and move the counter forward, None if the address is unknown."""
+
+    @abstractmethod
+    def release(self, address: str, nonce: int) -> bool:
+        """Give back an unused nonce, possible only if it is still the last allocated one."""
+
+    @abstractmethod
+    def set_next_nonce(self, address: str, nonce: int, only_forward: bool = False) -> None:
+        """Set the counter to the given value, with only_forward it is never moved back."""
+
+
+class ICooldownRepository(ABC):
+    """
+    Interface for reservations of cooldown slots (an IP address or a wallet) by fund requests in progress.
+
+    A slot is held by one request at a time across all workers, until it's released or the reservation expires.
+    Implementations must claim slots atomically, the check and the claim can't be separate steps.
+    """
+
+    @abstractmethod
+    def reserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]:
+        """Claim the free or expired slots for token until the given time, return the claimed ones."""
+
+    @abstractmethod
+    def release(self, slots: list[str], token: str) -> None:
+        """Free the slots which are still held by token."""
+
+    @abstractmethod
+    async def areserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]: ...
+
+    @abstractmethod
+    async def arelease(self, slots: list[str], token: str) -> None: ...
@@ -1,8 +1,11 @@
 import ipaddress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
+from functools import lru_cache
 
+from eth_typing import ChecksumAddress, HexAddress
 from eth_typing.encoding import HexStr
+from eth_utils import is_hex_address, keccak, remove_0x_prefix
 from hexbytes import HexBytes
 from web3 import Web3
 from web3.types import Wei
@@ -13,61 +16,119 @@ class TransactionStatus(Enum):
     FAILED = "failed"
     # currently all our statuses will be pending, but we may want to change this in the future
     PENDING = "pending"
+    # fund request is accepted, but the transaction is not sent yet
+    QUEUED = "queued"
+    # queued request is claimed by the sender, its transaction may be broadcast, it's never sent again
+    SENDING = "sending"
 
     @classmethod
     def choices(cls):
         return [(tag.value, tag.name) for tag in cls]
 
 
-@dataclass(frozen=True)
+@lru_cache(maxsize=65_536)
+def to_checksum_address(address: str) -> ChecksumAddress:
+    """EIP-55 checksum of a 40 hex chars address, memoized as the same wallets come again and again."""
+    address = address.lower()
+    digest = keccak(text=address).hex()
+    return ChecksumAddress(
+        HexAddress(HexStr("0x" + "".join(c.upper() if d >= "8" else c for c, d in zip(address, digest))))
+    )
+
+
+@dataclass(frozen=True, slots=True)
 class WalletAddress:
+    """
+    Ethereum address, the value is always checksummed.
+
+    Use from_trusted for values which were validated before, e.g. loaded from the database,
+    validation computes keccak of the address and is the most expensive part of loading a transaction.
+    """
+
     value: str
 
     def __post_init__(self):
-        if not Web3.is_address(self.value):
+        if not is_hex_address(self.value):
             raise ValueError(f"Invalid Ethereum address: {self.value}")
 
-        checksummed = Web3.to_checksum_address(self.value)
+        # like Web3.is_address, the case of a mixed case address isn't checked against its checksum
+        checksummed = to_checksum_address(remove_0x_prefix(HexStr(self.value)).lower())
         object.__setattr__(self, "value", str(checksummed))
 
+    @classmethod
+    def from_trusted(cls, value: str) -> "WalletAddress":
+        """Create from an already checksummed address without validation."""
+        address = object.__new__(cls)
+        object.__setattr__(address, "value", value)
+        return address
+
     @property
-    def checksum_address(self):
-        return Web3.to_checksum_address(self.value)
+    def checksum_address(self) -> ChecksumAddress:
+        return ChecksumAddress(HexAddress(HexStr(self.value)))
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransactionHash:
     value: str
+    # decoded value, computed on the first access
+    _bytes: HexBytes | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        object.__setattr__(self, "value", Web3.to_hex(hexstr=self.value.lower()))  # type: ignore
+        value = self.value.lower()
+        object.__setattr__(self, "value", value if value.startswith("0x") else "0x" + value)
+
+    @classmethod
+    def from_trusted(cls, value: str) -> "TransactionHash":
+        """Create from an already normalized 0x prefixed lower case hash."""
+        tx_hash = object.__new__(cls)
+        object.__setattr__(tx_hash, "value", value)
+        object.__setattr__(tx_hash, "_bytes", None)
+        return tx_hash
 
     @property
     def bytes(self) -> HexBytes:
-        if self.value.startswith("0x"):
-            HexBytes(Web3.to_bytes(hexstr=HexStr(self.value[2:])))
-        return HexBytes(Web3.to_bytes(hexstr=HexStr(self.value)))
+        if self._bytes is None:
+            object.__setattr__(self, "_bytes", HexBytes(self.value))
+        return self._bytes  # type: ignore
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IPAddress:
     value: str
+    # parsed value, computed on the first access for trusted values
+    _ip: ipaddress.IPv4Address | ipaddress.IPv6Address | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         try:
-            ipaddress.ip_address(self.value)
+            object.__setattr__(self, "_ip", ipaddress.ip_address(self.value))
         except ValueError:
             raise ValueError(f"Invalid IP address: {self.value}")
 
-    def to_int(self):
-        return int(ipaddress.ip_address(self.value))
+    @classmethod
+    def from_trusted(cls, value: str) -> "IPAddress":
+        """Create from a value which was validated before, e.g. loaded from the database."""
+        ip = object.__new__(cls)
+        object.__setattr__(ip, "value", value)
+        object.__setattr__(ip, "_ip", None)
+        return ip
+
+    def to_int(self) -> int:
+        return int(self._parsed)
+
+    @property
+    def version(self) -> int:
+        return self._parsed.version
 
     @property
-    def version(self):
-        return ipaddress.ip_address(self.value).version
+    def _parsed(self) -> ipaddress.IPv4Address | ipaddress.IPv6Address:
+        if self._ip is None:
+            object.__setattr__(self, "_ip", ipaddress.ip_address(self.value))
+        return self._ip  # type: ignore
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TokenAmount:
     wei_value: int
 
@@ -90,3 +151,28 @@ class TokenAmount:
 
     def to_wei(self) -> Wei:
         return Web3.to_wei(self.wei_value, "wei")
+
+
+@dataclass(frozen=True, slots=True)
+class GasFees:
+    """EIP-1559 fee parameters of a transaction, in wei."""
+
+    max_fee_per_gas: int
+    max_priority_fee_per_gas: int
+
+    def __post_init__(self):
+        if self.max_priority_fee_per_gas < 0 or self.max_fee_per_gas < self.max_priority_fee_per_gas:
+            raise ValueError("Invalid gas fees.")
+
+    def replacement(self, current: "GasFees", bump_percent: int) -> "GasFees":
+        """
+        Fees of a transaction which replaces one with these fees at the same nonce.
+
+        Nodes accept a replacement only if both fees are higher by some percent (10 in geth),
+        if the current fees are higher still, they are used.
+        """
+        priority_fee = max(
+            self.max_priority_fee_per_gas * (100 + bump_percent) // 100 + 1, current.max_priority_fee_per_gas
+        )
+        max_fee = max(self.max_fee_per_gas * (100 + bump_percent) // 100 + 1, current.max_fee_per_gas, priority_fee)
+        return GasFees(max_fee_per_gas=max_fee, max_priority_fee_per_gas=priority_fee)
@@ -0,0 +1,65 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from eth_account import Account
+
+from apps.blockchain.application.exceptions import FaucetOutOfFundsError
+from apps.blockchain.application.services.account_pool import AccountPool
+
+
+@pytest.fixture
+def accounts():
+    return [Account.create() for _ in range(3)]
+
+
+@pytest.fixture
+def web3():
+    web3 = Mock()
+    web3.eth.get_balance.return_value = 10**18
+    return web3
+
+
+def test_accounts_take_turns(accounts, web3):
+    pool = AccountPool(accounts, balance_ttl_seconds=60)
+
+    chosen = [pool.next_account(web3, 1).address for _ in range(4)]
+
+    assert chosen == [accounts[0].address, accounts[1].address, accounts[2].address, accounts[0].address]
+    # balances are fetched once and then trusted until ttl
+    assert web3.eth.get_balance.call_count == 3
+
+
+def test_account_without_funds_is_skipped(accounts, web3):
+    web3.eth.get_balance.side_effect = lambda address: 0 if address == accounts[0].address else 10**18
+    pool = AccountPool(accounts, balance_ttl_seconds=60)
+
+    assert pool.next_account(web3, 1).address == accounts[1].address
+    assert pool.next_account(web3, 1).address == accounts[2].address
+
+
+def test_spent_funds_are_subtracted(accounts, web3):
+    pool = AccountPool(accounts[:1], balance_ttl_seconds=60)
+    account = pool.next_account(web3, 10**18)
+
+    pool.spend(account.address, 1)
+
+    with pytest.raises(FaucetOutOfFundsError):
+        pool.next_account(web3, 10**18)
+
+
+def test_expired_balance_is_fetched_again(accounts, web3):
+    pool = AccountPool(accounts[:1], balance_ttl_seconds=0)
+
+    pool.next_account(web3, 1)
+    pool.next_account(web3, 1)
+
+    assert web3.eth.get_balance.call_count == 2
+
+
+def test_anext_account(accounts):
+    web3 = Mock()
+    web3.eth.get_balance = AsyncMock(side_effect=[0, 10**18, 10**18])
+    pool = AccountPool(accounts, balance_ttl_seconds=60)
+
+    assert asyncio.run(pool.anext_account(web3, 1)).address == accounts[1].address
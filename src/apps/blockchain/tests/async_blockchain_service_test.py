@@ -0,0 +1,71 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from eth_account import Account
+
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.async_blockchain_service import AsyncBlockchainService
+from apps.blockchain.domain.value_objects import GasFees, TokenAmount, WalletAddress
+from apps.shared.cache import TTLCache
+
+WALLET = WalletAddress("0x742d35Cc6634C0532925a3b844Bc454e4438f44e")
+TX_HASH = bytes.fromhex("ab" * 32)
+
+
+@pytest.fixture
+def service(nonce_manager):
+    fee_oracle = Mock()
+    fee_oracle.aget_fees = AsyncMock(return_value=GasFees(max_fee_per_gas=2, max_priority_fee_per_gas=1))
+    eth = Mock(
+        get_code=AsyncMock(return_value=b""),
+        estimate_gas=AsyncMock(),
+        get_balance=AsyncMock(return_value=10**18),
+        send_raw_transaction=AsyncMock(return_value=TX_HASH),
+    )
+    return AsyncBlockchainService(
+        web3=Mock(eth=eth),
+        chain_id=1337,
+        account_pool=AccountPool([Account.create()], balance_ttl_seconds=60),
+        nonce_manager=nonce_manager,
+        fee_oracle=fee_oracle,
+        recipient_code_cache=TTLCache(ttl_seconds=60),
+    )
+
+
+def test_send_funds_to_eoa(service, nonce_manager):
+    sent = asyncio.run(service.send_funds(WALLET, TokenAmount.from_ether("0.0001")))
+
+    assert sent.tx_hash == TX_HASH.hex()
+    assert sent.sender == service.account_pool.accounts[0].address
+    assert (sent.nonce, sent.fees) == (7, GasFees(max_fee_per_gas=2, max_priority_fee_per_gas=1))
+    service.web3.eth.estimate_gas.assert_not_called()
+    nonce_manager.release.assert_not_called()
+
+
+def test_send_funds_releases_nonce_on_error(service, nonce_manager):
+    service.web3.eth.send_raw_transaction.side_effect = ValueError("insufficient funds")
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.send_funds(WALLET, TokenAmount.from_ether("0.0001")))
+
+    nonce_manager.release.assert_called_once_with(service.account_pool.accounts[0].address, 7)
+
+
+def test_send_funds_keeps_nonce_on_timeout(service, nonce_manager):
+    service.web3.eth.send_raw_transaction.side_effect = TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(service.send_funds(WALLET, TokenAmount.from_ether("0.0001")))
+
+    nonce_manager.release.assert_not_called()
+    nonce_manager.abandon.assert_called_once_with(service.account_pool.accounts[0].address, 7)
+
+
+def test_send_funds_retries_after_nonce_too_low(service, nonce_manager):
+    service.web3.eth.send_raw_transaction.side_effect = [ValueError("nonce too low"), TX_HASH]
+
+    sent = asyncio.run(service.send_funds(WALLET, TokenAmount.from_ether("0.0001")))
+
+    assert sent.tx_hash == TX_HASH.hex()
+    nonce_manager.invalidate.assert_called_once_with(service.account_pool.accounts[0].address)
@@ -0,0 +1,167 @@
+from typing import Any
+from unittest.mock import Mock
+
+import pytest
+import requests
+from eth_account import Account
+from eth_account.typed_transactions import TypedTransaction
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.blockchain_service import BlockchainService
+from apps.blockchain.domain.value_objects import GasFees, TokenAmount, TransactionHash, TransactionStatus, WalletAddress
+from apps.shared.cache import TTLCache
+
+SUCCESS_TX = TransactionHash("0x" + "01" * 32)
+FAILED_TX = TransactionHash("0x" + "02" * 32)
+PENDING_TX = TransactionHash("0x" + "03" * 32)
+ERROR_TX = TransactionHash("0x" + "04" * 32)
+WALLET = WalletAddress("0x742d35Cc6634C0532925a3b844Bc454e4438f44e")
+
+
+class FakeProvider:
+    """Answers receipt batches like a node, remembers size of every batch."""
+
+    receipts: dict[str, dict[str, Any]] = {
+        SUCCESS_TX.value: {"result": {"status": "0x1"}},
+        FAILED_TX.value: {"result": {"status": "0x0"}},
+        PENDING_TX.value: {"result": None},
+        ERROR_TX.value: {"error": {"code": -32000, "message": "internal error"}},
+    }
+
+    def __init__(self):
+        self.batches: list[int] = []
+        self.fail = False
+
+    def make_batch_request(self, requests):
+        self.batches.append(len(requests))
+        if self.fail:
+            raise ConnectionError("node is down")
+        return [{"id": i, "jsonrpc": "2.0", **self.receipts[params[0]]} for i, (method, params) in enumerate(requests)]
+
+
+@pytest.fixture
+def provider():
+    return FakeProvider()
+
+
+@pytest.fixture
+def service(provider, nonce_manager):
+    service = BlockchainService(
+        web3=Web3(Web3.HTTPProvider("http://localhost:8545")),
+        chain_id=1337,
+        account_pool=AccountPool([Account.create()], balance_ttl_seconds=60),
+        nonce_manager=nonce_manager,
+        fee_oracle=Mock(),
+        recipient_code_cache=TTLCache(ttl_seconds=60),
+        rpc_batch_size=3,
+    )
+    service.web3.provider = provider  # type: ignore
+    return service
+
+
+def test_get_transaction_statuses(service, provider):
+    statuses = service.get_transaction_statuses([SUCCESS_TX, FAILED_TX, PENDING_TX, ERROR_TX])
+
+    assert statuses == {
+        SUCCESS_TX: TransactionStatus.SUCCESS,
+        FAILED_TX: TransactionStatus.FAILED,
+        PENDING_TX: TransactionStatus.PENDING,
+    }
+    assert provider.batches == [3, 1]
+
+
+def test_get_transaction_statuses_skips_failed_batches(service, provider):
+    provider.fail = True
+    assert service.get_transaction_statuses([SUCCESS_TX, FAILED_TX]) == {}
+
+
+def test_get_transaction_statuses_empty(service, provider):
+    assert service.get_transaction_statuses([]) == {}
+    assert provider.batches == []
+
+
+def test_get_transaction_status(service):
+    service.web3 = Mock(eth=Mock(get_transaction_receipt=Mock(side_effect=TransactionNotFound("not found"))))
+    assert service.get_transaction_status(PENDING_TX) == TransactionStatus.PENDING
+
+    service.web3.eth.get_transaction_receipt = Mock(return_value={"status": 0})
+    assert service.get_transaction_status(FAILED_TX) == TransactionStatus.FAILED
+
+
+def test_get_transaction_status_raises_rpc_errors(service):
+    # an unknown status must not look like PENDING, the checker backs off and retries
+    service.web3 = Mock(eth=Mock(get_transaction_receipt=Mock(side_effect=ConnectionError("node is down"))))
+    with pytest.raises(ConnectionError):
+        service.get_transaction_status(SUCCESS_TX)
+
+
+@pytest.fixture
+def replacing_service(nonce_manager):
+    fee_oracle = Mock()
+    fee_oracle.get_fees.return_value = GasFees(max_fee_per_gas=50, max_priority_fee_per_gas=5)
+    service = BlockchainService(
+        web3=Mock(eth=Mock(send_raw_transaction=Mock(return_value=HexBytes(SUCCESS_TX.bytes)))),
+        chain_id=1337,
+        account_pool=AccountPool([Account.create()], balance_ttl_seconds=60),
+        nonce_manager=nonce_manager,
+        fee_oracle=fee_oracle,
+        recipient_code_cache=TTLCache(ttl_seconds=60),
+    )
+    service.recipient_code_cache.set(WALLET, False)
+    return service
+
+
+def test_replace_transaction(replacing_service):
+    sender = WalletAddress(replacing_service.account_pool.accounts[0].address)
+
+    replacement = replacing_service.sign_replacement(
+        [(WALLET, TokenAmount(1000))], sender, nonce=7, fees=GasFees(max_fee_per_gas=100, max_priority_fee_per_gas=10)
+    )
+    replacing_service.web3.eth.send_raw_transaction.assert_not_called()
+    replacing_service.send_replacement(replacement)
+
+    [(raw,), _] = replacing_service.web3.eth.send_raw_transaction.call_args
+    tx = TypedTransaction.from_bytes(raw)
+    # the node answers with keccak of the raw transaction, it's known before the send
+    assert replacement.tx_hash == keccak(raw).hex()
+    tx_dict = tx.as_dict()
+    assert (tx_dict["nonce"], tx_dict["to"], tx_dict["value"], tx_dict["gas"]) == (
+        7,
+        HexBytes(WALLET.value),
+        1000,
+        21_000,
+    )
+    assert (tx_dict["maxFeePerGas"], tx_dict["maxPriorityFeePerGas"]) == (113, 12)
+    assert (replacement.sender, replacement.nonce, replacement.fees) == (sender.checksum_address, 7, GasFees(113, 12))
+    replacing_service.nonce_manager.allocate.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "error,released",
+    [
+        (ValueError("insufficient funds for gas * price + value"), True),
+        (requests.ReadTimeout("read timed out"), False),
+        (requests.ConnectionError("connection reset by peer"), False),
+    ],
+)
+def test_send_funds_nonce_on_error(replacing_service, error, released):
+    service = replacing_service
+    service.web3.eth.get_balance.return_value = 10**18
+    service.web3.eth.send_raw_transaction.side_effect = error
+
+    with pytest.raises(type(error)):
+        service.send_funds(WALLET, TokenAmount(1000))
+
+    # a send which may have reached the node keeps its nonce, the counter is resynced instead
+    address = service.account_pool.accounts[0].address
+    assert service.nonce_manager.release.call_args_list == ([((address, 7),)] if released else [])
+    assert service.nonce_manager.abandon.call_args_list == ([] if released else [((address, 7),)])
+
+
+def test_replace_transaction_of_unknown_account(replacing_service):
+    with pytest.raises(ValueError, match="not configured"):
+        replacing_service.sign_replacement([(WALLET, TokenAmount(1000))], WALLET, nonce=7, fees=GasFees(100, 10))
@@ -0,0 +1,171 @@
+from functools import partial
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from apps.blockchain.application.services.nonce_manager import NonceManager
+from apps.blockchain.domain.entities import CooldownState, FaucetTransaction, PendingTransaction
+from apps.blockchain.domain.repository import ICooldownRepository, IFaucetTransactionsRepository
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id, RequiredId
+
+
+class InMemoryFaucetTransactionsRepository(IFaucetTransactionsRepository):
+    def __init__(self):
+        self.transactions: dict[RequiredId, FaucetTransaction] = {}
+        self.replaced_hashes: dict[RequiredId, list[TransactionHash]] = {}
+        # attempts and the next check time of checked pending transactions
+        self.checks: dict[RequiredId, tuple[int, DomainDateTime]] = {}
+        self.updates = 0
+
+    def create(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
+        faucet_transaction.id = RequiredId(len(self.transactions) + 1)
+        self.transactions[faucet_transaction.pk] = faucet_transaction
+        return faucet_transaction
+
+    def update(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
+        self.transactions[faucet_transaction.pk] = faucet_transaction
+        self.updates += 1
+        return faucet_transaction
+
+    def update_statuses(
+        self, statuses: dict[Id, TransactionStatus], mined_hashes: dict[Id, TransactionHash] | None = None
+    ) -> None:
+        for pk, status in statuses.items():
+            self.transactions[RequiredId(pk)].status = status
+        for pk, tx_hash in (mined_hashes or {}).items():
+            self.transactions[RequiredId(pk)].tx_hash = tx_hash
+        self.updates += 1
+
+    def get_by_id(self, transaction_id: Id) -> FaucetTransaction | None:
+        return self.transactions.get(RequiredId(transaction_id)) if transaction_id else None
+
+    def get_cooldown_state(self, ip_address: str, wallet_address: str, since: DomainDateTime) -> CooldownState:
+        txs = [tx for tx in self.transactions.values() if tx.created_at >= since]
+        ip_times = [tx.created_at for tx in txs if tx.ip_address.value == ip_address]
+        wallet_times = [tx.created_at for tx in txs if tx.wallet.value == wallet_address]
+        return CooldownState(
+            last_ip_tx_at=max(ip_times, key=lambda dt: dt.dt) if ip_times else None,
+            last_wallet_tx_at=max(wallet_times, key=lambda dt: dt.dt) if wallet_times else None,
+        )
+
+    def get_pending_transactions(self) -> list[FaucetTransaction]:
+        return [tx for tx in self.transactions.values() if tx.status == TransactionStatus.PENDING]
+
+    def iter_pending_transactions(
+        self, chunk_size: int, due_before: DomainDateTime | None = None
+    ) -> Iterator[PendingTransaction]:
+        for tx in self.get_pending_transactions():
+            next_check = self.checks.get(tx.pk)
+            if tx.tx_hash and (due_before is None or next_check is None or next_check[1] <= due_before):
+                yield self._pending(tx)
+
+    def count_pending_transactions(self) -> int:
+        return len(self.get_pending_transactions())
+
+    def get_pending_by_hashes(self, tx_hashes: set[TransactionHash]) -> list[PendingTransaction]:
+        pending = [self._pending(tx) for tx in self.get_pending_transactions() if tx.tx_hash]
+        return [tx for tx in pending if set(tx.hashes) & tx_hashes]
+
+    def schedule_checks(self, checks: dict[Id, tuple[int, DomainDateTime]]) -> None:
+        for pk, check in checks.items():
+            self.checks[RequiredId(pk)] = check
+
+    def _pending(self, tx: FaucetTransaction) -> PendingTransaction:
+        attempts = self.checks[tx.pk][0] if tx.pk in self.checks else 0
+        return PendingTransaction(
+            id=tx.id,
+            tx_hash=tx.tx_hash,  # type: ignore
+            replaced_hashes=tuple(self.replaced_hashes.get(tx.pk, ())),
+            attempts=attempts,
+        )
+
+    def get_stuck_transactions(
+        self, broadcast_before: DomainDateTime, max_replacements: int, limit: int
+    ) -> list[FaucetTransaction]:
+        stuck_hashes = {
+            tx.tx_hash
+            for tx in self.get_pending_transactions()
+            if tx.nonce is not None
+            and tx.broadcast_at is not None
+            and tx.broadcast_at < broadcast_before
+            and tx.replacements < max_replacements
+        }
+        return [tx for tx in self.get_pending_transactions() if tx.tx_hash in stuck_hashes]
+
+    def save_replacement(self, transactions: list[FaucetTransaction], replaced_tx_hash: TransactionHash) -> None:
+        for tx in transactions:
+            tx.replacements += 1
+            self.transactions[tx.pk] = tx
+            self.replaced_hashes.setdefault(tx.pk, []).append(replaced_tx_hash)
+            self.checks.pop(tx.pk, None)
+
+    def claim_queued_transactions(self, limit: int) -> list[FaucetTransaction]:
+        claimed = [tx for tx in self.transactions.values() if tx.status == TransactionStatus.QUEUED][:limit]
+        for tx in claimed:
+            tx.status = TransactionStatus.SENDING
+        return claimed
+
+    def cnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]:
+        txs = [tx for tx in self.transactions.values() if tx.created_at >= since_dt]
+        return (
+            sum(tx.status == TransactionStatus.SUCCESS for tx in txs),
+            sum(
+                tx.status in (TransactionStatus.PENDING, TransactionStatus.QUEUED, TransactionStatus.SENDING)
+                for tx in txs
+            ),
+            sum(tx.status == TransactionStatus.FAILED for tx in txs),
+        )
+
+    async def acreate(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
+        return self.create(faucet_transaction)
+
+    async def aget_cooldown_state(self, ip_address: str, wallet_address: str, since: DomainDateTime) -> CooldownState:
+        return self.get_cooldown_state(ip_address, wallet_address, since)
+
+    async def acnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]:
+        return self.cnt_stats(since_dt)
+
+
+class InMemoryCooldownRepository(ICooldownRepository):
+    def __init__(self):
+        self.reservations: dict[str, tuple[str, DomainDateTime]] = {}
+
+    def reserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]:
+        now = DomainDateTime.now()
+        claimed = {slot for slot in slots if slot not in self.reservations or self.reservations[slot][1] <= now}
+        self.reservations.update((slot, (token, until)) for slot in claimed)
+        return claimed
+
+    def release(self, slots: list[str], token: str) -> None:
+        for slot in slots:
+            if slot in self.reservations and self.reservations[slot][0] == token:
+                del self.reservations[slot]
+
+    async def areserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]:
+        return self.reserve(slots, token, until)
+
+    async def arelease(self, slots: list[str], token: str) -> None:
+        self.release(slots, token)
+
+
+@pytest.fixture
+def nonce_manager():
+    # counter calls are recorded, errors of a send are handled like by the real manager
+    nonce_manager = Mock(spec=NonceManager)
+    nonce_manager.allocate.return_value = 7
+    nonce_manager.send_failed.side_effect = partial(NonceManager.send_failed, nonce_manager)
+    nonce_manager.resync_if_behind.side_effect = partial(NonceManager.resync_if_behind, nonce_manager)
+    return nonce_manager
+
+
+@pytest.fixture
+def faucet_repository():
+    return InMemoryFaucetTransactionsRepository()
+
+
+@pytest.fixture
+def cooldown_repository():
+    return InMemoryCooldownRepository()
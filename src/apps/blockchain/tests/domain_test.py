@@ -4,6 +4,7 @@ from web3 import Web3
 
 from apps.blockchain.domain.entities import FaucetTransaction
 from apps.blockchain.domain.value_objects import (
+    GasFees,
     IPAddress,
     TokenAmount,
     TransactionHash,
@@ -36,6 +37,16 @@ class TestWalletAddress:
         wallet = WalletAddress(lowercase_address)
         assert wallet.value == Web3.to_checksum_address(lowercase_address)
 
+    def test_wrong_checksum_is_checksummed(self):
+        # accepted as by Web3.is_address
+        wallet = WalletAddress(VALID_WALLET.replace("Cc", "cC"))
+        assert wallet.value == VALID_WALLET
+
+    def test_trusted_wallet_address(self):
+        wallet = WalletAddress.from_trusted(VALID_WALLET)
+        assert wallet == WalletAddress(VALID_WALLET)
+        assert wallet.checksum_address == VALID_WALLET
+
 
 class TestTransactionHash:
     def test_valid_transaction_hash(self):
@@ -50,6 +61,14 @@ class TestTransactionHash:
     def test_transaction_hash_bytes_property(self):
         tx_hash = TransactionHash(VALID_TX_HASH)
         assert isinstance(tx_hash.bytes, HexBytes)
+        assert tx_hash.bytes == HexBytes(VALID_TX_HASH)
+        assert tx_hash.bytes is tx_hash.bytes
+
+    def test_trusted_transaction_hash(self):
+        tx_hash = TransactionHash.from_trusted(VALID_TX_HASH)
+        assert tx_hash == TransactionHash(VALID_TX_HASH)
+        assert hash(tx_hash) == hash(TransactionHash(VALID_TX_HASH))
+        assert tx_hash.bytes == HexBytes(VALID_TX_HASH)
 
 
 class TestIPAddress:
@@ -72,6 +91,12 @@ class TestIPAddress:
         ip = IPAddress(VALID_IP)
         assert isinstance(ip.to_int(), int)
 
+    def test_trusted_ip_address(self):
+        ip = IPAddress.from_trusted(VALID_IP)
+        assert ip == IPAddress(VALID_IP)
+        assert ip.to_int() == IPAddress(VALID_IP).to_int()
+        assert ip.version == 4
+
 
 class TestTokenAmount:
     def test_valid_token_amount_from_wei(self):
@@ -104,13 +129,27 @@ class TestTransactionStatus:
         assert TransactionStatus.SUCCESS.value == "success"
         assert TransactionStatus.FAILED.value == "failed"
         assert TransactionStatus.PENDING.value == "pending"
+        assert TransactionStatus.QUEUED.value == "queued"
+        assert TransactionStatus.SENDING.value == "sending"
 
     def test_transaction_status_choices(self):
         choices = TransactionStatus.choices()
-        assert len(choices) == 3
+        assert len(choices) == 5
         assert ("success", "SUCCESS") in choices
         assert ("failed", "FAILED") in choices
         assert ("pending", "PENDING") in choices
+        assert ("queued", "QUEUED") in choices
+        assert ("sending", "SENDING") in choices
+
+
+class TestGasFees:
+    def test_replacement_bumps_both_fees(self):
+        fees = GasFees(max_fee_per_gas=100, max_priority_fee_per_gas=10)
+        assert fees.replacement(GasFees(50, 5), bump_percent=10) == GasFees(111, 12)
+
+    def test_replacement_uses_higher_current_fees(self):
+        fees = GasFees(max_fee_per_gas=100, max_priority_fee_per_gas=10)
+        assert fees.replacement(GasFees(300, 30), bump_percent=10) == GasFees(300, 30)
 
 
 class TestFaucetTransaction:
@@ -126,6 +165,7 @@ class TestFaucetTransaction:
         )
 
         assert isinstance(tx.created_at, DomainDateTime)
+        assert tx.tx_hash is not None
         assert tx.tx_hash.value == VALID_TX_HASH.lower()
         assert tx.status == TransactionStatus.PENDING
         assert tx.ip_address.value == VALID_IP
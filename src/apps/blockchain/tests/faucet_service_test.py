@@ -0,0 +1,346 @@
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock, Mock, call
+
+import pytest
+
+from apps.blockchain.application.exceptions import (
+    FaucetOutOfFundsError,
+    TooManyTransactionsFromIpError,
+    TooManyTransactionsFromWalletError,
+)
+from apps.blockchain.application.services.blockchain_service import SentTransaction
+from apps.blockchain.application.services.faucet_sender_service import FaucetSenderService
+from apps.blockchain.application.services.faucet_service import FaucetService
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
+from apps.shared.cache import TTLCache
+from apps.shared.shared_memory_cache import SharedExpiryCache
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
+from base.exceptions import BaseNotFoundError, BaseValidationError
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+OTHER_WALLET = "0x0000000000000000000000000000000000000001"
+CONTRACT_WALLET = "0x0000000000000000000000000000000000000002"
+BATCH_TX_HASH = "0x" + "ab" * 32
+TX_HASH = "0x9fc76417374aa880d4449a1f7f31ec597f00b1f6f3dd2d66f4c9c6c445836d8b"
+SENDER = "0x00000000000000000000000000000000000000fa"
+
+
+@pytest.fixture
+def blockchain_service():
+    service = Mock()
+    service.send_funds.return_value = SentTransaction(tx_hash=TX_HASH, sender=SENDER)
+    service.supports_batches = False
+    return service
+
+
+@pytest.fixture
+def faucet_service(blockchain_service, faucet_repository, cooldown_repository):
+    return FaucetService(
+        blockchain_service=blockchain_service,
+        faucet_transactions_repository=faucet_repository,
+        threshold_timeout_minutes=1,
+        amount_eth="0.0001",
+        cooldown_repository=cooldown_repository,
+    )
+
+
+@pytest.fixture
+def cached_faucet_service(blockchain_service, faucet_repository, tmp_path):
+    return FaucetService(
+        blockchain_service=blockchain_service,
+        faucet_transactions_repository=faucet_repository,
+        threshold_timeout_minutes=1,
+        amount_eth="0.0001",
+        cooldown_cache=SharedExpiryCache(str(tmp_path / "cooldowns"), slots=16),
+    )
+
+
+@pytest.fixture
+def sender_service(blockchain_service, faucet_repository):
+    return FaucetSenderService(
+        blockchain_service=blockchain_service,
+        faucet_transactions_repository=faucet_repository,
+        loop_timeout_seconds=0,
+    )
+
+
+def test_fund_wallet(faucet_service, blockchain_service, faucet_repository):
+    dto = faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    assert dto.tx_hash == TX_HASH
+    [transaction] = faucet_repository.transactions.values()
+    assert transaction.sender.value == SENDER
+    blockchain_service.send_funds.assert_called_once()
+
+
+def test_fund_wallet_cooldown(faucet_service, blockchain_service):
+    faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    with pytest.raises(TooManyTransactionsFromIpError):
+        faucet_service.fund_wallet(OTHER_WALLET, "127.0.0.1")
+    with pytest.raises(TooManyTransactionsFromWalletError):
+        faucet_service.fund_wallet(WALLET, "127.0.0.2")
+    assert blockchain_service.send_funds.call_count == 1
+
+
+def test_cooldown_cache_skips_repository(cached_faucet_service, faucet_repository, monkeypatch):
+    cached_faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    monkeypatch.setattr(faucet_repository, "get_cooldown_state", Mock())
+
+    with pytest.raises(TooManyTransactionsFromIpError):
+        cached_faucet_service.fund_wallet(OTHER_WALLET, "127.0.0.1")
+    with pytest.raises(TooManyTransactionsFromWalletError):
+        cached_faucet_service.fund_wallet(WALLET, "127.0.0.2")
+    faucet_repository.get_cooldown_state.assert_not_called()
+
+
+def test_cooldown_cache_miss_falls_back_to_repository(cached_faucet_service, faucet_service):
+    # the payout is made by a service of another host, the local cache knows nothing about it
+    faucet_service.fund_wallet(WALLET, "127.0.0.1")
+
+    with pytest.raises(TooManyTransactionsFromIpError):
+        cached_faucet_service.fund_wallet(OTHER_WALLET, "127.0.0.1")
+    assert cached_faucet_service.cooldown_cache.get("ip:127.0.0.1") is not None
+
+
+def test_cooldown_rejections_reported(cached_faucet_service):
+    cached_faucet_service.metrics = Mock()
+    cached_faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    with pytest.raises(TooManyTransactionsFromIpError):
+        cached_faucet_service.fund_wallet(OTHER_WALLET, "127.0.0.1")
+    cached_faucet_service.cooldown_cache = None
+    with pytest.raises(TooManyTransactionsFromWalletError):
+        cached_faucet_service.fund_wallet(WALLET, "127.0.0.2")
+
+    assert cached_faucet_service.metrics.increment.call_args_list == [
+        call("cooldown_rejections", reason="ip", source="cache"),
+        call("cooldown_rejections", reason="wallet", source="database"),
+    ]
+    outcomes = [kwargs["outcome"] for _, _, kwargs in cached_faucet_service.metrics.observe.mock_calls]
+    assert outcomes == ["sent", "rejected", "rejected"]
+
+
+def test_parallel_request_rejected_during_payout(faucet_service, blockchain_service):
+    def send_funds(wallet, amount):
+        # the second request of the wallet comes before the first one has saved its transaction
+        with pytest.raises(TooManyTransactionsFromWalletError):
+            faucet_service.fund_wallet(WALLET, "127.0.0.2")
+        return SentTransaction(tx_hash=TX_HASH, sender=SENDER)
+
+    blockchain_service.send_funds.side_effect = send_funds
+    faucet_service.fund_wallet(WALLET, "127.0.0.1")
+
+    assert blockchain_service.send_funds.call_count == 1
+    assert faucet_service.cooldown_repository.reservations == {}
+
+
+def test_rejected_reservation_frees_claimed_slots(faucet_service, cooldown_repository, blockchain_service):
+    cooldown_repository.reserve(["wallet:" + WALLET], "other", DomainDateTime.now() + timedelta(minutes=1))
+
+    with pytest.raises(TooManyTransactionsFromWalletError):
+        faucet_service.fund_wallet(WALLET, "127.0.0.1")
+
+    assert list(cooldown_repository.reservations) == ["wallet:" + WALLET]
+    blockchain_service.send_funds.assert_not_called()
+
+
+def test_failed_payout_releases_reservation(faucet_service, blockchain_service, cooldown_repository):
+    blockchain_service.send_funds.side_effect = [ValueError("node is down"), SentTransaction(TX_HASH, SENDER)]
+
+    with pytest.raises(BaseValidationError, match="node is down"):
+        faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    assert cooldown_repository.reservations == {}
+
+    assert faucet_service.fund_wallet(WALLET, "127.0.0.1").tx_hash == TX_HASH
+
+
+def test_out_of_funds_not_wrapped(faucet_service, blockchain_service, cooldown_repository):
+    blockchain_service.send_funds.side_effect = FaucetOutOfFundsError(10**18)
+
+    with pytest.raises(FaucetOutOfFundsError):
+        faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    assert cooldown_repository.reservations == {}
+
+
+def test_expired_reservation_taken_over(faucet_service, cooldown_repository):
+    # left by a worker which crashed during the payout
+    cooldown_repository.reserve(["ip:127.0.0.1"], "crashed", DomainDateTime.now() - timedelta(seconds=1))
+
+    assert faucet_service.fund_wallet(WALLET, "127.0.0.1").tx_hash == TX_HASH
+
+
+def test_stats_cached(faucet_service, faucet_repository, monkeypatch):
+    faucet_service.stats_cache = TTLCache(ttl_seconds=60)
+    faucet_service.fund_wallet(WALLET, "127.0.0.1")
+    cnt_stats = Mock(wraps=faucet_repository.cnt_stats)
+    monkeypatch.setattr(faucet_repository, "cnt_stats", cnt_stats)
+
+    assert faucet_service.get_stats().total_pending == 1
+    faucet_service.fund_wallet(OTHER_WALLET, "127.0.0.2")
+    assert faucet_service.get_stats().total_pending == 1
+    cnt_stats.assert_called_once()
+
+
+def test_afund_wallet(faucet_service, blockchain_service):
+    faucet_service.async_blockchain_service = Mock(
+        send_funds=AsyncMock(return_value=SentTransaction(tx_hash=TX_HASH, sender=SENDER))
+    )
+
+    dto = asyncio.run(faucet_service.afund_wallet(WALLET, "127.0.0.1"))
+
+    assert dto.tx_hash == TX_HASH
+    blockchain_service.send_funds.assert_not_called()
+    with pytest.raises(TooManyTransactionsFromWalletError):
+        asyncio.run(faucet_service.afund_wallet(WALLET, "127.0.0.2"))
+    assert asyncio.run(faucet_service.aget_stats()).total_pending == 1
+
+
+def test_afund_wallet_rejected_during_payout(faucet_service, cooldown_repository):
+    faucet_service.async_blockchain_service = Mock(
+        send_funds=AsyncMock(return_value=SentTransaction(tx_hash=TX_HASH, sender=SENDER))
+    )
+    cooldown_repository.reserve(["ip:127.0.0.1"], "other", DomainDateTime.now() + timedelta(minutes=1))
+
+    with pytest.raises(TooManyTransactionsFromIpError):
+        asyncio.run(faucet_service.afund_wallet(WALLET, "127.0.0.1"))
+    assert list(cooldown_repository.reservations) == ["ip:127.0.0.1"]
+    faucet_service.async_blockchain_service.send_funds.assert_not_called()
+
+
+def test_enqueue_funding_does_not_send(faucet_service, blockchain_service):
+    dto = faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+
+    assert dto.status == TransactionStatus.QUEUED.value
+    assert dto.tx_hash is None
+    assert faucet_service.get_request(dto.id) == dto
+    blockchain_service.send_funds.assert_not_called()
+
+
+def test_enqueue_funding_cooldown(faucet_service):
+    faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+    with pytest.raises(TooManyTransactionsFromIpError):
+        faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.1")
+
+
+def test_get_unknown_request(faucet_service):
+    with pytest.raises(BaseNotFoundError):
+        faucet_service.get_request("100")
+
+
+def test_sender_sends_queued_in_order(faucet_service, sender_service, blockchain_service):
+    first = faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+    second = faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.2")
+
+    assert sender_service.send_queued() == 2
+
+    sent_to = [call.args[0].value for call in blockchain_service.send_funds.call_args_list]
+    assert sent_to == [WALLET, OTHER_WALLET]
+    for request in (first, second):
+        dto = faucet_service.get_request(request.id)
+        assert dto.status == TransactionStatus.PENDING.value
+        assert dto.tx_hash == TransactionHash(TX_HASH).value
+    assert sender_service.send_queued() == 0
+
+
+def test_sender_marks_failed_requests(faucet_service, sender_service, blockchain_service):
+    request = faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+    blockchain_service.send_funds.side_effect = ValueError("insufficient funds")
+
+    sender_service.send_queued()
+
+    dto = faucet_service.get_request(request.id)
+    assert dto.status == TransactionStatus.FAILED.value
+    assert dto.tx_hash is None
+
+
+def test_sender_never_sends_claimed_request_again(faucet_service, sender_service, blockchain_service, monkeypatch):
+    faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+    monkeypatch.setattr(
+        sender_service.faucet_transactions_repository, "update", Mock(side_effect=RuntimeError("connection lost"))
+    )
+
+    assert sender_service.send_queued() == 1
+    assert sender_service.send_queued() == 0
+
+    # the request was paid but not saved, it isn't queued anymore
+    blockchain_service.send_funds.assert_called_once()
+
+
+def test_sender_marks_every_failed_request(faucet_service, sender_service, blockchain_service, faucet_repository):
+    blockchain_service.send_funds.side_effect = ValueError("insufficient funds")
+    requests = [
+        faucet_service.enqueue_funding(WALLET, "127.0.0.1"),
+        faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.2"),
+    ]
+    update = faucet_repository.update
+    saved = []
+
+    def flaky_update(transaction):
+        saved.append(transaction.pk)
+        if len(saved) == 1:
+            raise RuntimeError("connection lost")
+        return update(transaction)
+
+    faucet_repository.update = flaky_update
+
+    # an error saving one request doesn't leave the rest of the claimed ones in sending
+    assert sender_service.send_queued() == 2
+    assert len(saved) == 2
+    assert faucet_service.get_request(requests[1].id).status == TransactionStatus.FAILED.value
+
+
+def test_sender_batches_eoa_recipients(faucet_service, sender_service, blockchain_service, faucet_repository):
+    blockchain_service.supports_batches = True
+    blockchain_service.send_batch.return_value = SentTransaction(tx_hash=BATCH_TX_HASH, sender=SENDER)
+    blockchain_service.is_contract.side_effect = lambda wallet: wallet.value == CONTRACT_WALLET
+    first = faucet_service.enqueue_funding(WALLET, "127.0.0.1")
+    second = faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.2")
+    contract = faucet_service.enqueue_funding(CONTRACT_WALLET, "127.0.0.3")
+
+    assert sender_service.send_queued() == 3
+
+    payouts = blockchain_service.send_batch.call_args.args[0]
+    assert [wallet.value for wallet, _ in payouts] == [WALLET, OTHER_WALLET]
+    assert faucet_service.get_request(first.id).tx_hash == BATCH_TX_HASH
+    assert faucet_service.get_request(second.id).tx_hash == BATCH_TX_HASH
+    assert faucet_repository.get_by_id(Id(first.id)).sender.value == SENDER
+    blockchain_service.send_funds.assert_called_once()
+    assert faucet_service.get_request(contract.id).tx_hash == TransactionHash(TX_HASH).value
+
+
+def test_sender_pays_alone_when_code_check_fails(faucet_service, sender_service, blockchain_service):
+    def is_contract(wallet):
+        if wallet.value != CONTRACT_WALLET:
+            raise ConnectionError("node is down")
+        return True
+
+    blockchain_service.supports_batches = True
+    blockchain_service.is_contract.side_effect = is_contract
+    requests = [
+        faucet_service.enqueue_funding(WALLET, "127.0.0.1"),
+        faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.2"),
+        faucet_service.enqueue_funding(CONTRACT_WALLET, "127.0.0.3"),
+    ]
+
+    assert sender_service.send_queued() == 3
+
+    # no claimed request is left in sending
+    blockchain_service.send_batch.assert_not_called()
+    assert blockchain_service.send_funds.call_count == 3
+    assert {faucet_service.get_request(r.id).status for r in requests} == {TransactionStatus.PENDING.value}
+
+
+def test_sender_marks_failed_batch(faucet_service, sender_service, blockchain_service):
+    blockchain_service.supports_batches = True
+    blockchain_service.is_contract.return_value = False
+    blockchain_service.send_batch.side_effect = ValueError("insufficient funds")
+    requests = [
+        faucet_service.enqueue_funding(WALLET, "127.0.0.1"),
+        faucet_service.enqueue_funding(OTHER_WALLET, "127.0.0.2"),
+    ]
+
+    sender_service.send_queued()
+
+    # no claimed request is left in sending
+    assert {faucet_service.get_request(r.id).status for r in requests} == {TransactionStatus.FAILED.value}
+    blockchain_service.send_funds.assert_not_called()
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from apps.blockchain.application.services import fee_oracle as fee_oracle_module
+from apps.blockchain.application.services.fee_oracle import FeeOracle
+from apps.blockchain.domain.value_objects import GasFees
+
+
+class FakeEth:
+    def __init__(self):
+        self.calls = 0
+        self.error: Exception | None = None
+        self.max_priority_fee = 7
+
+    def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {"baseFeePerGas": [100, 110, 120], "reward": [[1], [3], [2]]}
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(fee_oracle_module, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def web3():
+    return FakeWeb3()
+
+
+def test_fees_from_fee_history(web3):
+    oracle = FeeOracle(ttl_seconds=10, max_stale_seconds=60)
+    fees = oracle.get_fees(web3)  # type: ignore
+    assert fees == GasFees(max_fee_per_gas=120 * 2 + 2, max_priority_fee_per_gas=2)
+
+
+def test_empty_blocks_use_node_priority_fee(web3):
+    web3.eth.fee_history = lambda *args: {"baseFeePerGas": [100], "reward": [[0], [0]]}
+    fees = FeeOracle(ttl_seconds=10, max_stale_seconds=60).get_fees(web3)  # type: ignore
+    assert fees.max_priority_fee_per_gas == 7
+
+
+def test_fees_cached_until_ttl(web3, clock):
+    oracle = FeeOracle(ttl_seconds=10, max_stale_seconds=60)
+    oracle.get_fees(web3)  # type: ignore
+    clock[0] += 5
+    oracle.get_fees(web3)  # type: ignore
+    assert web3.eth.calls == 1
+
+    clock[0] += 10
+    oracle.get_fees(web3)  # type: ignore
+    assert web3.eth.calls == 2
+
+
+def test_stale_fees_used_while_node_is_not_available(web3, clock):
+    oracle = FeeOracle(ttl_seconds=10, max_stale_seconds=60)
+    fees = oracle.get_fees(web3)  # type: ignore
+
+    web3.eth.error = ConnectionError("node is down")
+    clock[0] += 30
+    assert oracle.get_fees(web3) == fees  # type: ignore
+
+    clock[0] += 60
+    with pytest.raises(ConnectionError):
+        oracle.get_fees(web3)  # type: ignore
+
+
+class FakeAsyncEth:
+    def __init__(self):
+        self.calls = 0
+
+    async def fee_history(self, block_count, newest_block, reward_percentiles):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return {"baseFeePerGas": [100, 110, 120], "reward": [[1], [3], [2]]}
+
+
+def test_async_fees_refreshed_once_for_concurrent_requests():
+    web3 = Mock(eth=FakeAsyncEth())
+    oracle = FeeOracle(ttl_seconds=10, max_stale_seconds=60)
+
+    async def get_fees_concurrently():
+        return await asyncio.gather(*(oracle.aget_fees(web3) for _ in range(5)))
+
+    fees = asyncio.run(get_fees_concurrently())
+
+    assert set(fees) == {GasFees(max_fee_per_gas=120 * 2 + 2, max_priority_fee_per_gas=2)}
+    assert web3.eth.calls == 1
@@ -0,0 +1,114 @@
+import pytest
+
+from apps.blockchain.application.services.nonce_manager import NonceManager
+from apps.blockchain.application.services.transactions import is_nonce_too_low_error
+from apps.blockchain.domain.repository import INonceRepository
+
+ADDRESS = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+class InMemoryNonceRepository(INonceRepository):
+    def __init__(self):
+        self.nonces: dict[str, int] = {}
+
+    def allocate(self, address: str) -> int | None:
+        if address not in self.nonces:
+            return None
+        nonce = self.nonces[address]
+        self.nonces[address] = nonce + 1
+        return nonce
+
+    def release(self, address: str, nonce: int) -> bool:
+        if self.nonces.get(address) != nonce + 1:
+            return False
+        self.nonces[address] = nonce
+        return True
+
+    def set_next_nonce(self, address: str, nonce: int, only_forward: bool = False) -> None:
+        if only_forward and self.nonces.get(address, -1) > nonce:
+            return
+        self.nonces[address] = nonce
+
+
+@pytest.fixture
+def repository():
+    return InMemoryNonceRepository()
+
+
+@pytest.fixture
+def manager(repository):
+    return NonceManager(repository)
+
+
+def test_allocate_requires_sync(manager):
+    assert manager.needs_sync(ADDRESS)
+    assert manager.allocate(ADDRESS) is None
+
+
+def test_allocate_sequential_nonces(manager):
+    manager.sync(ADDRESS, 5)
+    assert [manager.allocate(ADDRESS) for _ in range(3)] == [5, 6, 7]
+
+
+def test_sync_does_not_move_back_without_force(manager, repository):
+    repository.nonces[ADDRESS] = 10
+    manager.sync(ADDRESS, 7)
+    assert manager.allocate(ADDRESS) == 10
+
+
+def test_release_last_nonce(manager):
+    manager.sync(ADDRESS, 1)
+    nonce = manager.allocate(ADDRESS)
+    manager.release(ADDRESS, nonce)
+    assert not manager.needs_sync(ADDRESS)
+    assert manager.allocate(ADDRESS) == nonce
+
+
+def test_release_with_gap_forces_resync(manager):
+    manager.sync(ADDRESS, 1)
+    first = manager.allocate(ADDRESS)
+    manager.allocate(ADDRESS)
+
+    manager.release(ADDRESS, first)
+    assert manager.needs_sync(ADDRESS)
+
+    # the node knows nothing about nonces after the gap, so counter goes back
+    manager.sync(ADDRESS, first)
+    assert manager.allocate(ADDRESS) == first
+
+
+def test_abandoned_nonce_not_reused_when_broadcasted(manager):
+    manager.sync(ADDRESS, 1)
+    nonce = manager.allocate(ADDRESS)
+
+    manager.abandon(ADDRESS, nonce)
+    assert manager.needs_sync(ADDRESS)
+
+    # the node got the transaction, its pending nonce is past it
+    manager.sync(ADDRESS, nonce + 1)
+    assert manager.allocate(ADDRESS) == nonce + 1
+
+
+def test_abandoned_nonce_reused_when_lost(manager):
+    manager.sync(ADDRESS, 1)
+    nonce = manager.allocate(ADDRESS)
+    manager.allocate(ADDRESS)
+
+    manager.abandon(ADDRESS, nonce)
+
+    # the node never saw it, the counter goes back so no gap is left
+    manager.sync(ADDRESS, nonce)
+    assert manager.allocate(ADDRESS) == nonce
+
+
+@pytest.mark.parametrize(
+    "message,expected",
+    [
+        ("nonce too low: next nonce 5, tx nonce 4", True),
+        ("OldNonce, Current nonce: 5, nonce of rejected tx: 4", True),
+        ("replacement transaction underpriced", True),
+        ("insufficient funds for gas * price + value", False),
+    ],
+)
+def test_is_nonce_too_low_error(message, expected):
+    assert is_nonce_too_low_error(ValueError(message)) == expected
@@ -0,0 +1,360 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from apps.blockchain.application.services.blockchain_service import SignedReplacement
+from apps.blockchain.application.services.tx_status_checker_service import TxStatusCheckerService
+from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.repository import IFaucetTransactionsRepository
+from apps.blockchain.domain.value_objects import (
+    GasFees,
+    IPAddress,
+    TokenAmount,
+    TransactionHash,
+    TransactionStatus,
+    WalletAddress,
+)
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+OTHER_WALLET = "0x0000000000000000000000000000000000000001"
+SENDER = "0x00000000000000000000000000000000000000fa"
+FEES = GasFees(max_fee_per_gas=100, max_priority_fee_per_gas=10)
+
+
+def tx_hash(n: int) -> TransactionHash:
+    return TransactionHash(f"0x{n:064x}")
+
+
+class FakeBlockchainService:
+    def __init__(self):
+        self.head = 100
+        self.blocks: dict[int, set[TransactionHash]] = {}
+        self.receipts: dict[TransactionHash, TransactionStatus] = {}
+        self.checked: list[set[TransactionHash]] = []
+        self.fetched_blocks: list[int] = []
+        self.replaced: list[tuple[list, int]] = []
+        self.replace_error: Exception | None = None
+        self.send_error: Exception | None = None
+        self.sent: list[TransactionHash] = []
+        # hashes whose receipt request fails
+        self.errors: set[TransactionHash] = set()
+
+    def mine(self, *hashes: TransactionHash, status=TransactionStatus.SUCCESS):
+        self.head += 1
+        self.blocks[self.head] = set(hashes)
+        for h in hashes:
+            self.receipts[h] = status
+
+    def get_block_number(self) -> int:
+        return self.head
+
+    def get_blocks_transaction_hashes(self, block_numbers):
+        block_numbers = list(block_numbers)
+        self.fetched_blocks.extend(block_numbers)
+        return {number: self.blocks.get(number, set()) for number in block_numbers}
+
+    def get_transaction_statuses(self, tx_hashes):
+        tx_hashes = set(tx_hashes)
+        self.checked.append(tx_hashes)
+        return {h: self.receipts.get(h, TransactionStatus.PENDING) for h in tx_hashes if h not in self.errors}
+
+    def sign_replacement(self, payouts, sender, nonce, fees):
+        if self.replace_error:
+            raise self.replace_error
+        self.replaced.append((payouts, nonce))
+        return SignedReplacement(
+            tx_hash=tx_hash(1000 + len(self.replaced)).value,
+            sender=sender.value,
+            nonce=nonce,
+            fees=fees,
+            raw_transaction=b"",
+            max_cost=0,
+        )
+
+    def send_replacement(self, replacement):
+        if self.send_error:
+            raise self.send_error
+        self.sent.append(TransactionHash(replacement.tx_hash))
+
+
+@pytest.fixture
+def blockchain():
+    return FakeBlockchainService()
+
+
+@pytest.fixture
+def checker(blockchain, faucet_repository):
+    return TxStatusCheckerService(blockchain, faucet_repository, loop_timeout_seconds=0, max_blocks_behind=10)  # type: ignore
+
+
+@pytest.fixture
+def replacing_checker(blockchain, faucet_repository):
+    return TxStatusCheckerService(blockchain, faucet_repository, loop_timeout_seconds=0, stuck_after_seconds=60)  # type: ignore
+
+
+def add_pending(
+    repository: IFaucetTransactionsRepository, n: int, age: timedelta | None = None, wallet: str = WALLET
+) -> FaucetTransaction:
+    return repository.create(
+        FaucetTransaction(
+            id=Id(),
+            tx_hash=tx_hash(n),
+            status=TransactionStatus.PENDING,
+            ip_address=IPAddress("127.0.0.1"),
+            wallet=WalletAddress(wallet),
+            amount=TokenAmount(1000),
+            sender=WalletAddress(SENDER),
+            nonce=n,
+            fees=FEES,
+            broadcast_at=DomainDateTime(DomainDateTime.now().dt - age) if age else DomainDateTime.now(),
+        )
+    )
+
+
+def test_first_loop_checks_all_pending(checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1)
+    add_pending(faucet_repository, 2)
+    blockchain.receipts[tx_hash(1)] = TransactionStatus.SUCCESS
+
+    checker.check_transactions()
+
+    assert blockchain.checked == [{tx_hash(1), tx_hash(2)}]
+    assert [tx.tx_hash for tx in faucet_repository.get_pending_transactions()] == [tx_hash(2)]
+
+
+def test_resolved_statuses_saved_at_once(checker, blockchain, faucet_repository):
+    for n in range(1, 4):
+        add_pending(faucet_repository, n)
+        blockchain.receipts[tx_hash(n)] = TransactionStatus.SUCCESS
+
+    checker.check_transactions()
+
+    assert faucet_repository.updates == 1
+    assert not faucet_repository.get_pending_transactions()
+
+
+def test_only_transactions_from_new_blocks_are_checked(checker, blockchain, faucet_repository):
+    for n in range(1, 4):
+        add_pending(faucet_repository, n)
+    checker.check_transactions()
+
+    blockchain.mine(tx_hash(2), tx_hash(99), status=TransactionStatus.FAILED)
+    blockchain.mine()
+    checker.check_transactions()
+
+    assert blockchain.fetched_blocks == [101, 102]
+    assert blockchain.checked[-1] == {tx_hash(2)}
+    pending = {tx.tx_hash for tx in faucet_repository.get_pending_transactions()}
+    assert pending == {tx_hash(1), tx_hash(3)}
+
+
+def test_new_transactions_checked_once(checker, blockchain, faucet_repository):
+    checker.check_transactions()
+
+    add_pending(faucet_repository, 1)
+    checker.check_transactions()
+    checker.check_transactions()
+
+    assert blockchain.checked == [{tx_hash(1)}]
+
+
+def test_mined_transaction_without_receipt_is_checked_again(checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1)
+    checker.check_transactions()
+
+    blockchain.mine(tx_hash(1))
+    del blockchain.receipts[tx_hash(1)]  # node hasn't indexed the receipt yet
+    checker.check_transactions()
+    assert faucet_repository.get_pending_transactions()
+
+    blockchain.receipts[tx_hash(1)] = TransactionStatus.SUCCESS
+    checker.check_transactions()
+    assert not faucet_repository.get_pending_transactions()
+
+
+def test_full_check_when_too_far_behind(checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1)
+    checker.check_transactions()
+
+    blockchain.head += 50
+    checker.check_transactions()
+
+    assert blockchain.fetched_blocks == []
+    assert blockchain.checked[-1] == {tx_hash(1)}
+
+
+def test_pending_transactions_checked_in_chunks(blockchain, faucet_repository):
+    checker = TxStatusCheckerService(blockchain, faucet_repository, loop_timeout_seconds=0, chunk_size=2)  # type: ignore
+    for n in range(1, 6):
+        add_pending(faucet_repository, n)
+        blockchain.receipts[tx_hash(n)] = TransactionStatus.SUCCESS
+
+    checker.check_transactions()
+
+    assert [len(hashes) for hashes in blockchain.checked] == [2, 2, 1]
+    assert faucet_repository.updates == 3
+    assert not faucet_repository.get_pending_transactions()
+
+
+def test_unresolved_checks_backed_off(checker, blockchain, faucet_repository):
+    transaction = add_pending(faucet_repository, 1)
+    add_pending(faucet_repository, 2)
+    blockchain.errors.add(tx_hash(2))
+
+    checker.check_transactions()
+    checker.check_transactions()
+
+    # both are checked once, the RPC error counts as an attempt as well
+    assert blockchain.checked == [{tx_hash(1), tx_hash(2)}]
+    attempts, next_check_at = faucet_repository.checks[transaction.pk]
+    assert attempts == 1
+    assert 4 < (next_check_at.dt - DomainDateTime.now().dt).total_seconds() <= 5
+
+
+def test_due_transactions_checked_with_growing_delays(blockchain, faucet_repository):
+    checker = TxStatusCheckerService(
+        blockchain,  # type: ignore
+        faucet_repository,
+        loop_timeout_seconds=0,
+        backoff_seconds=10,
+        max_backoff_seconds=30,
+    )
+    transaction = add_pending(faucet_repository, 1)
+    delays = []
+    for _ in range(4):
+        # pretend the next check is due
+        attempts, _ = faucet_repository.checks.get(transaction.pk, (0, None))
+        faucet_repository.checks[transaction.pk] = (attempts, DomainDateTime.now())
+        checker.check_transactions()
+        attempts, next_check_at = faucet_repository.checks[transaction.pk]
+        delays.append(round((next_check_at.dt - DomainDateTime.now().dt).total_seconds()))
+
+    assert delays == [10, 20, 30, 30]
+    assert faucet_repository.checks[transaction.pk][0] == 4
+
+
+def test_mined_transaction_checked_before_due(checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1)
+    add_pending(faucet_repository, 2)
+    checker.check_transactions()
+
+    blockchain.mine(tx_hash(1))
+    checker.check_transactions()
+
+    assert blockchain.checked[-1] == {tx_hash(1)}
+    assert [tx.tx_hash for tx in faucet_repository.get_pending_transactions()] == [tx_hash(2)]
+
+
+def test_backlog_reported(checker, blockchain, faucet_repository):
+    checker.metrics = Mock()
+    for n in range(1, 4):
+        add_pending(faucet_repository, n)
+    blockchain.receipts[tx_hash(1)] = TransactionStatus.SUCCESS
+
+    checker.check_transactions()
+
+    checker.metrics.set.assert_any_call("tx_checker_checked_transactions", 3)
+    # the mined one is resolved, the backlog is what is left
+    checker.metrics.set.assert_any_call("pending_transactions", 2)
+    sweep_calls = [c for c in checker.metrics.set.mock_calls if c.args[0] == "tx_checker_sweep_seconds"]
+    assert len(sweep_calls) == 1
+
+
+def test_stuck_transaction_replaced(replacing_checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    add_pending(faucet_repository, 2)
+
+    replacing_checker.check_transactions()
+
+    assert blockchain.replaced == [([(WalletAddress(WALLET), TokenAmount(1000))], 1)]
+    assert blockchain.sent == [tx_hash(1001)]
+    [stuck, recent] = faucet_repository.get_pending_transactions()
+    assert (stuck.tx_hash, stuck.replacements) == (tx_hash(1001), 1)
+    assert faucet_repository.replaced_hashes[stuck.pk] == [tx_hash(1)]
+    assert recent.replacements == 0
+
+
+def test_replacement_saved_before_send(replacing_checker, blockchain, faucet_repository):
+    replacing_checker.metrics = Mock()
+    stuck = add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    blockchain.send_error = TimeoutError()
+
+    replacing_checker.check_transactions()
+
+    # the node may have got it, so the hash is kept and the stuck one is still checked
+    assert (stuck.tx_hash, stuck.replacements) == (tx_hash(1001), 1)
+    assert faucet_repository.replaced_hashes[stuck.pk] == [tx_hash(1)]
+    replacing_checker.metrics.increment.assert_called_once_with("transaction_replacements", outcome="failed")
+
+
+def test_replaced_transaction_resolved_by_any_hash(replacing_checker, blockchain, faucet_repository):
+    add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    replacing_checker.check_transactions()
+
+    # the stuck transaction got mined after all, the replacement is dropped by the node
+    blockchain.mine(tx_hash(1))
+    replacing_checker.check_transactions()
+
+    [transaction] = faucet_repository.transactions.values()
+    assert (transaction.status, transaction.tx_hash) == (TransactionStatus.SUCCESS, tx_hash(1))
+
+
+def test_batch_replaced_once(replacing_checker, blockchain, faucet_repository):
+    first = add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    second = add_pending(faucet_repository, 1, age=timedelta(minutes=5), wallet=OTHER_WALLET)
+
+    replacing_checker.check_transactions()
+
+    assert blockchain.replaced == [
+        ([(WalletAddress(WALLET), TokenAmount(1000)), (WalletAddress(OTHER_WALLET), TokenAmount(1000))], 1)
+    ]
+    assert first.tx_hash == second.tx_hash == tx_hash(1001)
+
+
+def test_replacements_limited(blockchain, faucet_repository):
+    checker = TxStatusCheckerService(
+        blockchain,
+        faucet_repository,
+        loop_timeout_seconds=0,
+        stuck_after_seconds=60,
+        max_replacements=1,  # type: ignore
+    )
+    transaction = add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    checker.check_transactions()
+
+    transaction.broadcast_at = DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=5))
+    checker.check_transactions()
+
+    assert len(blockchain.replaced) == 1
+
+
+def test_failed_replacement_not_retried_every_loop(replacing_checker, blockchain, faucet_repository):
+    replacing_checker.metrics = Mock()
+    add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    blockchain.replace_error = ValueError("replacement transaction underpriced")
+
+    replacing_checker.check_transactions()
+    blockchain.replace_error = None
+    replacing_checker.check_transactions()
+
+    assert blockchain.replaced == []
+    replacing_checker.metrics.increment.assert_called_once_with("transaction_replacements", outcome="failed")
+
+
+def test_failed_send_not_retried_every_loop(replacing_checker, blockchain, faucet_repository):
+    transaction = add_pending(faucet_repository, 1, age=timedelta(minutes=5))
+    blockchain.send_error = ValueError("insufficient funds for gas * price + value")
+
+    replacing_checker.check_transactions()
+    # stuck again, but the send failed a moment ago
+    transaction.broadcast_at = DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=5))
+    blockchain.send_error = None
+    replacing_checker.check_transactions()
+
+    assert len(blockchain.replaced) == 1
+    assert blockchain.sent == []
+    # the unsent replacement is counted, the limit bounds the signed ones
+    assert (transaction.tx_hash, transaction.replacements) == (tx_hash(1001), 1)
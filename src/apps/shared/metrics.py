@@ -0,0 +1,46 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+
+class Metrics(ABC):
+    """
+    Port for metrics of the application services, names and labels are declared by the implementation.
+
+    Implementations should be cheap to call, services report from their hot paths.
+    """
+
+    @abstractmethod
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Add a value (usually seconds) to a histogram."""
+
+    @abstractmethod
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        """Increase a counter."""
+
+    @abstractmethod
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge."""
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the time spent in the block, also when it raises."""
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - started_at, **labels)
+
+
+class NullMetrics(Metrics):
+    """Metrics which go nowhere, for services created outside the container."""
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        pass
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        pass
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        pass
@@ -0,0 +1,121 @@
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from hashlib import blake2b
+from threading import Lock
+from time import time
+from typing import Iterator
+
+MAGIC = b"EXPC"
+HEADER = struct.Struct("<4sI")
+# 16 bytes of key digest + expiration unix timestamp, empty slot is all zeros
+SLOT = struct.Struct("<16sd")
+
+
+class SharedExpiryCache:
+    """
+    Set of string keys with expiration time, shared by all processes on the host through a memory mapped file.
+
+    The table has a fixed number of slots, a key may be stored only in one of max_probes slots after its hash.
+    Expired slots are reused, and when all of them are alive the one which expires first is evicted.
+    So the cache may forget a key earlier than its expiration time, a missing key means "unknown", not "expired".
+
+    Keys are stored as 128-bit digests, so the file doesn't contain IP addresses or any other raw keys.
+    Access is serialized with flock, the file should be on tmpfs (/dev/shm) to avoid disk writes.
+    """
+
+    _fd: int
+    _mmap: mmap.mmap
+    _lock: Lock
+
+    def __init__(self, path: str, slots: int = 65_536, max_probes: int = 8):
+        self.path = path
+        self.slots = slots
+        self.max_probes = min(max_probes, slots)
+        self._size = HEADER.size + slots * SLOT.size
+        self._pid = 0
+        self._open()
+
+    def get(self, key: str) -> float | None:
+        """Return expiration timestamp of the key, None if the key is unknown or expired."""
+        digest = self._digest(key)
+        now = time()
+        with self._locked(fcntl.LOCK_SH):
+            for offset in self._probe(digest):
+                slot_digest, expires_at = SLOT.unpack_from(self._mmap, offset)
+                if slot_digest == digest:
+                    return expires_at if expires_at > now else None
+        return None
+
+    def set(self, key: str, expires_at: float) -> None:
+        digest = self._digest(key)
+        now = time()
+        with self._locked(fcntl.LOCK_EX):
+            slots = [(offset, *SLOT.unpack_from(self._mmap, offset)) for offset in self._probe(digest)]
+            target = next((offset for offset, slot_digest, _ in slots if slot_digest == digest), None)
+            if target is None:
+                target = next((offset for offset, _, slot_expires_at in slots if slot_expires_at <= now), None)
+            if target is None:
+                # all slots are alive, evict the one which expires first
+                target = min(slots, key=lambda slot: slot[2])[0]
+
+            SLOT.pack_into(self._mmap, target, digest, expires_at)
+
+    def clear(self) -> None:
+        with self._locked(fcntl.LOCK_EX):
+            self._mmap[HEADER.size :] = bytes(self._size - HEADER.size)
+
+    def close(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
+
+    def _open(self) -> None:
+        # flock doesn't exclude threads using the same file descriptor
+        self._lock = Lock()
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._pid = os.getpid()
+        with self._locked(fcntl.LOCK_EX):
+            self._init_file()
+        self._mmap = mmap.mmap(self._fd, self._size)
+
+    def _init_file(self) -> None:
+        """
+        Called under the exclusive lock. The file is only grown, other processes may have it mapped
+        and touching a page which was cut off from the file kills them with SIGBUS.
+        """
+        size = os.fstat(self._fd).st_size
+        if size < self._size:
+            os.ftruncate(self._fd, self._size)
+        if size == 0:
+            os.pwrite(self._fd, HEADER.pack(MAGIC, self.slots), 0)
+            return
+
+        if HEADER.unpack(os.pread(self._fd, HEADER.size, 0)) != (MAGIC, self.slots):
+            # a table of another size (e.g. workers of the previous release), the cache is safe to drop
+            os.pwrite(self._fd, bytes(self._size - HEADER.size), HEADER.size)
+            os.pwrite(self._fd, HEADER.pack(MAGIC, self.slots), 0)
+
+    def _probe(self, digest: bytes) -> Iterator[int]:
+        start = int.from_bytes(digest[:8], "little") % self.slots
+        for i in range(self.max_probes):
+            yield HEADER.size + (start + i) % self.slots * SLOT.size
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return blake2b(key.encode(), digest_size=16).digest()
+
+    @contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        if self._pid != os.getpid():
+            # forked worker (e.g. gunicorn --preload) shares the file description and so the lock with the parent
+            self.close()
+            self._open()
+
+        with self._lock:
+            fcntl.flock(self._fd, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
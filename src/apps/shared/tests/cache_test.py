@@ -0,0 +1,51 @@
+import pytest
+
+from apps.shared import cache as cache_module
+from apps.shared.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_missing_key():
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=10)
+    assert cache.get("missing") is None
+
+
+def test_set_and_get():
+    cache: TTLCache[str, bool] = TTLCache(ttl_seconds=10)
+    cache.set("key", False)
+    assert cache.get("key") is False
+
+
+def test_expired_value_is_removed(clock):
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=10)
+    cache.set("key", 1)
+    clock[0] += 10
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_oldest_value_evicted_when_full():
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=10, max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("a", 3)
+    cache.set("c", 4)
+    assert cache.get("b") is None
+    assert cache.get("a") == 3
+    assert cache.get("c") == 4
+
+
+def test_delete_and_clear():
+    cache: TTLCache[str, int] = TTLCache(ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.delete("a")
+    assert cache.get("a") is None
+    cache.clear()
+    assert len(cache) == 0
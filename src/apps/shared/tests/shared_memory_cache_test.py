@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from apps.shared import shared_memory_cache as cache_module
+from apps.shared.shared_memory_cache import SharedExpiryCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache")
+
+
+def test_get_missing_key(path):
+    assert SharedExpiryCache(path, slots=16).get("missing") is None
+
+
+def test_set_and_get(path, clock):
+    cache = SharedExpiryCache(path, slots=16)
+    cache.set("key", 1010.0)
+    assert cache.get("key") == 1010.0
+
+    cache.set("key", 1020.0)
+    assert cache.get("key") == 1020.0
+
+
+def test_expired_key(path, clock):
+    cache = SharedExpiryCache(path, slots=16)
+    cache.set("key", 1010.0)
+    clock[0] += 10
+    assert cache.get("key") is None
+
+
+def test_shared_between_instances(path, clock):
+    SharedExpiryCache(path, slots=16).set("key", 1010.0)
+    assert SharedExpiryCache(path, slots=16).get("key") == 1010.0
+    # another table size can't read the old layout, the file is reset
+    assert SharedExpiryCache(path, slots=32).get("key") is None
+
+
+def test_file_never_shrinks_under_mapped_cache(path, clock):
+    large = SharedExpiryCache(path, slots=32)
+    size = os.path.getsize(path)
+
+    small = SharedExpiryCache(path, slots=16)
+    small.set("key", 1010.0)
+
+    # the larger table stays mapped, all its pages are still in the file
+    assert os.path.getsize(path) == size
+    assert large.get("other") is None
+    assert small.get("key") == 1010.0
+
+
+def test_evicts_key_which_expires_first(path, clock):
+    cache = SharedExpiryCache(path, slots=2, max_probes=2)
+    cache.set("a", 1030.0)
+    cache.set("b", 1010.0)
+    cache.set("c", 1020.0)
+    assert cache.get("a") == 1030.0
+    assert cache.get("b") is None
+    assert cache.get("c") == 1020.0
+
+
+def test_expired_slot_reused(path, clock):
+    cache = SharedExpiryCache(path, slots=2, max_probes=2)
+    cache.set("a", 1010.0)
+    cache.set("b", 1030.0)
+    clock[0] += 10
+    cache.set("c", 1020.0)
+    assert cache.get("b") == 1030.0
+    assert cache.get("c") == 1020.0
+
+
+def test_visible_in_forked_process(path):
+    cache = SharedExpiryCache(path, slots=16)
+    expires_at = cache_module.time() + 60
+
+    pid = os.fork()
+    if pid == 0:
+        cache.set("key", expires_at)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    assert cache.get("key") == expires_at
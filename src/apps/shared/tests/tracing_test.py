@@ -0,0 +1,86 @@
+import pytest
+
+from apps.shared.tracing import SpanExporter, Trace, Tracer, set_attributes, span
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.traces: list[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+@pytest.fixture
+def exporter():
+    return ListExporter()
+
+
+def test_span_without_trace_is_noop():
+    with span("stage") as current:
+        set_attributes(rows=1)
+    assert current is None
+
+
+def test_nested_spans(exporter):
+    tracer = Tracer(exporter, sample_rate=1)
+
+    with tracer.trace("fund_wallet", "req-1"):
+        with span("cooldown"):
+            with span("repository.get_cooldown_state"):
+                set_attributes(rows=0)
+        with span("send_funds", sender="0x1"):
+            pass
+
+    [trace] = exporter.traces
+    assert trace.request_id == "req-1"
+    assert [(s.span_id, s.parent_id, s.name) for s in trace.spans] == [
+        (1, None, "fund_wallet"),
+        (2, 1, "cooldown"),
+        (3, 2, "repository.get_cooldown_state"),
+        (4, 1, "send_funds"),
+    ]
+    assert trace.spans[2].attributes == {"rows": 0}
+    assert trace.spans[3].attributes == {"sender": "0x1"}
+    assert trace.duration >= trace.spans[1].duration
+
+
+def test_error_recorded(exporter):
+    tracer = Tracer(exporter, sample_rate=1)
+
+    with pytest.raises(ValueError), tracer.trace("fund_wallet", "req-1"):
+        with span("send_raw_transaction"):
+            raise ValueError("nonce too low")
+
+    spans = exporter.traces[0].spans
+    assert spans[1].attributes["error"] == "ValueError: nonce too low"
+    assert spans[0].attributes["error"] == "ValueError: nonce too low"
+
+
+def test_not_sampled(exporter):
+    tracer = Tracer(exporter, sample_rate=0)
+
+    with tracer.trace("fund_wallet", "req-1") as trace:
+        with span("cooldown") as current:
+            pass
+
+    assert trace is None and current is None
+    assert exporter.traces == []
+
+
+def test_slow_trace_exported_without_sampling(exporter):
+    tracer = Tracer(exporter, sample_rate=0, slow_seconds=0)
+
+    with tracer.trace("fund_wallet", "req-1"):
+        pass
+
+    assert [trace.sampled for trace in exporter.traces] == [False]
+
+
+def test_export_error_does_not_fail_request():
+    class FailingExporter(SpanExporter):
+        def export(self, trace: Trace) -> None:
+            raise OSError("disk full")
+
+    with Tracer(FailingExporter(), sample_rate=1).trace("fund_wallet", "req-1"):
+        pass
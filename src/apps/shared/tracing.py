@@ -0,0 +1,144 @@
+"""
+Lightweight tracing of the stages of a request.
+
+Tracer.trace starts a trace for a request, span() records a stage of the current trace.
+Without a trace (not sampled, background commands) span() returns a shared no-op context,
+so services and repositories call it unconditionally.
+
+The current trace is kept in a context variable, it follows the request into coroutines
+and sync_to_async threads, but not into threads of a plain executor.
+"""
+
+import logging
+import random
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter, time
+from types import TracebackType
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    span_id: int
+    parent_id: int | None
+    # seconds since the start of the trace
+    start: float
+    duration: float = 0.0
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class Trace:
+    name: str
+    request_id: str
+    # unix time of the start
+    started_at: float
+    sampled: bool
+    spans: list[Span] = field(default_factory=list)
+    _clock: float = field(default_factory=perf_counter)
+
+    @property
+    def duration(self) -> float:
+        return self.spans[0].duration if self.spans else 0.0
+
+
+_current_trace: ContextVar[Trace | None] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+_NO_SPAN = nullcontext()
+
+
+class _SpanContext:
+    __slots__ = ("trace", "span", "token")
+
+    def __init__(self, trace: Trace, name: str, attributes: dict[str, Any]):
+        parent = _current_span.get()
+        self.trace = trace
+        self.span = Span(
+            name=name,
+            span_id=len(trace.spans) + 1,
+            parent_id=parent.span_id if parent else None,
+            start=0.0,
+            attributes=attributes,
+        )
+
+    def __enter__(self) -> Span:
+        self.span.start = perf_counter() - self.trace._clock
+        self.trace.spans.append(self.span)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None
+    ) -> None:
+        self.span.duration = perf_counter() - self.trace._clock - self.span.start
+        if exc is not None:
+            self.span.attributes["error"] = f"{type(exc).__name__}: {exc}"
+        _current_span.reset(self.token)
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Context manager recording a stage of the current trace, yields the Span or None without a trace."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NO_SPAN
+    return _SpanContext(trace, name, attributes)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span, e.g. the number of rows read."""
+    current = _current_span.get()
+    if current is not None:
+        current.attributes.update(attributes)
+
+
+class SpanExporter(ABC):
+    """Receives finished traces, called in the request, so it should be fast and must not raise."""
+
+    @abstractmethod
+    def export(self, trace: Trace) -> None:
+        pass
+
+
+class Tracer:
+    """
+    Starts traces of requests.
+
+    sample_rate of the requests are traced and exported. With slow_seconds every request is traced,
+    and those which took longer are exported even if they are not sampled, so the tail is always seen.
+    """
+
+    def __init__(self, exporter: SpanExporter, sample_rate: float = 0.0, slow_seconds: float | None = None):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+
+    @contextmanager
+    def trace(self, name: str, request_id: str, **attributes: Any) -> Iterator[Trace | None]:
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        if not sampled and self.slow_seconds is None:
+            yield None
+            return
+
+        trace = Trace(name=name, request_id=request_id, started_at=time(), sampled=sampled)
+        token = _current_trace.set(trace)
+        try:
+            with span(name, **attributes):
+                yield trace
+        finally:
+            _current_trace.reset(token)
+            if sampled or (self.slow_seconds is not None and trace.duration >= self.slow_seconds):
+                self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        try:
+            self.exporter.export(trace)
+        except Exception:
+            # tracing must never fail the request
+            logger.exception("Error exporting trace")
@@ -6,7 +6,7 @@ from zoneinfo import ZoneInfo
 DEFAULT_TIMEZONE = ZoneInfo("UTC")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DomainDateTime:
     dt: datetime
 
@@ -24,6 +24,8 @@ class Id:
             Returns True if the Id value is not None, otherwise False.
     """
 
+    __slots__ = ("value",)
+
     value: str | None
 
     def __init__(self, value: str | int | UUID | None = None):
@@ -63,6 +65,8 @@ class RequiredId(Id):
             Initializes the RequiredId instance. Raises a ValueError if the provided value is None or if the value of an Id instance is None.
     """
 
+    __slots__ = ()
+
     value: str
 
     def __init__(self, value: str | int | UUID | Id | Any):
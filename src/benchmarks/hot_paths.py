@@ -0,0 +1,121 @@
+"""
+Benchmarks of the faucet hot paths against a local chain and the configured database.
+
+Run with: python manage.py run_benchmarks
+The command creates a test database, so the data of the configured database is not touched.
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from web3 import Web3
+
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.blockchain_service import BlockchainService
+from apps.blockchain.application.services.faucet_service import FaucetService
+from apps.blockchain.application.services.fee_oracle import FeeOracle
+from apps.blockchain.application.services.nonce_manager import NonceManager
+from apps.blockchain.application.services.tx_status_checker_service import TxStatusCheckerService
+from apps.blockchain.domain.value_objects import TransactionStatus
+from apps.shared.cache import TTLCache
+from apps.shared.shared_memory_cache import SharedExpiryCache
+from benchmarks.local_chain import create_local_chain
+from benchmarks.timing import StageTimer
+from infrastructure.repositories.django_cooldown_repository import DjangoCooldownRepository
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+from infrastructure.repositories.django_nonce_repository import DjangoNonceRepository
+
+
+class HotPaths:
+    """The services wired like in the container, but on a local chain."""
+
+    def __init__(self, web3: Web3, blockchain_service: BlockchainService, cooldown_cache: SharedExpiryCache):
+        self.web3 = web3
+        self.blockchain_service = blockchain_service
+        self.repository = DjangoFaucetTransactionsRepository()
+        self.faucet_service = FaucetService(
+            blockchain_service=blockchain_service,
+            faucet_transactions_repository=self.repository,
+            threshold_timeout_minutes=settings.FAUCET_THRESHOLD_TIMEOUT_MINUTES,
+            amount_eth=settings.FAUCET_AMOUNT_ETH,
+            cooldown_cache=cooldown_cache,
+            cooldown_repository=DjangoCooldownRepository(),
+            reservation_seconds=settings.FAUCET_COOLDOWN_RESERVATION_SECONDS,
+        )
+        self.checker = TxStatusCheckerService(
+            blockchain_service=blockchain_service,
+            faucet_transactions_repository=self.repository,
+            loop_timeout_seconds=0,
+            chunk_size=settings.TX_CHECKER_CHUNK_SIZE,
+        )
+
+    @classmethod
+    def create(cls, cooldown_cache_path: str) -> "HotPaths":
+        web3, accounts = create_local_chain()
+        blockchain_service = BlockchainService(
+            web3=web3,
+            chain_id=web3.eth.chain_id,
+            account_pool=AccountPool(accounts[:1], balance_ttl_seconds=settings.FAUCET_ACCOUNT_BALANCE_TTL_SECONDS),
+            nonce_manager=NonceManager(nonce_repository=DjangoNonceRepository()),
+            fee_oracle=FeeOracle(
+                ttl_seconds=settings.BLOCKCHAIN_FEE_TTL_SECONDS,
+                max_stale_seconds=settings.BLOCKCHAIN_FEE_MAX_STALE_SECONDS,
+            ),
+            recipient_code_cache=TTLCache(ttl_seconds=settings.BLOCKCHAIN_CODE_CACHE_TTL_SECONDS),
+            rpc_batch_size=settings.BLOCKCHAIN_RPC_BATCH_SIZE,
+        )
+        return cls(web3, blockchain_service, SharedExpiryCache(cooldown_cache_path, slots=65_536))
+
+    def fund_wallet(self, requests: int) -> dict[str, dict[str, float]]:
+        """Every request comes from a new wallet and IP, so it passes the cooldown and is sent."""
+        timer = StageTimer()
+        timer.wrap("cooldown check", self.faucet_service, "_check_cooldown")
+        timer.wrap("fee lookup", self.blockchain_service.fee_oracle, "get_fees")
+        timer.wrap("nonce", self.blockchain_service, "_allocate_nonce")
+        for account in self.blockchain_service.account_pool.accounts:
+            timer.wrap("signing", account, "sign_transaction")
+        timer.wrap("broadcast", self.web3.eth, "send_raw_transaction")
+        timer.wrap("persist", self.repository, "create")
+
+        for i in range(requests):
+            with timer.measure("total"):
+                self.faucet_service.fund_wallet(
+                    f"0x{0xFA0000 + i:040x}", f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+                )
+        return timer.summary()
+
+    def get_stats(self, requests: int) -> dict[str, dict[str, float]]:
+        """Stats are not cached here, every call reads the database."""
+        timer = StageTimer()
+        for _ in range(requests):
+            with timer.measure("total"):
+                self.faucet_service.get_stats()
+        return timer.summary()
+
+    def checker_sweep(self, sweeps: int) -> dict[str, dict[str, float]]:
+        """Full sweep over all pending transactions, as on start of the checker."""
+        reset_statuses = self.repository.update_statuses
+        timer = StageTimer()
+        timer.wrap("receipts", self.blockchain_service, "get_transaction_statuses")
+        timer.wrap("persist", self.repository, "update_statuses")
+
+        pending = {tx.id: TransactionStatus.PENDING for tx in self.repository.get_pending_transactions()}
+        for _ in range(sweeps):
+            # the same transactions are resolved on every sweep
+            reset_statuses(pending)
+            self.checker._last_block = None
+            with timer.measure("total"):
+                self.checker.check_transactions()
+        return timer.summary()
+
+
+def run(requests: int = 200, sweeps: int = 10) -> dict[str, dict[str, dict[str, float]]]:
+    """Stage summaries by scenario, the database should be empty."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        hot_paths = HotPaths.create(str(Path(tmp_dir) / "cooldowns"))
+        return {
+            "fund_wallet": hot_paths.fund_wallet(requests),
+            "get_stats": hot_paths.get_stats(requests),
+            "checker_sweep": hot_paths.checker_sweep(sweeps),
+        }
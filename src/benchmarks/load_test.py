@@ -0,0 +1,118 @@
+"""
+HTTP load generator for the fund and stats endpoints.
+
+Every fund request comes from its own loopback address (127.0.0.0/8 is routed to lo on Linux),
+so REMOTE_ADDR differs like for real clients and the IP cooldown works as in production.
+"""
+
+import json
+import random
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from http.client import HTTPConnection
+from itertools import count
+from threading import Lock
+from time import perf_counter
+from typing import Any
+from urllib.parse import urlsplit
+
+from benchmarks.timing import summarize
+
+FUND_PATH = "/api/faucet/fund"
+STATS_PATH = "/api/faucet/stats"
+
+
+@dataclass(frozen=True)
+class Request:
+    endpoint: str
+    source_ip: str
+    wallet: str | None = None
+
+
+@dataclass(frozen=True)
+class Result:
+    endpoint: str
+    outcome: str  # HTTP status or the error class
+    duration: float
+
+
+class Workload:
+    """
+    Deterministic mix of requests: stats reads, new clients, and repeat offenders
+    who come back with the IP and wallet of an earlier fund request and should hit the cooldown.
+    """
+
+    def __init__(self, stats_ratio: float, repeat_ratio: float, seed: int = 1):
+        self.stats_ratio = stats_ratio
+        self.repeat_ratio = repeat_ratio
+        self._random = random.Random(seed)
+        self._clients = count(1)
+        self._seen: list[Request] = []
+        self._lock = Lock()
+
+    def next(self) -> Request:
+        with self._lock:
+            roll = self._random.random()
+            if roll < self.stats_ratio:
+                return Request(STATS_PATH, self._address(self._random.randrange(1, 2**24)))
+            if roll < self.stats_ratio + self.repeat_ratio and self._seen:
+                return self._random.choice(self._seen)
+
+            client = next(self._clients)
+            request = Request(FUND_PATH, self._address(client), f"0x{0xFB000000 + client:040x}")
+            self._seen.append(request)
+            return request
+
+    @staticmethod
+    def _address(n: int) -> str:
+        # 127.0.0.1 is left for the server
+        n += 1
+        return f"127.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def send(base_url: str, request: Request, timeout: float) -> Result:
+    url = urlsplit(base_url)
+    connection = HTTPConnection(
+        url.hostname or "127.0.0.1", url.port, timeout=timeout, source_address=(request.source_ip, 0)
+    )
+    started_at = perf_counter()
+    try:
+        if request.wallet is None:
+            connection.request("GET", request.endpoint)
+        else:
+            body = json.dumps({"wallet_address": request.wallet})
+            connection.request("POST", request.endpoint, body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        response.read()
+        outcome = str(response.status)
+    except Exception as e:
+        outcome = type(e).__name__
+    finally:
+        connection.close()
+    return Result(request.endpoint, outcome, perf_counter() - started_at)
+
+
+def run_level(base_url: str, workload: Workload, concurrency: int, requests: int, timeout: float) -> dict[str, Any]:
+    """Send requests with concurrency clients at once, returns throughput, outcomes and latencies."""
+    started_at = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: send(base_url, workload.next(), timeout), range(requests)))
+    elapsed = perf_counter() - started_at
+
+    report: dict[str, Any] = {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 1),
+        "outcomes": {},
+        "latency": {},
+    }
+    for endpoint in (FUND_PATH, STATS_PATH):
+        endpoint_results = [result for result in results if result.endpoint == endpoint]
+        if endpoint_results:
+            report["outcomes"][endpoint] = dict(Counter(result.outcome for result in endpoint_results))
+            summary = summarize([result.duration for result in endpoint_results])
+            # ops per second of one client is meaningless here, throughput is reported for the level
+            summary.pop("ops_per_sec")
+            report["latency"][endpoint] = summary
+    return report
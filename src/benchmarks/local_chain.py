@@ -0,0 +1,44 @@
+import json
+from typing import Any
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from eth_tester import EthereumTester, PyEVMBackend
+from web3 import EthereumTesterProvider, Web3
+from web3.exceptions import TransactionNotFound
+from web3.types import RPCEndpoint, RPCResponse
+
+
+class LocalChainProvider(EthereumTesterProvider):
+    """
+    In-process chain (eth-tester on py-evm) which also answers JSON-RPC batches like a real node.
+
+    Every transaction is mined into its own block as soon as it is sent.
+    Batch answers are raw JSON, as the faucet reads them without web3 formatters.
+    """
+
+    def __init__(self, ethereum_tester: EthereumTester):
+        super().__init__(ethereum_tester)
+        # requests of a batch are formatted and answered by web3 like single requests
+        self._web3 = Web3(EthereumTesterProvider(ethereum_tester))
+
+    def make_batch_request(self, requests: list[tuple[RPCEndpoint, Any]]) -> list[RPCResponse]:
+        return [self.make_raw_request(i, method, params) for i, (method, params) in enumerate(requests)]
+
+    def make_raw_request(self, request_id: Any, method: RPCEndpoint, params: Any) -> RPCResponse:
+        try:
+            result = self._web3.manager.request_blocking(method, params)
+        except TransactionNotFound:
+            result = None
+        except Exception as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32000, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": request_id, "result": json.loads(Web3.to_json(result))}  # type: ignore
+
+
+def create_local_chain() -> tuple[Web3, list[LocalAccount]]:
+    """New chain and its prefunded accounts."""
+    ethereum_tester = EthereumTester(PyEVMBackend())
+    # fee history needs a few blocks with base fee
+    ethereum_tester.mine_blocks(3)
+    accounts = [Account.from_key(key.to_bytes()) for key in ethereum_tester.backend.account_keys]
+    return Web3(LocalChainProvider(ethereum_tester)), accounts
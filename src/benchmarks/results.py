@@ -0,0 +1,31 @@
+import json
+import platform
+import subprocess
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(name: str, results: dict[str, Any], output_dir: Path = RESULTS_DIR) -> Path:
+    """Save results with the revision and environment they were measured at, returns the file path."""
+    created_at = datetime.now(UTC)
+    revision = git_revision()
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"{name}-{created_at:%Y-%m-%dT%H%M%S}-{revision}.json"
+    data = {
+        "revision": revision,
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        **results,
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+    return path
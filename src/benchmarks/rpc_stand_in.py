@@ -0,0 +1,103 @@
+"""
+JSON-RPC node stand-in over HTTP, backed by the local eth-tester chain.
+
+Run from src: python -m benchmarks.rpc_stand_in --port 8545
+"""
+
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any
+
+from eth_account.signers.local import LocalAccount
+from eth_utils import keccak
+
+from benchmarks.local_chain import LocalChainProvider, create_local_chain
+
+
+class RPCStandIn:
+    """
+    HTTP JSON-RPC server in front of the local chain, answers single and batch requests.
+
+    With mine=False raw transactions are only hashed, not executed, so the stand-in answers in microseconds
+    and a load test measures the faucet, not py-evm. Such transactions never get a receipt.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, mine: bool = False):
+        web3, self.accounts = create_local_chain()
+        self.chain_id = web3.eth.chain_id
+        self.provider: LocalChainProvider = web3.provider  # type: ignore
+        self.mine = mine
+        # eth-tester is not thread safe
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    @property
+    def faucet_account(self) -> LocalAccount:
+        return self.accounts[0]
+
+    def start(self) -> None:
+        self._thread = Thread(target=self._server.serve_forever, name="rpc-stand-in", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, request: dict[str, Any]) -> dict[str, Any]:
+        method, params, request_id = request.get("method"), request.get("params", []), request.get("id")
+        if method == "eth_sendRawTransaction" and not self.mine:
+            return {"jsonrpc": "2.0", "id": request_id, "result": "0x" + keccak(hexstr=params[0]).hex()}
+        with self._lock:
+            return self.provider.make_raw_request(request_id, method, params)  # type: ignore
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # answers are small, without this they wait for the delayed ACK of the client
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if isinstance(body, list):
+                    response: Any = [stand_in.answer(request) for request in body]
+                else:
+                    response = stand_in.answer(body)
+
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--mine", action="store_true", help="execute transactions, every one in its own block")
+    args = parser.parse_args()
+
+    stand_in = RPCStandIn(args.host, args.port, mine=args.mine)
+    print(f"Serving {stand_in.url}, chain id {stand_in.chain_id}")
+    print(f"Funded account {stand_in.faucet_account.address}, key {stand_in.faucet_account.key.to_0x_hex()}")
+    try:
+        stand_in._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
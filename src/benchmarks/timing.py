@@ -0,0 +1,51 @@
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from statistics import quantiles
+from time import perf_counter
+from typing import Any, Iterator
+
+
+class StageTimer:
+    """Collects durations of the stages of a hot path, stages are methods of the real objects."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+
+    def wrap(self, stage: str, obj: Any, method: str) -> None:
+        """Time every call of obj.method as stage, the method is replaced on the instance."""
+        func = getattr(obj, method)
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            with self.measure(stage):
+                return func(*args, **kwargs)
+
+        setattr(obj, method, timed)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        started_at = perf_counter()
+        try:
+            yield
+        finally:
+            self.samples[stage].append(perf_counter() - started_at)
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Calls, ops per second and latency percentiles in milliseconds by stage."""
+        return {stage: summarize(durations) for stage, durations in self.samples.items()}
+
+
+def summarize(durations: list[float]) -> dict[str, float]:
+    if len(durations) > 1:
+        percentiles = quantiles(durations, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = durations[0]
+    return {
+        "count": len(durations),
+        "ops_per_sec": round(len(durations) / sum(durations), 1) if sum(durations) else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+    }
@@ -0,0 +1,90 @@
+"""
+Microbenchmarks of the value objects built for every faucet transaction row.
+
+Run from src: python -m benchmarks.value_objects
+"""
+
+import timeit
+from datetime import UTC, datetime
+
+from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.value_objects import (
+    IPAddress,
+    TokenAmount,
+    TransactionHash,
+    TransactionStatus,
+    WalletAddress,
+    to_checksum_address,
+)
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import RequiredId
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+TX_HASH = "0x9fc76417374aa880d4449a1f7f31ec597f00b1f6f3dd2d66f4c9c6c445836d8b"
+IP = "192.168.1.1"
+CREATED_AT = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def entity_from_row() -> FaucetTransaction:
+    """What the repository does for every row, with validation of stored values."""
+    return FaucetTransaction(
+        id=RequiredId(1),
+        tx_hash=TransactionHash(TX_HASH),
+        status=TransactionStatus("pending"),
+        ip_address=IPAddress(IP),
+        wallet=WalletAddress(WALLET),
+        amount=TokenAmount.from_int(10**14),
+        created_at=DomainDateTime(CREATED_AT),
+    )
+
+
+def trusted_entity_from_row() -> FaucetTransaction:
+    """The same, stored values are trusted."""
+    return FaucetTransaction(
+        id=RequiredId(1),
+        tx_hash=TransactionHash.from_trusted(TX_HASH),
+        status=TransactionStatus("pending"),
+        ip_address=IPAddress.from_trusted(IP),
+        wallet=WalletAddress.from_trusted(WALLET),
+        amount=TokenAmount.from_int(10**14),
+        created_at=DomainDateTime(CREATED_AT),
+    )
+
+
+def new_wallet_address() -> WalletAddress:
+    to_checksum_address.cache_clear()
+    return WalletAddress(WALLET)
+
+
+wallet = WalletAddress(WALLET)
+tx_hash = TransactionHash(TX_HASH)
+ip = IPAddress(IP)
+
+BENCHMARKS = {
+    "WalletAddress()": lambda: WalletAddress(WALLET),
+    "WalletAddress(), checksum not memoized": new_wallet_address,
+    "WalletAddress.from_trusted()": lambda: WalletAddress.from_trusted(WALLET),
+    "WalletAddress.checksum_address": lambda: wallet.checksum_address,
+    "TransactionHash()": lambda: TransactionHash(TX_HASH),
+    "TransactionHash.from_trusted()": lambda: TransactionHash.from_trusted(TX_HASH),
+    "TransactionHash.bytes": lambda: tx_hash.bytes,
+    "IPAddress()": lambda: IPAddress(IP),
+    "IPAddress.from_trusted()": lambda: IPAddress.from_trusted(IP),
+    "IPAddress.to_int()": lambda: ip.to_int(),
+    "IPAddress.version": lambda: ip.version,
+    "entity from row": entity_from_row,
+    "entity from row, trusted": trusted_entity_from_row,
+}
+
+
+def run(number: int = 20_000, repeat: int = 5) -> dict[str, float]:
+    """Best time of one call in microseconds by benchmark name."""
+    return {
+        name: min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1_000_000
+        for name, func in BENCHMARKS.items()
+    }
+
+
+if __name__ == "__main__":
+    for name, microseconds in run().items():
+        print(f"{name:<40} {microseconds:8.2f} us")
@@ -0,0 +1,40 @@
+"""
+Gunicorn settings, gunicorn reads this file from the working directory (src, /app in the image).
+
+Workers write their metrics to PROMETHEUS_MULTIPROC_DIR, the master exports the sum of all on METRICS_PORT,
+apart from the public port of the application.
+prometheus_client reads the variable on import, so it has to be set here, before the workers load the app.
+"""
+
+import os
+import shutil
+import tempfile
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "faucet_metrics"))
+
+
+def on_starting(server):
+    # files of the previous run would be added to the new samples
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path)
+
+
+def when_ready(server):
+    port = int(os.getenv("METRICS_PORT", 0))
+    if not port:
+        return
+
+    from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+    # the master doesn't load the app, it only reads the files of the workers
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    start_http_server(port, registry=registry)
+    server.log.info(f"Serving metrics on port {port}")
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -5,7 +5,10 @@ from infrastructure.models.faucet_transaction import FaucetTransactionModel
 
 @admin.register(FaucetTransactionModel)
 class FaucetTransactionAdmin(admin.ModelAdmin):
-    list_display = ("tx_hash", "wallet", "amount", "status", "created_at")
-    search_fields = ("tx_hash", "wallet")
+    list_display = ("tx_hash", "wallet", "amount", "status", "sender", "created_at")
+    search_fields = ("tx_hash", "wallet", "sender")
     list_filter = ("status", "created_at")
     ordering = ("-created_at",)
+    # status changes go through the repository, it keeps stats buckets in sync,
+    # and stored addresses and hashes are trusted to be normalized when loaded
+    readonly_fields = ("status", "tx_hash", "wallet", "ip_address", "sender")
@@ -0,0 +1,124 @@
+from typing import Any
+
+from aiohttp import ClientTimeout
+from eth_typing import URI
+from requests import Session
+from requests.adapters import HTTPAdapter
+from web3 import AsyncHTTPProvider, AsyncWeb3, HTTPProvider, Web3
+from web3._utils.http_session_manager import HTTPSessionManager
+from web3.types import RPCEndpoint, RPCResponse
+
+from apps.shared.tracing import span
+from infrastructure.metrics import RPC_REQUEST_SECONDS, batch_method
+from infrastructure.rpc_router import RoutingHTTPProvider
+
+
+class SharedSessionManager(HTTPSessionManager):
+    """
+    Session manager which gives the same session to every thread.
+
+    web3 caches a session per thread, so the session passed to HTTPProvider is used only by the thread
+    which created the provider, and other threads get a default one. The connection pool of the shared
+    session is thread-safe and sized for all the threads.
+    """
+
+    def __init__(self, session: Session):
+        super().__init__()
+        self.session = session
+
+    def cache_and_return_session(
+        self, endpoint_uri: URI, session: Session | None = None, request_timeout: float | None = None
+    ) -> Session:
+        return self.session
+
+
+class InstrumentedHTTPProvider(HTTPProvider):
+    """HTTPProvider which observes the duration of every request to the node by RPC method, and traces it."""
+
+    def __init__(self, endpoint_uri: str, session: Session | None = None, **kwargs: Any):
+        super().__init__(endpoint_uri, **kwargs)
+        if session is not None:
+            self._request_session_manager = SharedSessionManager(session)
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        with RPC_REQUEST_SECONDS.labels(method=method, batch="false").time(), span("rpc", method=method):
+            return super().make_request(method, params)
+
+    def make_batch_request(self, batch_requests: list[tuple[RPCEndpoint, Any]]) -> list[RPCResponse]:
+        method = batch_method(batch_requests)
+        with (
+            RPC_REQUEST_SECONDS.labels(method=method, batch="true").time(),
+            span("rpc_batch", method=method, calls=len(batch_requests)),
+        ):
+            return super().make_batch_request(batch_requests)
+
+
+class InstrumentedAsyncHTTPProvider(AsyncHTTPProvider):
+    """Async version of InstrumentedHTTPProvider."""
+
+    async def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        with RPC_REQUEST_SECONDS.labels(method=method, batch="false").time(), span("rpc", method=method):
+            return await super().make_request(method, params)
+
+    async def make_batch_request(self, batch_requests: list[tuple[RPCEndpoint, Any]]) -> list[RPCResponse]:
+        method = batch_method(batch_requests)
+        with (
+            RPC_REQUEST_SECONDS.labels(method=method, batch="true").time(),
+            span("rpc_batch", method=method, calls=len(batch_requests)),
+        ):
+            return await super().make_batch_request(batch_requests)
+
+
+def create_web3(
+    provider_urls: list[str],
+    pool_size: int,
+    connect_timeout: float,
+    read_timeout: float,
+    eject_seconds: float,
+    broadcast_to: int,
+) -> Web3:
+    """
+    Web3 client to share in the process, connections to the node are kept alive in the session pool,
+    so a request doesn't pay for a new TCP and TLS handshake.
+
+    With several URLs requests are routed between the endpoints by RoutingHTTPProvider.
+    """
+    if len(provider_urls) == 1:
+        return Web3(_create_http_provider(provider_urls[0], pool_size, connect_timeout, read_timeout))
+
+    # no retries of the same endpoint, the router fails over to another one instead
+    providers = [
+        _create_http_provider(url, pool_size, connect_timeout, read_timeout, retry=False) for url in provider_urls
+    ]
+    return Web3(RoutingHTTPProvider(providers, eject_seconds=eject_seconds, broadcast_to=broadcast_to))
+
+
+def create_async_web3(provider_urls: list[str], connect_timeout: float, read_timeout: float) -> AsyncWeb3:
+    """
+    AsyncWeb3 client to share in the process, web3 keeps one aiohttp session per event loop.
+
+    There is no routing for async requests yet, only the first URL is used.
+    """
+    provider = InstrumentedAsyncHTTPProvider(
+        provider_urls[0],
+        request_kwargs={"timeout": ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)},
+    )
+    return AsyncWeb3(provider)
+
+
+def _create_http_provider(
+    provider_url: str, pool_size: int, connect_timeout: float, read_timeout: float, retry: bool = True
+) -> HTTPProvider:
+    session = Session()
+    # web3 retries failed requests itself, the adapter shouldn't multiply them
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    kwargs = {} if retry else {"exception_retry_configuration": None}
+    return InstrumentedHTTPProvider(
+        provider_url,
+        session=session,
+        request_kwargs={"timeout": (connect_timeout, read_timeout)},
+        **kwargs,
+    )
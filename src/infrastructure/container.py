@@ -1,10 +1,25 @@
 from dependency_injector import containers, providers
 from django.conf import settings
 
+from apps.blockchain.application.dto import FaucetStatsDTO
+from apps.blockchain.application.services.account_pool import AccountPool
+from apps.blockchain.application.services.async_blockchain_service import AsyncBlockchainService
 from apps.blockchain.application.services.blockchain_service import BlockchainService
+from apps.blockchain.application.services.faucet_sender_service import FaucetSenderService
 from apps.blockchain.application.services.faucet_service import FaucetService
+from apps.blockchain.application.services.fee_oracle import FeeOracle
+from apps.blockchain.application.services.nonce_manager import NonceManager
 from apps.blockchain.application.services.tx_status_checker_service import TxStatusCheckerService
+from apps.blockchain.domain.value_objects import WalletAddress
+from apps.shared.cache import TTLCache
+from apps.shared.shared_memory_cache import SharedExpiryCache
+from apps.shared.tracing import Tracer
+from infrastructure.blockchain_client import create_async_web3, create_web3
+from infrastructure.metrics import PrometheusMetrics
+from infrastructure.repositories.django_cooldown_repository import DjangoCooldownRepository
 from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+from infrastructure.repositories.django_nonce_repository import DjangoNonceRepository
+from infrastructure.tracing import JsonLinesSpanExporter
 
 
 class DjangoContainer(containers.DeclarativeContainer):
@@ -13,13 +28,98 @@ class DjangoContainer(containers.DeclarativeContainer):
 
     # repositories is stateless, so we can use Singleton
     faucet_repository = providers.Singleton(DjangoFaucetTransactionsRepository)
+    nonce_repository = providers.Singleton(DjangoNonceRepository)
+    cooldown_repository = providers.Singleton(DjangoCooldownRepository)
+
+    # nonce manager remembers which accounts are synced with the node, so it lives as long as the process
+    nonce_manager = providers.Singleton(NonceManager, nonce_repository=nonce_repository)
+
+    # known balances of faucet accounts and the turn of the next account are shared by the process
+    account_pool = providers.Singleton(
+        AccountPool,
+        accounts=config.FAUCET_ACCOUNTS,
+        balance_ttl_seconds=config.FAUCET_ACCOUNT_BALANCE_TTL_SECONDS,
+    )
+
+    # fees are cached in memory and shared by all requests of the process
+    fee_oracle = providers.Singleton(
+        FeeOracle,
+        ttl_seconds=config.BLOCKCHAIN_FEE_TTL_SECONDS,
+        max_stale_seconds=config.BLOCKCHAIN_FEE_MAX_STALE_SECONDS,
+    )
+
+    # whether recipient is a contract, used to skip gas estimation for plain transfers
+    recipient_code_cache: providers.Singleton[TTLCache[WalletAddress, bool]] = providers.Singleton(
+        TTLCache,
+        ttl_seconds=config.BLOCKCHAIN_CODE_CACHE_TTL_SECONDS,
+        max_size=100_000,
+    )
+
+    # cooldowns are shared by all workers of the host through a memory mapped file
+    cooldown_cache = providers.Singleton(
+        SharedExpiryCache,
+        path=config.FAUCET_COOLDOWN_CACHE_PATH,
+        slots=config.FAUCET_COOLDOWN_CACHE_SLOTS,
+    )
+
+    # stats are the same for all requests of the process during a few seconds
+    stats_cache: providers.Singleton[TTLCache[str, FaucetStatsDTO]] = providers.Singleton(
+        TTLCache,
+        ttl_seconds=config.FAUCET_STATS_CACHE_TTL_SECONDS,
+        max_size=1,
+    )
+
+    # prometheus metrics are global to the process anyway
+    metrics = providers.Singleton(PrometheusMetrics)
+
+    # override span_exporter to send traces elsewhere
+    span_exporter = providers.Singleton(JsonLinesSpanExporter, path=config.TRACING_EXPORT_PATH)
+    tracer = providers.Singleton(
+        Tracer,
+        exporter=span_exporter,
+        sample_rate=config.TRACING_SAMPLE_RATE,
+        slow_seconds=config.TRACING_SLOW_SECONDS,
+    )
+
+    # web3 clients keep connections to the node, so they are shared by all requests of the process
+    web3 = providers.Singleton(
+        create_web3,
+        provider_urls=config.BLOCKCHAIN_PROVIDER_URLS,
+        pool_size=config.BLOCKCHAIN_RPC_POOL_SIZE,
+        connect_timeout=config.BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=config.BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS,
+        eject_seconds=config.BLOCKCHAIN_RPC_EJECT_SECONDS,
+        broadcast_to=config.BLOCKCHAIN_RPC_BROADCAST_TO,
+    )
+    async_web3 = providers.Singleton(
+        create_async_web3,
+        provider_urls=config.BLOCKCHAIN_PROVIDER_URLS,
+        connect_timeout=config.BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=config.BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS,
+    )
 
     # services may be stateful, so we use Factory
     blockchain_service = providers.Factory(
         BlockchainService,
-        provider_url=config.BLOCKCHAIN_PROVIDER_URL,
+        web3=web3,
         chain_id=config.BLOCKCHAIN_CHAIN_ID,
-        account=config.FAUCET_ACCOUNT,
+        account_pool=account_pool,
+        nonce_manager=nonce_manager,
+        fee_oracle=fee_oracle,
+        recipient_code_cache=recipient_code_cache,
+        rpc_batch_size=config.BLOCKCHAIN_RPC_BATCH_SIZE,
+        disperse_contract_address=config.FAUCET_DISPERSE_CONTRACT,
+    )
+
+    # stateless, everything it keeps is shared by the process anyway
+    async_blockchain_service = providers.Singleton(
+        AsyncBlockchainService,
+        web3=async_web3,
+        chain_id=config.BLOCKCHAIN_CHAIN_ID,
+        account_pool=account_pool,
+        nonce_manager=nonce_manager,
+        fee_oracle=fee_oracle,
+        recipient_code_cache=recipient_code_cache,
     )
 
     faucet_service = providers.Factory(
@@ -28,13 +128,39 @@ class DjangoContainer(containers.DeclarativeContainer):
         faucet_transactions_repository=faucet_repository,
         threshold_timeout_minutes=config.FAUCET_THRESHOLD_TIMEOUT_MINUTES,
         amount_eth=config.FAUCET_AMOUNT_ETH,
+        cooldown_cache=cooldown_cache,
+        stats_cache=stats_cache,
+        metrics=metrics,
+        cooldown_repository=cooldown_repository,
+        reservation_seconds=config.FAUCET_COOLDOWN_RESERVATION_SECONDS,
+    )
+
+    # for async views, sync requests don't create the async web3 client
+    async_faucet_service = providers.Factory(
+        FaucetService,
+        **faucet_service.kwargs,
+        async_blockchain_service=async_blockchain_service,
     )
 
     tx_status_checker_service = providers.Factory(
         TxStatusCheckerService,
         blockchain_service=blockchain_service,
         faucet_transactions_repository=faucet_repository,
-        loop_timeout_seconds=5,  # check for new txs every 5 seconds
+        loop_timeout_seconds=config.TX_CHECKER_LOOP_TIMEOUT_SECONDS,  # how often to check for new blocks
+        chunk_size=config.TX_CHECKER_CHUNK_SIZE,
+        metrics=metrics,
+        stuck_after_seconds=config.TX_CHECKER_STUCK_SECONDS,
+        max_replacements=config.TX_CHECKER_MAX_REPLACEMENTS,
+        backoff_seconds=config.TX_CHECKER_BACKOFF_SECONDS,
+        max_backoff_seconds=config.TX_CHECKER_MAX_BACKOFF_SECONDS,
+    )
+
+    faucet_sender_service = providers.Factory(
+        FaucetSenderService,
+        blockchain_service=blockchain_service,
+        faucet_transactions_repository=faucet_repository,
+        loop_timeout_seconds=config.FAUCET_SENDER_LOOP_TIMEOUT_SECONDS,
+        batch_size=config.FAUCET_SENDER_BATCH_SIZE,
     )
 
 
@@ -45,11 +171,37 @@ def get_app_container():
     # Load settings from Django settings
     container.config.from_dict(
         {
-            "BLOCKCHAIN_PROVIDER_URL": settings.BLOCKCHAIN_PROVIDER_URL,
+            "BLOCKCHAIN_PROVIDER_URLS": settings.BLOCKCHAIN_PROVIDER_URLS,
             "BLOCKCHAIN_CHAIN_ID": settings.BLOCKCHAIN_CHAIN_ID,
+            "BLOCKCHAIN_FEE_TTL_SECONDS": settings.BLOCKCHAIN_FEE_TTL_SECONDS,
+            "BLOCKCHAIN_FEE_MAX_STALE_SECONDS": settings.BLOCKCHAIN_FEE_MAX_STALE_SECONDS,
+            "BLOCKCHAIN_CODE_CACHE_TTL_SECONDS": settings.BLOCKCHAIN_CODE_CACHE_TTL_SECONDS,
+            "BLOCKCHAIN_RPC_BATCH_SIZE": settings.BLOCKCHAIN_RPC_BATCH_SIZE,
+            "BLOCKCHAIN_RPC_POOL_SIZE": settings.BLOCKCHAIN_RPC_POOL_SIZE,
+            "BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS": settings.BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS,
+            "BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS": settings.BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS,
+            "BLOCKCHAIN_RPC_EJECT_SECONDS": settings.BLOCKCHAIN_RPC_EJECT_SECONDS,
+            "BLOCKCHAIN_RPC_BROADCAST_TO": settings.BLOCKCHAIN_RPC_BROADCAST_TO,
             "FAUCET_THRESHOLD_TIMEOUT_MINUTES": settings.FAUCET_THRESHOLD_TIMEOUT_MINUTES,
             "FAUCET_AMOUNT_ETH": settings.FAUCET_AMOUNT_ETH,
-            "FAUCET_ACCOUNT": settings.FAUCET_ACCOUNT,
+            "FAUCET_COOLDOWN_CACHE_PATH": settings.FAUCET_COOLDOWN_CACHE_PATH,
+            "FAUCET_COOLDOWN_CACHE_SLOTS": settings.FAUCET_COOLDOWN_CACHE_SLOTS,
+            "FAUCET_COOLDOWN_RESERVATION_SECONDS": settings.FAUCET_COOLDOWN_RESERVATION_SECONDS,
+            "FAUCET_STATS_CACHE_TTL_SECONDS": settings.FAUCET_STATS_CACHE_TTL_SECONDS,
+            "FAUCET_ACCOUNTS": settings.FAUCET_ACCOUNTS,
+            "FAUCET_ACCOUNT_BALANCE_TTL_SECONDS": settings.FAUCET_ACCOUNT_BALANCE_TTL_SECONDS,
+            "TX_CHECKER_LOOP_TIMEOUT_SECONDS": settings.TX_CHECKER_LOOP_TIMEOUT_SECONDS,
+            "TX_CHECKER_CHUNK_SIZE": settings.TX_CHECKER_CHUNK_SIZE,
+            "TX_CHECKER_STUCK_SECONDS": settings.TX_CHECKER_STUCK_SECONDS,
+            "TX_CHECKER_MAX_REPLACEMENTS": settings.TX_CHECKER_MAX_REPLACEMENTS,
+            "TX_CHECKER_BACKOFF_SECONDS": settings.TX_CHECKER_BACKOFF_SECONDS,
+            "TX_CHECKER_MAX_BACKOFF_SECONDS": settings.TX_CHECKER_MAX_BACKOFF_SECONDS,
+            "FAUCET_SENDER_LOOP_TIMEOUT_SECONDS": settings.FAUCET_SENDER_LOOP_TIMEOUT_SECONDS,
+            "FAUCET_SENDER_BATCH_SIZE": settings.FAUCET_SENDER_BATCH_SIZE,
+            "FAUCET_DISPERSE_CONTRACT": settings.FAUCET_DISPERSE_CONTRACT,
+            "TRACING_SAMPLE_RATE": settings.TRACING_SAMPLE_RATE,
+            "TRACING_SLOW_SECONDS": settings.TRACING_SLOW_SECONDS,
+            "TRACING_EXPORT_PATH": settings.TRACING_EXPORT_PATH,
         }
     )
     return container
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from infrastructure.container import get_app_container
+from infrastructure.metrics import serve_metrics
 
 app_container = get_app_container()
 
@@ -9,6 +11,7 @@ class Command(BaseCommand):
     help = "Set statuses to transactions"
 
     def handle(self, *args, **options):
+        serve_metrics(settings.METRICS_PORT)
         try:
             app_container.tx_status_checker_service().run()
         except KeyboardInterrupt:
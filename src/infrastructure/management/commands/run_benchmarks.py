@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks import hot_paths
+from benchmarks.results import RESULTS_DIR, save_results
+
+
+class Command(BaseCommand):
+    help = "Benchmark fund_wallet, get_stats and the status checker against a local chain and a test database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="fund_wallet and get_stats calls")
+        parser.add_argument("--sweeps", type=int, default=10, help="status checker sweeps")
+        parser.add_argument("--output-dir", type=Path, default=RESULTS_DIR)
+        parser.add_argument("--baseline", type=Path, help="results file to compare p50 latencies with")
+        parser.add_argument("--max-regression", type=float, default=20, help="p50 growth in %% to report")
+
+    def handle(self, *args, **options):
+        # the benchmark writes a lot of rows, they go to a throwaway database
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            scenarios = hot_paths.run(requests=options["requests"], sweeps=options["sweeps"])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.print_results(scenarios)
+
+        results = {
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "sweeps": options["sweeps"],
+            "scenarios": scenarios,
+        }
+        path = save_results("hot-paths", results, options["output_dir"])
+        self.stdout.write(self.style.SUCCESS(f"Results are saved to {path}"))
+
+        if options["baseline"]:
+            baseline = json.loads(options["baseline"].read_text())
+            self.compare(baseline["scenarios"], scenarios, options["max_regression"])
+
+    def print_results(self, scenarios: dict) -> None:
+        for scenario, stages in scenarios.items():
+            self.stdout.write(f"\n{scenario}")
+            self.stdout.write(f"  {'stage':<16} {'calls':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+            for stage, stats in stages.items():
+                self.stdout.write(
+                    f"  {stage:<16} {stats['count']:>6} {stats['ops_per_sec']:>10} "
+                    f"{stats['p50_ms']:>9} {stats['p95_ms']:>9} {stats['p99_ms']:>9}"
+                )
+
+    def compare(self, baseline: dict, scenarios: dict, max_regression: float) -> None:
+        self.stdout.write("\np50 change against the baseline")
+        for scenario, stages in scenarios.items():
+            for stage, stats in stages.items():
+                old = baseline.get(scenario, {}).get(stage)
+                if not old or not old["p50_ms"]:
+                    continue
+                change = (stats["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+                line = f"  {scenario}/{stage}: {old['p50_ms']} -> {stats['p50_ms']} ms ({change:+.1f}%)"
+                self.stdout.write(self.style.ERROR(line) if change > max_regression else line)
@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import tempfile
+from http.client import HTTPConnection
+from pathlib import Path
+from time import monotonic, sleep
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.load_test import STATS_PATH, Workload, run_level
+from benchmarks.results import RESULTS_DIR, save_results
+from benchmarks.rpc_stand_in import RPCStandIn
+
+# directory of manage.py, gunicorn imports the project from here
+SRC_DIR = Path(__file__).resolve().parents[3]
+
+
+class Command(BaseCommand):
+    help = "Load test the fund and stats endpoints under gunicorn, with a local chain behind an RPC stand-in"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", default="1,4,16,32", help="comma separated numbers of clients")
+        parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+        parser.add_argument("--workers", type=int, default=1, help="gunicorn workers")
+        parser.add_argument("--port", type=int, default=8765, help="gunicorn port")
+        parser.add_argument("--stats-ratio", type=float, default=0.2, help="share of stats requests")
+        parser.add_argument("--repeat-ratio", type=float, default=0.1, help="share of repeated fund requests")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--timeout", type=float, default=30, help="client timeout in seconds")
+        parser.add_argument("--mine", action="store_true", help="execute sent transactions on the local chain")
+        parser.add_argument("--output-dir", type=Path, default=RESULTS_DIR)
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options["concurrency"].split(",")]
+        workload = Workload(options["stats_ratio"], options["repeat_ratio"], options["seed"])
+
+        # gunicorn workers use a throwaway database too, its name is passed in POSTGRES_DB
+        old_name = connection.settings_dict["NAME"]
+        test_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        stand_in = RPCStandIn(mine=options["mine"])
+        stand_in.start()
+        try:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                env = {
+                    **os.environ,
+                    "POSTGRES_DB": test_name,
+                    "BLOCKCHAIN_PROVIDER_URL": stand_in.url,
+                    "BLOCKCHAIN_CHAIN_ID": str(stand_in.chain_id),
+                    "FAUCET_MNEMONIC_KEY": "",
+                    "FAUCET_PRIVATE_KEY": stand_in.faucet_account.key.to_0x_hex(),
+                    "FAUCET_QUEUE_ENABLED": "0",
+                    "FAUCET_COOLDOWN_CACHE_PATH": str(Path(tmp_dir) / "cooldowns"),
+                }
+                base_url = f"http://127.0.0.1:{options['port']}"
+                # every rejected request is logged with a traceback, keep the report readable
+                log_path = Path(tmp_dir) / "gunicorn.log"
+                with log_path.open("w") as log:
+                    server = subprocess.Popen(
+                        [
+                            sys.executable,
+                            "-m",
+                            "gunicorn",
+                            f"--bind=127.0.0.1:{options['port']}",
+                            f"--workers={options['workers']}",
+                            "--log-level=warning",
+                            "infrastructure.project.wsgi:application",
+                        ],
+                        cwd=SRC_DIR,
+                        env=env,
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                    )
+                    try:
+                        self.wait_until_ready(options["port"], server, log_path)
+                        reports = []
+                        for concurrency in levels:
+                            report = run_level(base_url, workload, concurrency, options["requests"], options["timeout"])
+                            self.print_report(report)
+                            reports.append(report)
+                    finally:
+                        server.terminate()
+                        server.wait()
+        finally:
+            stand_in.stop()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        results = {
+            "database": connection.vendor,
+            "workers": options["workers"],
+            "mine": options["mine"],
+            "stats_ratio": options["stats_ratio"],
+            "repeat_ratio": options["repeat_ratio"],
+            "levels": reports,
+        }
+        path = save_results("load", results, options["output_dir"])
+        self.stdout.write(self.style.SUCCESS(f"Results are saved to {path}"))
+
+    def wait_until_ready(self, port: int, server: subprocess.Popen, log_path: Path, timeout: float = 30) -> None:
+        deadline = monotonic() + timeout
+        while monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"gunicorn exited on start:\n{log_path.read_text()[-2000:]}")
+            try:
+                http = HTTPConnection("127.0.0.1", port, timeout=1)
+                http.request("GET", STATS_PATH)
+                if http.getresponse().status == 200:
+                    return
+            except OSError:
+                pass
+            sleep(0.2)
+        raise CommandError(f"gunicorn didn't answer in {timeout}s")
+
+    def print_report(self, report: dict) -> None:
+        self.stdout.write(f"\nconcurrency {report['concurrency']}: {report['throughput_rps']} requests/s")
+        for endpoint, latency in report["latency"].items():
+            outcomes = ", ".join(f"{outcome}: {n}" for outcome, n in sorted(report["outcomes"][endpoint].items()))
+            self.stdout.write(
+                f"  {endpoint:<18} p50 {latency['p50_ms']} ms, p95 {latency['p95_ms']} ms, "
+                f"p99 {latency['p99_ms']} ms ({outcomes})"
+            )
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from infrastructure.container import get_app_container
+from infrastructure.metrics import serve_metrics
+
+app_container = get_app_container()
+
+
+class Command(BaseCommand):
+    help = "Send queued fund requests"
+
+    def handle(self, *args, **options):
+        serve_metrics(settings.METRICS_PORT)
+        sender_service = app_container.faucet_sender_service()
+        try:
+            sender_service.run()
+        except KeyboardInterrupt:
+            sender_service.stop()
+            self.stdout.write(self.style.SUCCESS("FaucetSenderService stopped"))
@@ -0,0 +1,186 @@
+"""
+Prometheus metrics of the faucet.
+
+Under gunicorn every worker writes its samples to files in PROMETHEUS_MULTIPROC_DIR and the master
+serves the sum of all workers on METRICS_PORT. prometheus_client reads the variable on import,
+so it's set by gunicorn.conf.py before the application is loaded, not by the Django settings.
+Without the variable (management commands) the metrics of the process are served.
+"""
+
+import inspect
+import logging
+import os
+from functools import wraps
+from time import perf_counter
+from typing import Any, Callable, Sequence, TypeVar
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess, start_http_server
+
+from apps.shared.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RPC_REQUEST_SECONDS = Histogram(
+    "faucet_rpc_request_seconds",
+    "JSON-RPC requests to the node by method, batch requests are labeled with the method of their calls",
+    ["method", "batch"],
+)
+REPOSITORY_SECONDS = Histogram(
+    "faucet_repository_seconds",
+    "Calls of the faucet repositories by method",
+    ["method"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+FUND_WALLET_SECONDS = Histogram(
+    "faucet_fund_wallet_seconds",
+    "Total time of fund requests by outcome: sent, rejected by a cooldown or failed",
+    ["outcome"],
+)
+COOLDOWN_REJECTIONS = Counter(
+    "faucet_cooldown_rejections",
+    "Fund requests rejected by a cooldown, by reason (ip, wallet) and where it was found (cache, database, reservation)",
+    ["reason", "source"],
+)
+TRANSACTION_REPLACEMENTS = Counter(
+    "faucet_transaction_replacements",
+    "Stuck transactions sent again with higher fees by outcome: sent or failed",
+    ["outcome"],
+)
+# gauges are set by the transactions checker only, the last value is the current one
+PENDING_TRANSACTIONS = Gauge(
+    "faucet_pending_transactions",
+    "Pending transactions left after the last checker sweep",
+    multiprocess_mode="mostrecent",
+)
+TX_CHECKER_CHECKED_TRANSACTIONS = Gauge(
+    "faucet_tx_checker_checked_transactions",
+    "Pending transactions checked by the last checker sweep, mined in new blocks or due",
+    multiprocess_mode="mostrecent",
+)
+TX_CHECKER_SWEEP_SECONDS = Gauge(
+    "faucet_tx_checker_sweep_seconds",
+    "Duration of the last checker sweep",
+    multiprocess_mode="mostrecent",
+)
+
+# names used by the application services through the Metrics port
+SERVICE_METRICS: dict[str, Any] = {
+    "fund_wallet_seconds": FUND_WALLET_SECONDS,
+    "cooldown_rejections": COOLDOWN_REJECTIONS,
+    "transaction_replacements": TRANSACTION_REPLACEMENTS,
+    "pending_transactions": PENDING_TRANSACTIONS,
+    "tx_checker_checked_transactions": TX_CHECKER_CHECKED_TRANSACTIONS,
+    "tx_checker_sweep_seconds": TX_CHECKER_SWEEP_SECONDS,
+}
+
+
+class PrometheusMetrics(Metrics):
+    """Metrics port over the prometheus_client metrics of SERVICE_METRICS."""
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self._metric(name, labels).observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        self._metric(name, labels).inc(amount)
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        self._metric(name, labels).set(value)
+
+    @staticmethod
+    def _metric(name: str, labels: dict[str, str]) -> Any:
+        metric = SERVICE_METRICS[name]
+        return metric.labels(**labels) if labels else metric
+
+
+def batch_method(requests: Sequence[tuple[str, Any]]) -> str:
+    """Label of a batch request, our batches are made of calls of one method."""
+    methods = {method for method, _ in requests}
+    return methods.pop() if len(methods) == 1 else "mixed"
+
+
+def timed_methods(histogram: Histogram) -> Callable[[type[T]], type[T]]:
+    """
+    Class decorator, observes the duration of every public method in histogram labeled with the method name.
+
+    Coroutines are timed until they return, generators only while they produce items,
+    the time their consumer spends between items is not counted.
+    """
+
+    def decorate(cls: type[T]) -> type[T]:
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method):
+                continue
+            if inspect.isgeneratorfunction(method):
+                setattr(cls, name, _time_generator(histogram.labels(method=name), method))
+            elif inspect.iscoroutinefunction(method):
+                setattr(cls, name, _time_coroutine(histogram.labels(method=name), method))
+            else:
+                setattr(cls, name, _time_function(histogram.labels(method=name), method))
+        return cls
+
+    return decorate
+
+
+def _time_function(histogram: Histogram, method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        started_at = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - started_at)
+
+    return wrapper
+
+
+def _time_coroutine(histogram: Histogram, method: Callable) -> Callable:
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        started_at = perf_counter()
+        try:
+            return await method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - started_at)
+
+    return wrapper
+
+
+def _time_generator(histogram: Histogram, method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        iterator = method(*args, **kwargs)
+        spent = 0.0
+        try:
+            while True:
+                started_at = perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    spent += perf_counter() - started_at
+                yield item
+        finally:
+            iterator.close()
+            histogram.observe(spent)
+
+    return wrapper
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Registry to export, with the samples of all gunicorn workers in multiprocess mode."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def serve_metrics(port: int) -> None:
+    """Export metrics of a background command on its own port, never on the public port of a web server."""
+    if port:
+        start_http_server(port, registry=metrics_registry())
+        logger.info(f"Serving metrics on port {port}")
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaucetNonceModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=42, unique=True)),
+                ('next_nonce', models.PositiveBigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'faucet_nonces',
+            },
+        ),
+    ]
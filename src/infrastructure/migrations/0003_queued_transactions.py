@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0002_faucet_nonce'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='status',
+            field=models.CharField(choices=[('success', 'SUCCESS'), ('failed', 'FAILED'), ('pending', 'PENDING'), ('queued', 'QUEUED')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='tx_hash',
+            field=models.CharField(blank=True, max_length=66, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0003_queued_transactions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='tx_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=66, null=True),
+        ),
+    ]
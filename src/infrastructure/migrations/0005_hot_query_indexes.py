@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:44
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # indexes are built without locking the table for writes
+    atomic = False
+
+    dependencies = [
+        ('infrastructure', '0004_batch_payouts'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(fields=['ip_address', '-created_at'], name='faucet_tx_ip_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(fields=['wallet', '-created_at'], name='faucet_tx_wallet_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['id'], name='faucet_tx_pending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['id'], name='faucet_tx_queued_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(fields=['created_at'], name='faucet_tx_created_idx'),
+        ),
+        # single column indexes are covered by the composite ones
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='ip_address',
+            field=models.GenericIPAddressField(),
+        ),
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='wallet',
+            field=models.CharField(max_length=42),
+        ),
+    ]
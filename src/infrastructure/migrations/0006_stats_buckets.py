@@ -0,0 +1,47 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:45
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncHour
+
+
+def backfill_stats_buckets(apps, schema_editor):
+    FaucetTransactionModel = apps.get_model('infrastructure', 'FaucetTransactionModel')
+    FaucetStatsBucketModel = apps.get_model('infrastructure', 'FaucetStatsBucketModel')
+
+    rows = (
+        FaucetTransactionModel.objects.annotate(bucket=TruncHour('created_at', tzinfo=timezone.utc))
+        .values('bucket', 'status')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    FaucetStatsBucketModel.objects.bulk_create(
+        (FaucetStatsBucketModel(bucket=row['bucket'], status=row['status'], count=row['count']) for row in rows),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaucetStatsBucketModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField()),
+                ('status', models.CharField(choices=[('success', 'SUCCESS'), ('failed', 'FAILED'), ('pending', 'PENDING'), ('queued', 'QUEUED')], max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'faucet_stats_buckets',
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'status'), name='faucet_stats_bucket_status_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_stats_buckets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 09:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0006_stats_buckets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='sender',
+            field=models.CharField(blank=True, max_length=42, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0007_faucet_transaction_sender'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FaucetCooldownReservationModel',
+            fields=[
+                ('slot', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('token', models.CharField(max_length=32)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'faucet_cooldown_reservations',
+            },
+        ),
+    ]
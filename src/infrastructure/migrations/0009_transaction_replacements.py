@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0008_cooldown_reservations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='broadcast_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='max_fee_per_gas',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True),
+        ),
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='max_priority_fee_per_gas',
+            field=models.DecimalField(blank=True, decimal_places=0, max_digits=78, null=True),
+        ),
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='nonce',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='replacements',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='FaucetTransactionReplacementModel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('replaced_tx_hash', models.CharField(max_length=66)),
+                ('tx_hash', models.CharField(max_length=66)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='replaced_hashes', to='infrastructure.faucettransactionmodel')),
+            ],
+            options={
+                'db_table': 'faucet_transaction_replacements',
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:40
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # the index is built without locking the table for writes
+    atomic = False
+
+    dependencies = [
+        ('infrastructure', '0009_transaction_replacements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='faucettransactionmodel',
+            name='next_check_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='faucettransactionreplacementmodel',
+            name='replaced_tx_hash',
+            field=models.CharField(db_index=True, max_length=66),
+        ),
+        AddIndexConcurrently(
+            model_name='faucettransactionmodel',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['next_check_at'], name='faucet_tx_pending_due_idx'),
+        ),
+    ]
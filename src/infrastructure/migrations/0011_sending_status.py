@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 10:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('infrastructure', '0010_pending_check_schedule'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='faucetstatsbucketmodel',
+            name='status',
+            field=models.CharField(choices=[('success', 'SUCCESS'), ('failed', 'FAILED'), ('pending', 'PENDING'), ('queued', 'QUEUED'), ('sending', 'SENDING')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='faucettransactionmodel',
+            name='status',
+            field=models.CharField(choices=[('success', 'SUCCESS'), ('failed', 'FAILED'), ('pending', 'PENDING'), ('queued', 'QUEUED'), ('sending', 'SENDING')], max_length=20),
+        ),
+    ]
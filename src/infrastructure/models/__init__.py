@@ -1,7 +1,15 @@
 # isort:skip_file
 from .faucet_transaction import FaucetTransactionModel
+from .faucet_nonce import FaucetNonceModel
+from .faucet_stats_bucket import FaucetStatsBucketModel
+from .faucet_cooldown_reservation import FaucetCooldownReservationModel
+from .faucet_transaction_replacement import FaucetTransactionReplacementModel
 
 
 __all__ = [
     "FaucetTransactionModel",
+    "FaucetNonceModel",
+    "FaucetStatsBucketModel",
+    "FaucetCooldownReservationModel",
+    "FaucetTransactionReplacementModel",
 ]
@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class FaucetCooldownReservationModel(models.Model):
+    # "ip:<address>" or "wallet:<address>"
+    slot = models.CharField(max_length=64, primary_key=True)
+    token = models.CharField(max_length=32)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "faucet_cooldown_reservations"
+
+    def __str__(self):
+        return f"{self.slot} reserved until {self.expires_at}"
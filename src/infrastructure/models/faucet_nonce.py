@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class FaucetNonceModel(models.Model):
+    address = models.CharField(max_length=42, unique=True)  # Standard Ethereum address length
+    next_nonce = models.PositiveBigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "faucet_nonces"
+
+    def __str__(self):
+        return f"Next nonce {self.next_nonce} for {self.address}"
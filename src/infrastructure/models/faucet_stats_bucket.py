@@ -0,0 +1,23 @@
+from django.db import models
+
+from apps.blockchain.domain.value_objects import TransactionStatus
+
+
+class FaucetStatsBucketModel(models.Model):
+    """Number of transactions created within an hour, by their current status."""
+
+    bucket = models.DateTimeField()  # start of the hour, UTC
+    status = models.CharField(
+        max_length=20,
+        choices=TransactionStatus.choices(),
+    )
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "faucet_stats_buckets"
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "status"], name="faucet_stats_bucket_status_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.count} {self.status} transactions at {self.bucket}"
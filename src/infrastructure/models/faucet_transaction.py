@@ -1,22 +1,49 @@
 from django.db import models
+from django.db.models import Q
 
 from apps.blockchain.domain.value_objects import TransactionStatus
 
 
 class FaucetTransactionModel(models.Model):
-    tx_hash = models.CharField(max_length=66, unique=True)  # Typical length for Ethereum tx hash
+    # Typical length for Ethereum tx hash, empty while the request is queued.
+    # Not unique, requests paid in one batch share the transaction
+    tx_hash = models.CharField(max_length=66, db_index=True, null=True, blank=True)
     status = models.CharField(
         max_length=20,
         choices=TransactionStatus.choices(),
     )
-    ip_address = models.GenericIPAddressField(db_index=True)
-    wallet = models.CharField(max_length=42, db_index=True)  # Standard Ethereum address length
+    ip_address = models.GenericIPAddressField()
+    wallet = models.CharField(max_length=42)  # Standard Ethereum address length
     amount = models.DecimalField(max_digits=78, decimal_places=18)  # For Ethereum amounts (18 decimals)
     created_at = models.DateTimeField(auto_now_add=True)
     error = models.TextField(null=True, blank=True)
+    # faucet account which sent the transaction, empty while the request is queued
+    sender = models.CharField(max_length=42, null=True, blank=True)
+    # nonce and fees of tx_hash, a stuck transaction is sent again with the same nonce and higher fees
+    nonce = models.PositiveBigIntegerField(null=True, blank=True)
+    max_fee_per_gas = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True)
+    max_priority_fee_per_gas = models.DecimalField(max_digits=78, decimal_places=0, null=True, blank=True)
+    broadcast_at = models.DateTimeField(null=True, blank=True)
+    # replaced hashes are in faucet_transaction_replacements, they are read only if there are some
+    replacements = models.PositiveIntegerField(default=0)
+    # receipt checks of a pending transaction are postponed exponentially, never checked ones are due
+    next_check_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
 
     class Meta:
         db_table = "faucet_transactions"
+        indexes = [
+            # last transaction by IP / wallet is read from the top of the index, no sort
+            models.Index(fields=["ip_address", "-created_at"], name="faucet_tx_ip_created_idx"),
+            models.Index(fields=["wallet", "-created_at"], name="faucet_tx_wallet_created_idx"),
+            # only a few rows are pending or queued, partial indexes stay small however big the table is
+            models.Index(fields=["id"], condition=Q(status="pending"), name="faucet_tx_pending_idx"),
+            models.Index(fields=["id"], condition=Q(status="queued"), name="faucet_tx_queued_idx"),
+            # the checker reads only pending transactions which are due
+            models.Index(fields=["next_check_at"], condition=Q(status="pending"), name="faucet_tx_pending_due_idx"),
+            # stats for the last 24 hours
+            models.Index(fields=["created_at"], name="faucet_tx_created_idx"),
+        ]
 
     def __str__(self):
         return f"Transaction {self.tx_hash} {self.amount} ETH to {self.wallet}"
@@ -0,0 +1,19 @@
+from django.db import models
+
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+
+
+class FaucetTransactionReplacementModel(models.Model):
+    """A stuck transaction was sent again, any of its hashes may be mined."""
+
+    transaction = models.ForeignKey(FaucetTransactionModel, on_delete=models.CASCADE, related_name="replaced_hashes")
+    # transactions of new blocks are looked up by any of their hashes
+    replaced_tx_hash = models.CharField(max_length=66, db_index=True)
+    tx_hash = models.CharField(max_length=66)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "faucet_transaction_replacements"
+
+    def __str__(self):
+        return f"Transaction {self.replaced_tx_hash} replaced by {self.tx_hash}"
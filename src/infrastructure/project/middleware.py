@@ -0,0 +1,36 @@
+import re
+from uuid import uuid4
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# ids of a proxy or client are trusted only if they look like ids, they end up in the traces
+REQUEST_ID_RE = re.compile(r"[\w.\-]{1,64}")
+
+
+def get_request_id(request) -> str:
+    request_id = request.headers.get(REQUEST_ID_HEADER, "")
+    return request_id if REQUEST_ID_RE.fullmatch(request_id) else uuid4().hex
+
+
+@sync_and_async_middleware
+def request_id_middleware(get_response):
+    """Sets request.request_id, from X-Request-ID of the proxy or a new one, and returns it in the response."""
+    if iscoroutinefunction(get_response):
+
+        async def async_middleware(request):
+            request.request_id = get_request_id(request)
+            response = await get_response(request)
+            response[REQUEST_ID_HEADER] = request.request_id
+            return response
+
+        return async_middleware
+
+    def middleware(request):
+        request.request_id = get_request_id(request)
+        response = get_response(request)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    return middleware
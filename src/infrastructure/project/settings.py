@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 import logging
 import os
+import tempfile
 from pathlib import Path
 
 from eth_account import Account
@@ -50,6 +51,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "infrastructure.project.middleware.request_id_middleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -150,21 +152,84 @@ BLOCKCHAIN_PROVIDER_URL = os.getenv("BLOCKCHAIN_PROVIDER_URL")
 BLOCKCHAIN_CHAIN_ID = int(os.getenv("BLOCKCHAIN_CHAIN_ID", "0"))
 if not BLOCKCHAIN_PROVIDER_URL or not BLOCKCHAIN_CHAIN_ID:
     raise ValueError("BLOCKCHAIN_PROVIDER_URL and BLOCKCHAIN_CHAIN_ID are required")
+# several comma separated URLs of the same chain are used together, the fastest healthy node serves requests
+BLOCKCHAIN_PROVIDER_URLS = [url.strip() for url in BLOCKCHAIN_PROVIDER_URL.split(",") if url.strip()]
+# failing node is not used during this time
+BLOCKCHAIN_RPC_EJECT_SECONDS = float(os.getenv("BLOCKCHAIN_RPC_EJECT_SECONDS", 30))
+# number of nodes a signed transaction is sent to
+BLOCKCHAIN_RPC_BROADCAST_TO = int(os.getenv("BLOCKCHAIN_RPC_BROADCAST_TO", 2))
+
+# gas fees are refreshed after TTL, stale fees are used only while the node is not available
+BLOCKCHAIN_FEE_TTL_SECONDS = float(os.getenv("BLOCKCHAIN_FEE_TTL_SECONDS", 12))
+BLOCKCHAIN_FEE_MAX_STALE_SECONDS = float(os.getenv("BLOCKCHAIN_FEE_MAX_STALE_SECONDS", 60))
+# how long to remember whether a recipient address is a contract
+BLOCKCHAIN_CODE_CACHE_TTL_SECONDS = float(os.getenv("BLOCKCHAIN_CODE_CACHE_TTL_SECONDS", 3600))
+# max number of calls in one JSON-RPC batch request, some providers limit it
+BLOCKCHAIN_RPC_BATCH_SIZE = int(os.getenv("BLOCKCHAIN_RPC_BATCH_SIZE", 100))
+# connections to the node kept alive by the process, should cover the number of worker threads
+BLOCKCHAIN_RPC_POOL_SIZE = int(os.getenv("BLOCKCHAIN_RPC_POOL_SIZE", 10))
+BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS = float(os.getenv("BLOCKCHAIN_RPC_CONNECT_TIMEOUT_SECONDS", 3))
+BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS = float(os.getenv("BLOCKCHAIN_RPC_READ_TIMEOUT_SECONDS", 10))
 
 FAUCET_MNEMONIC_KEY = os.getenv("FAUCET_MNEMONIC_KEY")
+# one private key or comma separated keys of several faucet accounts
 FAUCET_PRIVATE_KEY = os.getenv("FAUCET_PRIVATE_KEY")
+# number of accounts derived from the mnemonic at m/44'/60'/0'/0/{index}, payouts are spread over them
+FAUCET_ACCOUNTS_COUNT = int(os.getenv("FAUCET_ACCOUNTS_COUNT", 1))
+# how long a fetched balance of a faucet account is trusted, sent transactions are subtracted in between
+FAUCET_ACCOUNT_BALANCE_TTL_SECONDS = float(os.getenv("FAUCET_ACCOUNT_BALANCE_TTL_SECONDS", 60))
 
 
-FAUCET_ACCOUNT: LocalAccount
+FAUCET_ACCOUNTS: list[LocalAccount]
 if FAUCET_MNEMONIC_KEY:
     Account.enable_unaudited_hdwallet_features()
-    FAUCET_ACCOUNT = Account.from_mnemonic(FAUCET_MNEMONIC_KEY)
-    logger.info(f"Using account {FAUCET_ACCOUNT.address} from mnemonic phrase")
+    FAUCET_ACCOUNTS = [
+        Account.from_mnemonic(FAUCET_MNEMONIC_KEY, account_path=f"m/44'/60'/0'/0/{index}")
+        for index in range(FAUCET_ACCOUNTS_COUNT)
+    ]
+    logger.info(f"Using accounts {[account.address for account in FAUCET_ACCOUNTS]} from mnemonic phrase")
 elif FAUCET_PRIVATE_KEY:
-    FAUCET_ACCOUNT = Account.from_key(FAUCET_PRIVATE_KEY)
-    logger.info(f"Using account {FAUCET_ACCOUNT.address} from private key")
+    FAUCET_ACCOUNTS = [Account.from_key(key.strip()) for key in FAUCET_PRIVATE_KEY.split(",") if key.strip()]
+    logger.info(f"Using accounts {[account.address for account in FAUCET_ACCOUNTS]} from private keys")
 else:
     raise ValueError("FAUCET_MNEMONIC_KEY or FAUCET_PRIVATE_KEY is required")
 
 FAUCET_THRESHOLD_TIMEOUT_MINUTES = int(os.getenv("FAUCET_THRESHOLD_TIMEOUT_MINUTES", 1))
 FAUCET_AMOUNT_ETH = os.getenv("FAUCET_AMOUNT_ETH", "0.0001")
+# active cooldowns shared by all workers of the host, the file should be on tmpfs
+FAUCET_COOLDOWN_CACHE_PATH = os.getenv(
+    "FAUCET_COOLDOWN_CACHE_PATH",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "faucet_cooldowns"),
+)
+FAUCET_COOLDOWN_CACHE_SLOTS = int(os.getenv("FAUCET_COOLDOWN_CACHE_SLOTS", 65_536))
+# a fund request holds its IP and wallet while it's paid, a crashed worker's hold is taken over after this time
+FAUCET_COOLDOWN_RESERVATION_SECONDS = float(os.getenv("FAUCET_COOLDOWN_RESERVATION_SECONDS", 120))
+# stats endpoint answers from memory during this time
+FAUCET_STATS_CACHE_TTL_SECONDS = float(os.getenv("FAUCET_STATS_CACHE_TTL_SECONDS", 5))
+
+# with queue enabled fund requests are answered with 202 and sent by the send_queued_transactions command
+FAUCET_QUEUE_ENABLED = os.getenv("FAUCET_QUEUE_ENABLED", "0") == "1"
+FAUCET_SENDER_LOOP_TIMEOUT_SECONDS = float(os.getenv("FAUCET_SENDER_LOOP_TIMEOUT_SECONDS", 1))
+FAUCET_SENDER_BATCH_SIZE = int(os.getenv("FAUCET_SENDER_BATCH_SIZE", 50))
+# disperse contract address, when set queued requests are paid in batches of FAUCET_SENDER_BATCH_SIZE
+FAUCET_DISPERSE_CONTRACT = os.getenv("FAUCET_DISPERSE_CONTRACT") or None
+
+# transactions checker polls for new blocks, should be less than the block time of the chain
+TX_CHECKER_LOOP_TIMEOUT_SECONDS = float(os.getenv("TX_CHECKER_LOOP_TIMEOUT_SECONDS", 2))
+# pending transactions are read and checked this many at a time
+TX_CHECKER_CHUNK_SIZE = int(os.getenv("TX_CHECKER_CHUNK_SIZE", 1000))
+# a transaction pending for longer is sent again with higher fees, it blocks later nonces of its account (0 = never)
+TX_CHECKER_STUCK_SECONDS = float(os.getenv("TX_CHECKER_STUCK_SECONDS", 300))
+TX_CHECKER_MAX_REPLACEMENTS = int(os.getenv("TX_CHECKER_MAX_REPLACEMENTS", 5))
+# a pending transaction not seen in a block is checked again after this delay, doubled after every check
+TX_CHECKER_BACKOFF_SECONDS = float(os.getenv("TX_CHECKER_BACKOFF_SECONDS", 5))
+TX_CHECKER_MAX_BACKOFF_SECONDS = float(os.getenv("TX_CHECKER_MAX_BACKOFF_SECONDS", 300))
+
+# share of fund requests traced stage by stage, traces are appended as JSON lines to TRACING_EXPORT_PATH
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", 0))
+# requests slower than this are exported even if they are not sampled, empty to export only sampled ones
+TRACING_SLOW_SECONDS = float(os.getenv("TRACING_SLOW_SECONDS") or 0) or None
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH", os.path.join(tempfile.gettempdir(), "faucet_traces.jsonl"))
+
+# port of /metrics, served apart from the API by the gunicorn master and the background commands, 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))
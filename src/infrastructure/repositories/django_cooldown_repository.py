@@ -0,0 +1,49 @@
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.utils import timezone
+
+from apps.blockchain.domain.repository import ICooldownRepository
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.metrics import REPOSITORY_SECONDS, timed_methods
+from infrastructure.models.faucet_cooldown_reservation import FaucetCooldownReservationModel
+from infrastructure.tracing import traced_methods
+
+TABLE = FaucetCooldownReservationModel._meta.db_table
+
+# a slot is taken over only when its reservation has expired, the conflict check and the write are one statement
+RESERVE_SQL = f"""
+    INSERT INTO {TABLE} (slot, token, expires_at) VALUES {{values}}
+    ON CONFLICT (slot) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at
+    WHERE {TABLE}.expires_at <= %s
+    RETURNING slot
+"""
+
+
+@timed_methods(REPOSITORY_SECONDS)
+@traced_methods("repository")
+class DjangoCooldownRepository(ICooldownRepository):
+    """
+    Reservations are rows of faucet_cooldown_reservations keyed by slot, claimed with INSERT ... ON CONFLICT.
+
+    On PostgreSQL a request claiming a slot which is being claimed by another one waits for its statement
+    and then sees the new reservation, on SQLite writes are serialized anyway. Slots of a request are
+    always passed in the same order (IP first), so two requests can't wait for each other.
+    Rows are deleted on release, only reservations of crashed workers stay until they are taken over.
+    """
+
+    def reserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]:
+        expires_at = connection.ops.adapt_datetimefield_value(until.dt)
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        params = [value for slot in slots for value in (slot, token, expires_at)]
+        with connection.cursor() as cursor:
+            cursor.execute(RESERVE_SQL.format(values=", ".join(["(%s, %s, %s)"] * len(slots))), [*params, now])
+            return {slot for (slot,) in cursor.fetchall()}
+
+    def release(self, slots: list[str], token: str) -> None:
+        FaucetCooldownReservationModel.objects.filter(slot__in=slots, token=token).delete()
+
+    async def areserve(self, slots: list[str], token: str, until: DomainDateTime) -> set[str]:
+        return await sync_to_async(self.reserve)(slots, token, until)
+
+    async def arelease(self, slots: list[str], token: str) -> None:
+        await sync_to_async(self.release)(slots, token)
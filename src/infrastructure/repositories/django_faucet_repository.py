@@ -1,87 +1,431 @@
+from collections import Counter
+from datetime import UTC, datetime, timedelta
 from decimal import Decimal
+from typing import Any, Iterator
 
-from django.db.models import Count, Q
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, QuerySet, Sum
 
-from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.entities import CooldownState, FaucetTransaction, PendingTransaction
 from apps.blockchain.domain.repository import IFaucetTransactionsRepository
 from apps.blockchain.domain.value_objects import (
+    GasFees,
     IPAddress,
     TokenAmount,
     TransactionHash,
     TransactionStatus,
     WalletAddress,
 )
+from apps.shared.tracing import set_attributes
 from apps.shared.value_objects.datetime import DomainDateTime
-from apps.shared.value_objects.id import RequiredId
+from apps.shared.value_objects.id import Id, RequiredId
+from infrastructure.metrics import REPOSITORY_SECONDS, timed_methods
+from infrastructure.models.faucet_stats_bucket import FaucetStatsBucketModel
 from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.models.faucet_transaction_replacement import FaucetTransactionReplacementModel
+from infrastructure.tracing import traced_methods
 
+STATS_BUCKET_SIZE = timedelta(hours=1)
+# what the status checker reads of a pending transaction
+PENDING_FIELDS = ("id", "tx_hash", "replacements", "attempts")
 
+# last transaction from the IP and to the wallet since the given time, both from the top of their indexes
+COOLDOWN_STATE_SQL = f"""
+    SELECT
+        (SELECT created_at FROM {FaucetTransactionModel._meta.db_table}
+         WHERE ip_address = %s AND created_at >= %s ORDER BY created_at DESC LIMIT 1),
+        (SELECT created_at FROM {FaucetTransactionModel._meta.db_table}
+         WHERE wallet = %s AND created_at >= %s ORDER BY created_at DESC LIMIT 1)
+"""
+
+
+def stats_bucket(dt: datetime) -> datetime:
+    """Start of the stats bucket the moment belongs to."""
+    return dt.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+@timed_methods(REPOSITORY_SECONDS)
+@traced_methods("repository")
 class DjangoFaucetTransactionsRepository(IFaucetTransactionsRepository):
+    """
+    Transactions are stored in faucet_transactions, counts by status are maintained in faucet_stats_buckets.
+
+    Every status change goes through this repository, so a bucket always has the number of transactions
+    created within its hour by their current status, and stats don't have to scan the transactions.
+    """
+
     def create(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
         """Create a new faucet transaction or raise an exception if it already exists."""
-        obj = FaucetTransactionModel.objects.create(
-            tx_hash=faucet_transaction.tx_hash.value,
-            status=faucet_transaction.status.value,
-            ip_address=faucet_transaction.ip_address.value,
-            wallet=faucet_transaction.wallet.value,
-            amount=Decimal(faucet_transaction.amount.to_wei()),
-            error=faucet_transaction.error if faucet_transaction.error else None,
-        )
+        with transaction.atomic():
+            obj = FaucetTransactionModel.objects.create(
+                tx_hash=faucet_transaction.tx_hash.value if faucet_transaction.tx_hash else None,
+                status=faucet_transaction.status.value,
+                ip_address=faucet_transaction.ip_address.value,
+                wallet=faucet_transaction.wallet.value,
+                amount=Decimal(faucet_transaction.amount.to_wei()),
+                error=faucet_transaction.error if faucet_transaction.error else None,
+                sender=faucet_transaction.sender.value if faucet_transaction.sender else None,
+                **self._broadcast_fields(faucet_transaction),
+            )
+            self._add_to_stats(Counter({(stats_bucket(obj.created_at), obj.status): 1}))
         faucet_transaction.id = RequiredId(obj.pk)
         return faucet_transaction
 
     def update(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
         """Update an existing faucet transaction."""
-        obj = FaucetTransactionModel.objects.get(pk=faucet_transaction.pk.value)
-        obj.tx_hash = faucet_transaction.tx_hash.value
-        obj.status = faucet_transaction.status.value
-        obj.ip_address = faucet_transaction.ip_address.value
-        obj.wallet = faucet_transaction.wallet.value
-        obj.amount = Decimal(faucet_transaction.amount.to_wei())
-        obj.error = faucet_transaction.error if faucet_transaction.error else None
-        obj.save()
+        with transaction.atomic():
+            obj = FaucetTransactionModel.objects.select_for_update().get(pk=faucet_transaction.pk.value)
+            old_status = obj.status
+            obj.tx_hash = faucet_transaction.tx_hash.value if faucet_transaction.tx_hash else None
+            obj.status = faucet_transaction.status.value
+            obj.ip_address = faucet_transaction.ip_address.value
+            obj.wallet = faucet_transaction.wallet.value
+            obj.amount = Decimal(faucet_transaction.amount.to_wei())
+            obj.error = faucet_transaction.error if faucet_transaction.error else None
+            obj.sender = faucet_transaction.sender.value if faucet_transaction.sender else None
+            for name, value in self._broadcast_fields(faucet_transaction).items():
+                setattr(obj, name, value)
+            obj.save()
+
+            if old_status != obj.status:
+                bucket = stats_bucket(obj.created_at)
+                self._add_to_stats(Counter({(bucket, old_status): -1, (bucket, obj.status): 1}))
         return faucet_transaction
 
-    def get_last_by_ip(self, ip_address: str) -> FaucetTransaction | None:
-        """Get the last faucet transaction by IP address."""
-        try:
-            obj = FaucetTransactionModel.objects.filter(ip_address=ip_address).latest("created_at")
-        except FaucetTransactionModel.DoesNotExist:
-            return None
-        return self.model_to_entity(obj)
+    def update_statuses(
+        self, statuses: dict[Id, TransactionStatus], mined_hashes: dict[Id, TransactionHash] | None = None
+    ) -> None:
+        """
+        Update statuses with one UPDATE per distinct status, only the status column is written.
+
+        A transaction resolved by one of its replaced hashes gets that hash, it's an UPDATE per transaction,
+        but replacements are rare.
+        """
+        new_statuses = {RequiredId(pk).value: status.value for pk, status in statuses.items()}
+
+        with transaction.atomic():
+            # current statuses are needed to move the counts between stats buckets
+            rows = (
+                FaucetTransactionModel.objects.select_for_update()
+                .filter(pk__in=new_statuses.keys())
+                .values_list("pk", "status", "created_at")
+            )
+
+            ids_by_status: dict[str, list[int]] = {}
+            stats: Counter[tuple[datetime, str]] = Counter()
+            for pk, old_status, created_at in rows:
+                new_status = new_statuses[str(pk)]
+                if new_status == old_status:
+                    continue
+                ids_by_status.setdefault(new_status, []).append(pk)
+                bucket = stats_bucket(created_at)
+                stats[(bucket, old_status)] -= 1
+                stats[(bucket, new_status)] += 1
+
+            for status, ids in ids_by_status.items():
+                FaucetTransactionModel.objects.filter(pk__in=ids).update(status=status)
+            for transaction_id, tx_hash in (mined_hashes or {}).items():
+                FaucetTransactionModel.objects.filter(pk=RequiredId(transaction_id).value).update(tx_hash=tx_hash.value)
+            self._add_to_stats(stats)
+        set_attributes(rows=sum(len(ids) for ids in ids_by_status.values()))
 
-    def get_last_by_wallet(self, wallet_address: str) -> FaucetTransaction | None:
-        """Get the last faucet transaction by wallet address."""
-        try:
-            obj = FaucetTransactionModel.objects.filter(wallet=wallet_address).latest("created_at")
-        except FaucetTransactionModel.DoesNotExist:
+    def get_by_id(self, transaction_id: Id) -> FaucetTransaction | None:
+        """Get faucet transaction by id."""
+        if transaction_id.value is None or not transaction_id.value.isdigit():
             return None
-        return self.model_to_entity(obj)
+        obj = FaucetTransactionModel.objects.filter(pk=transaction_id.value).first()
+        return self.model_to_entity(obj) if obj else None
+
+    def get_cooldown_state(self, ip_address: str, wallet_address: str, since: DomainDateTime) -> CooldownState:
+        """
+        Both times are read by one query, each by a LIMIT 1 subquery from the top of the (ip_address, -created_at)
+        and (wallet, -created_at) indexes. Only the timestamps are read, no model is built.
+
+        The SQL is fixed, compiling the same subqueries with the ORM takes longer than the round trip it saves.
+        """
+        since_value = connection.ops.adapt_datetimefield_value(since.dt)
+        with connection.cursor() as cursor:
+            cursor.execute(COOLDOWN_STATE_SQL, [ip_address, since_value, wallet_address, since_value])
+            last_ip_tx_at, last_wallet_tx_at = cursor.fetchone()
+
+        set_attributes(rows=(last_ip_tx_at is not None) + (last_wallet_tx_at is not None))
+        return CooldownState(
+            last_ip_tx_at=self._created_at_from_db(last_ip_tx_at),
+            last_wallet_tx_at=self._created_at_from_db(last_wallet_tx_at),
+        )
 
     def get_pending_transactions(self) -> list[FaucetTransaction]:
         qs = FaucetTransactionModel.objects.filter(status=TransactionStatus.PENDING.value)
         return [self.model_to_entity(obj) for obj in qs]
 
+    def iter_pending_transactions(
+        self, chunk_size: int, due_before: DomainDateTime | None = None
+    ) -> Iterator[PendingTransaction]:
+        """
+        Stream pending transactions, one query per chunk_size rows and only id, hashes and attempts are read.
+
+        Chunks are paged by id (keyset), so every query is a short range scan of the partial pending index
+        and statuses resolved by the caller between chunks don't shift the next page.
+        With due_before the rows come from the partial (next_check_at) index, only those which are due.
+        Replaced hashes are read with one more query, only for chunks with replaced transactions.
+        """
+        qs = FaucetTransactionModel.objects.filter(status=TransactionStatus.PENDING.value, tx_hash__isnull=False)
+        if due_before is not None:
+            qs = qs.filter(Q(next_check_at__isnull=True) | Q(next_check_at__lte=due_before.dt))
+
+        last_id = 0
+        while True:
+            rows = list(qs.filter(id__gt=last_id).order_by("id").values_list(*PENDING_FIELDS)[:chunk_size])
+            yield from self._pending_from_rows(rows)
+
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    def count_pending_transactions(self) -> int:
+        """Counted from the partial pending index, it has only the pending rows."""
+        return FaucetTransactionModel.objects.filter(status=TransactionStatus.PENDING.value).count()
+
+    def get_pending_by_hashes(self, tx_hashes: set[TransactionHash]) -> list[PendingTransaction]:
+        """Looked up by the tx_hash index and by the replaced_tx_hash index of the replacements."""
+        values = [tx_hash.value for tx_hash in tx_hashes]
+        replaced_ids = FaucetTransactionReplacementModel.objects.filter(replaced_tx_hash__in=values).values(
+            "transaction_id"
+        )
+        rows = list(
+            FaucetTransactionModel.objects.filter(
+                Q(tx_hash__in=values) | Q(id__in=replaced_ids), status=TransactionStatus.PENDING.value
+            )
+            .order_by("id")
+            .values_list(*PENDING_FIELDS)
+        )
+        return list(self._pending_from_rows(rows))
+
+    def schedule_checks(self, checks: dict[Id, tuple[int, DomainDateTime]]) -> None:
+        """One UPDATE ... CASE per 1000 transactions."""
+        FaucetTransactionModel.objects.bulk_update(
+            [
+                FaucetTransactionModel(pk=RequiredId(pk).value, attempts=attempts, next_check_at=next_check_at.dt)
+                for pk, (attempts, next_check_at) in checks.items()
+            ],
+            ["attempts", "next_check_at"],
+            batch_size=1000,
+        )
+        set_attributes(rows=len(checks))
+
+    def get_stuck_transactions(
+        self, broadcast_before: DomainDateTime, max_replacements: int, limit: int
+    ) -> list[FaucetTransaction]:
+        """
+        Pending transactions sent before the given time which can still be replaced, oldest first.
+
+        Requests paid by one batch share the transaction, so all of them are returned with the first one.
+        """
+        stuck_hashes = set(
+            FaucetTransactionModel.objects.filter(
+                status=TransactionStatus.PENDING.value,
+                nonce__isnull=False,
+                broadcast_at__lt=broadcast_before.dt,
+                replacements__lt=max_replacements,
+            )
+            .order_by("id")
+            .values_list("tx_hash", flat=True)[:limit]
+        )
+        if not stuck_hashes:
+            return []
+
+        qs = FaucetTransactionModel.objects.filter(
+            status=TransactionStatus.PENDING.value, tx_hash__in=stuck_hashes
+        ).order_by("id")
+        return [self.model_to_entity(obj) for obj in qs]
+
+    def save_replacement(self, transactions: list[FaucetTransaction], replaced_tx_hash: TransactionHash) -> None:
+        """Save the new hash, nonce and fees of the transactions and remember the replaced hash."""
+        replacements = []
+        with transaction.atomic():
+            for faucet_transaction in transactions:
+                if faucet_transaction.tx_hash is None:
+                    raise ValueError(f"Replacement of {replaced_tx_hash.value} has no hash")
+                FaucetTransactionModel.objects.filter(pk=faucet_transaction.pk.value).update(
+                    tx_hash=faucet_transaction.tx_hash.value,
+                    replacements=F("replacements") + 1,
+                    next_check_at=None,
+                    attempts=0,
+                    **self._broadcast_fields(faucet_transaction),
+                )
+                faucet_transaction.replacements += 1
+                replacements.append(
+                    FaucetTransactionReplacementModel(
+                        transaction_id=faucet_transaction.pk.value,
+                        replaced_tx_hash=replaced_tx_hash.value,
+                        tx_hash=faucet_transaction.tx_hash.value,
+                    )
+                )
+            FaucetTransactionReplacementModel.objects.bulk_create(replacements)
+
+    def claim_queued_transactions(self, limit: int) -> list[FaucetTransaction]:
+        """
+        Queued rows are locked with SKIP LOCKED and moved to sending in the same transaction,
+        so a second sender takes the next rows and a claimed row is never taken again.
+        """
+        with transaction.atomic():
+            objs = list(
+                FaucetTransactionModel.objects.select_for_update(skip_locked=True)
+                .filter(status=TransactionStatus.QUEUED.value)
+                .order_by("id")[:limit]
+            )
+            if not objs:
+                return []
+
+            FaucetTransactionModel.objects.filter(pk__in=[obj.pk for obj in objs]).update(
+                status=TransactionStatus.SENDING.value
+            )
+            stats: Counter[tuple[datetime, str]] = Counter()
+            for obj in objs:
+                bucket = stats_bucket(obj.created_at)
+                stats[(bucket, obj.status)] -= 1
+                stats[(bucket, TransactionStatus.SENDING.value)] += 1
+                obj.status = TransactionStatus.SENDING.value
+            self._add_to_stats(stats)
+        set_attributes(rows=len(objs))
+        return [self.model_to_entity(obj) for obj in objs]
+
     def cnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]:
-        """Get the number of successful, pending, and failed transactions."""
-        stats = FaucetTransactionModel.objects.filter(created_at__gte=since_dt.dt).aggregate(
-            successful=Count("id", filter=Q(status=TransactionStatus.SUCCESS.value)),
-            pending=Count("id", filter=Q(status=TransactionStatus.PENDING.value)),
-            failed=Count("id", filter=Q(status=TransactionStatus.FAILED.value)),
+        """Get the number of successful, pending (including queued and sending), and failed transactions."""
+        buckets, tail = self._stats_querysets(since_dt)
+        return self._stats_to_tuple([*buckets, *tail])
+
+    async def acreate(self, faucet_transaction: FaucetTransaction) -> FaucetTransaction:
+        # the transaction and stats buckets are written atomically, async ORM can't open a transaction
+        return await sync_to_async(self.create)(faucet_transaction)
+
+    async def aget_cooldown_state(self, ip_address: str, wallet_address: str, since: DomainDateTime) -> CooldownState:
+        return await sync_to_async(self.get_cooldown_state)(ip_address, wallet_address, since)
+
+    async def acnt_stats(self, since_dt: DomainDateTime) -> tuple[int, int, int]:
+        buckets, tail = self._stats_querysets(since_dt)
+        return self._stats_to_tuple([row async for row in buckets] + [row async for row in tail])
+
+    @classmethod
+    def _pending_from_rows(cls, rows: list[tuple]) -> Iterator[PendingTransaction]:
+        replaced_hashes = cls._replaced_hashes([pk for pk, _, replacements, _ in rows if replacements])
+        for pk, tx_hash, _, attempts in rows:
+            yield PendingTransaction(
+                id=RequiredId(pk),
+                tx_hash=TransactionHash.from_trusted(tx_hash),
+                replaced_hashes=tuple(replaced_hashes.get(pk, ())),
+                attempts=attempts,
+            )
+
+    @staticmethod
+    def _replaced_hashes(ids: list[int]) -> dict[int, list[TransactionHash]]:
+        hashes: dict[int, list[TransactionHash]] = {}
+        if ids:
+            rows = FaucetTransactionReplacementModel.objects.filter(transaction_id__in=ids).values_list(
+                "transaction_id", "replaced_tx_hash"
+            )
+            for pk, tx_hash in rows:
+                hashes.setdefault(pk, []).append(TransactionHash.from_trusted(tx_hash))
+        return hashes
+
+    @staticmethod
+    def _broadcast_fields(faucet_transaction: FaucetTransaction) -> dict[str, Any]:
+        fees = faucet_transaction.fees
+        return {
+            "nonce": faucet_transaction.nonce,
+            "max_fee_per_gas": fees.max_fee_per_gas if fees else None,
+            "max_priority_fee_per_gas": fees.max_priority_fee_per_gas if fees else None,
+            "broadcast_at": faucet_transaction.broadcast_at.dt if faucet_transaction.broadcast_at else None,
+        }
+
+    @staticmethod
+    def _created_at_from_db(value: Any) -> DomainDateTime | None:
+        if value is None:
+            return None
+        # raw rows skip the field converters, SQLite returns datetimes as text
+        column = FaucetTransactionModel._meta.get_field("created_at").cached_col
+        for converter in connection.ops.get_db_converters(column):
+            value = converter(value, column, connection)
+        return DomainDateTime(value)
+
+    @staticmethod
+    def _stats_querysets(since_dt: DomainDateTime) -> tuple[QuerySet, QuerySet]:
+        # whole buckets are summed, the part of the hour before the first whole bucket is counted from transactions
+        first_bucket = stats_bucket(since_dt.dt)
+        if first_bucket < since_dt.dt:
+            first_bucket += STATS_BUCKET_SIZE
+
+        buckets = (
+            FaucetStatsBucketModel.objects.filter(bucket__gte=first_bucket)
+            .values("status")
+            .annotate(total=Sum("count"))
+            .order_by()
         )
+        tail = (
+            FaucetTransactionModel.objects.filter(created_at__gte=since_dt.dt, created_at__lt=first_bucket)
+            .values("status")
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        return buckets, tail
+
+    @staticmethod
+    def _stats_to_tuple(rows: list[dict]) -> tuple[int, int, int]:
+        counts: Counter[str] = Counter()
+        for row in rows:
+            counts[row["status"]] += row["total"]
+
+        return (
+            counts[TransactionStatus.SUCCESS.value],
+            counts[TransactionStatus.PENDING.value]
+            + counts[TransactionStatus.QUEUED.value]
+            + counts[TransactionStatus.SENDING.value],
+            counts[TransactionStatus.FAILED.value],
+        )
+
+    @staticmethod
+    def _add_to_stats(stats: Counter[tuple[datetime, str]]) -> None:
+        """Add counts to stats buckets with one upsert, rows are sorted to take row locks in the same order."""
+        rows = sorted((bucket, status, count) for (bucket, status), count in stats.items() if count)
+        if not rows:
+            return
 
-        return stats["successful"], stats["pending"], stats["failed"]
+        table = FaucetStatsBucketModel._meta.db_table
+        values = ", ".join(["(%s, %s, %s)"] * len(rows))
+        params = [
+            value
+            for bucket, status, count in rows
+            for value in (connection.ops.adapt_datetimefield_value(bucket), status, count)
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (bucket, status, count) VALUES {values} "
+                f"ON CONFLICT (bucket, status) DO UPDATE SET count = {table}.count + EXCLUDED.count",
+                params,
+            )
 
     @classmethod
     def model_to_entity(cls, model: FaucetTransactionModel) -> FaucetTransaction:
-        """Helper to convert a Django model instance to a domain entity."""
+        """
+        Helper to convert a Django model instance to a domain entity.
+
+        Values are written only by this repository from validated value objects, so they are not validated again.
+        """
         return FaucetTransaction(
             id=RequiredId(model.pk),
-            tx_hash=TransactionHash(model.tx_hash),
+            tx_hash=TransactionHash.from_trusted(model.tx_hash) if model.tx_hash else None,
             status=TransactionStatus(model.status),
-            ip_address=IPAddress(model.ip_address),
-            wallet=WalletAddress(model.wallet),
+            ip_address=IPAddress.from_trusted(model.ip_address),
+            wallet=WalletAddress.from_trusted(model.wallet),
             amount=TokenAmount.from_int(int(model.amount)),
             created_at=DomainDateTime(model.created_at),
             error=model.error if model.error else None,
+            sender=WalletAddress.from_trusted(model.sender) if model.sender else None,
+            nonce=model.nonce,
+            fees=GasFees(int(model.max_fee_per_gas), int(model.max_priority_fee_per_gas))
+            if model.max_fee_per_gas is not None and model.max_priority_fee_per_gas is not None
+            else None,
+            broadcast_at=DomainDateTime(model.broadcast_at) if model.broadcast_at else None,
+            replacements=model.replacements,
         )
@@ -0,0 +1,39 @@
+from django.db import transaction
+from django.utils import timezone
+
+from apps.blockchain.domain.repository import INonceRepository
+from infrastructure.models.faucet_nonce import FaucetNonceModel
+
+
+class DjangoNonceRepository(INonceRepository):
+    """Nonce counter stored in a Postgres row, the row lock makes allocations unique across workers."""
+
+    def allocate(self, address: str) -> int | None:
+        with transaction.atomic():
+            obj = FaucetNonceModel.objects.select_for_update().filter(address=address).first()
+            if obj is None:
+                return None
+
+            nonce = obj.next_nonce
+            obj.next_nonce = nonce + 1
+            obj.save(update_fields=["next_nonce", "updated_at"])
+        return nonce
+
+    def release(self, address: str, nonce: int) -> bool:
+        updated = FaucetNonceModel.objects.filter(address=address, next_nonce=nonce + 1).update(
+            next_nonce=nonce,
+            updated_at=timezone.now(),
+        )
+        return updated == 1
+
+    def set_next_nonce(self, address: str, nonce: int, only_forward: bool = False) -> None:
+        with transaction.atomic():
+            obj, created = FaucetNonceModel.objects.select_for_update().get_or_create(
+                address=address,
+                defaults={"next_nonce": nonce},
+            )
+            if created or obj.next_nonce == nonce or (only_forward and obj.next_nonce > nonce):
+                return
+
+            obj.next_nonce = nonce
+            obj.save(update_fields=["next_nonce", "updated_at"])
@@ -0,0 +1,178 @@
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, TypeVar
+
+from web3 import HTTPProvider
+from web3.providers import JSONBaseProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# "limit exceeded", public nodes answer with it when we are rate limited
+RATE_LIMIT_ERROR_CODES = (-32005,)
+
+
+class EndpointRateLimitedError(Exception):
+    pass
+
+
+@dataclass
+class EndpointState:
+    provider: HTTPProvider
+    # results of the last requests, True for success
+    results: deque[bool]
+    # moving average of successful request latency in seconds, None until the first success
+    latency: float | None = None
+    ejected_until: float = 0.0
+    last_used: float = field(default=0.0)
+
+    @property
+    def error_rate(self) -> float:
+        return self.results.count(False) / len(self.results) if self.results else 0.0
+
+    def __str__(self) -> str:
+        return str(self.provider.endpoint_uri)
+
+
+class RoutingHTTPProvider(JSONBaseProvider):
+    """
+    JSON-RPC provider over several HTTP endpoints of the same chain.
+
+    Reads go to the healthy endpoint with the lowest latency and fail over to the next one
+    on a connection error or rate limit. eth_sendRawTransaction is sent to broadcast_to fastest
+    endpoints at once, the first accepted answer is returned.
+
+    An endpoint is ejected for eject_seconds when errors make max_error_rate of its last requests.
+    Every probe_every requests the least recently used healthy endpoint is tried first,
+    so a node which was slow once gets a chance to show it is fast now.
+    """
+
+    def __init__(
+        self,
+        providers: list[HTTPProvider],
+        eject_seconds: float = 30,
+        max_error_rate: float = 0.5,
+        window: int = 20,
+        latency_alpha: float = 0.2,
+        broadcast_to: int = 2,
+        probe_every: int = 50,
+    ):
+        if not providers:
+            raise ValueError("At least one RPC endpoint is required")
+        super().__init__()
+        self.endpoints = [EndpointState(provider=provider, results=deque(maxlen=window)) for provider in providers]
+        self.eject_seconds = eject_seconds
+        self.max_error_rate = max_error_rate
+        self.latency_alpha = latency_alpha
+        self.broadcast_to = broadcast_to
+        self.probe_every = probe_every
+        self._requests = 0
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(broadcast_to, 1), thread_name_prefix="rpc-broadcast")
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        if method == "eth_sendRawTransaction" and self.broadcast_to > 1:
+            return self._broadcast(lambda provider: provider.make_request(method, params))
+        return self._route(lambda provider: provider.make_request(method, params))
+
+    def make_batch_request(self, requests: list[tuple[RPCEndpoint, Any]]) -> list[RPCResponse]:
+        return self._route(lambda provider: provider.make_batch_request(requests))
+
+    def _route(self, call: Callable[[HTTPProvider], T]) -> T:
+        last_error: Exception | None = None
+        for endpoint in self._ranked():
+            try:
+                return self._call(endpoint, call)
+            except Exception as e:
+                logger.warning(f"RPC endpoint {endpoint} failed, trying the next one: {e}")
+                last_error = e
+        raise last_error  # type: ignore
+
+    def _broadcast(self, call: Callable[[HTTPProvider], RPCResponse]) -> RPCResponse:
+        endpoints = self._ranked()[: self.broadcast_to]
+        # the calls run in the caller's context, so their spans are added to the request trace,
+        # a context can be entered by one thread at a time, so every call gets its own copy.
+        # A call still running when the first answer is returned may end after the trace is exported.
+        futures = [self._executor.submit(copy_context().run, self._call, endpoint, call) for endpoint in endpoints]
+
+        error_response: RPCResponse | None = None
+        last_error: Exception | None = None
+        for future in as_completed(futures):
+            try:
+                response = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            if "error" not in response:
+                return response
+            # e.g. nonce too low, the same answer is expected from every node
+            error_response = error_response or response
+
+        if error_response is not None:
+            return error_response
+        raise last_error  # type: ignore
+
+    def _call(self, endpoint: EndpointState, call: Callable[[HTTPProvider], T]) -> T:
+        started_at = monotonic()
+        try:
+            response = call(endpoint.provider)
+            if self._is_rate_limited(response):
+                raise EndpointRateLimitedError(f"Rate limited by {endpoint}: {response}")
+        except Exception:
+            self._record(endpoint, started_at, ok=False)
+            raise
+
+        self._record(endpoint, started_at, ok=True)
+        return response
+
+    def _ranked(self) -> list[EndpointState]:
+        """Endpoints in the order to try, ejected ones are the last resort."""
+        now = monotonic()
+        with self._lock:
+            self._requests += 1
+            healthy = sorted(
+                (endpoint for endpoint in self.endpoints if endpoint.ejected_until <= now),
+                key=lambda endpoint: endpoint.latency or 0.0,
+            )
+            if self.probe_every and self._requests % self.probe_every == 0 and len(healthy) > 1:
+                probe = min(healthy[1:], key=lambda endpoint: endpoint.last_used)
+                healthy.remove(probe)
+                healthy.insert(0, probe)
+
+            ejected = sorted(
+                (endpoint for endpoint in self.endpoints if endpoint.ejected_until > now),
+                key=lambda endpoint: endpoint.ejected_until,
+            )
+        return healthy + ejected
+
+    def _record(self, endpoint: EndpointState, started_at: float, ok: bool) -> None:
+        now = monotonic()
+        with self._lock:
+            endpoint.results.append(ok)
+            endpoint.last_used = now
+            if ok:
+                elapsed = now - started_at
+                if endpoint.latency is None:
+                    endpoint.latency = elapsed
+                else:
+                    endpoint.latency += self.latency_alpha * (elapsed - endpoint.latency)
+            elif endpoint.error_rate >= self.max_error_rate:
+                endpoint.ejected_until = now + self.eject_seconds
+                # the endpoint comes back with a clean record
+                endpoint.results.clear()
+                logger.warning(f"RPC endpoint {endpoint} is ejected for {self.eject_seconds}s")
+
+    @staticmethod
+    def _is_rate_limited(response: Any) -> bool:
+        # a batch is answered with a list, unless the whole batch is rejected
+        if not isinstance(response, dict):
+            return False
+        error = response.get("error")
+        return isinstance(error, dict) and error.get("code") in RATE_LIMIT_ERROR_CODES
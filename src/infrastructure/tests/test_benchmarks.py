@@ -0,0 +1,16 @@
+from django.test import TestCase
+
+from benchmarks import hot_paths
+
+
+class HotPathsBenchmarkTest(TestCase):
+    """The benchmark runs the real services, it should keep up with their changes."""
+
+    def test_run(self):
+        scenarios = hot_paths.run(requests=3, sweeps=2)
+
+        fund_wallet = scenarios["fund_wallet"]
+        for stage in ("cooldown check", "fee lookup", "signing", "broadcast", "persist", "total"):
+            self.assertEqual(fund_wallet[stage]["count"], 3, msg=stage)
+        self.assertEqual(scenarios["get_stats"]["total"]["count"], 3)
+        self.assertEqual(scenarios["checker_sweep"]["persist"]["count"], 2)
@@ -0,0 +1,26 @@
+from threading import Thread
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from infrastructure.blockchain_client import _create_http_provider
+
+
+class HTTPProviderSessionTest(SimpleTestCase):
+    def test_session_shared_by_threads(self):
+        provider = _create_http_provider("http://node:8545", pool_size=4, connect_timeout=1, read_timeout=2)
+        session = provider._request_session_manager.cache_and_return_session(provider.endpoint_uri)
+
+        response = MagicMock(content=b'{"jsonrpc": "2.0", "id": 0, "result": "0x1"}')
+        response.__enter__.return_value = response
+        results = []
+        with patch.object(session, "post", return_value=response) as post:
+            # e.g. a gthread worker or a broadcast thread, not the one which created the provider
+            thread = Thread(target=lambda: results.append(provider.make_request("eth_blockNumber", [])))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(results[0]["result"], "0x1")
+        post.assert_called_once()
+        self.assertEqual(post.call_args.kwargs["timeout"], (1, 2))
+        self.assertEqual(session.get_adapter("http://node:8545")._pool_maxsize, 4)
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Barrier
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.models.faucet_cooldown_reservation import FaucetCooldownReservationModel
+from infrastructure.repositories.django_cooldown_repository import DjangoCooldownRepository
+
+IP_SLOT = "ip:10.0.0.1"
+WALLET_SLOT = "wallet:0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def in_minutes(minutes: float) -> DomainDateTime:
+    return DomainDateTime(DomainDateTime.now().dt + timedelta(minutes=minutes))
+
+
+class CooldownReservationTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoCooldownRepository()
+
+    def test_reserve_free_slots(self):
+        self.assertEqual(self.repository.reserve([IP_SLOT, WALLET_SLOT], "a", in_minutes(1)), {IP_SLOT, WALLET_SLOT})
+
+    def test_held_slot_not_claimed(self):
+        self.repository.reserve([WALLET_SLOT], "a", in_minutes(1))
+
+        self.assertEqual(self.repository.reserve([IP_SLOT, WALLET_SLOT], "b", in_minutes(1)), {IP_SLOT})
+        self.assertEqual(FaucetCooldownReservationModel.objects.get(slot=WALLET_SLOT).token, "a")
+
+    def test_expired_slot_taken_over(self):
+        self.repository.reserve([IP_SLOT], "a", in_minutes(-1))
+
+        self.assertEqual(self.repository.reserve([IP_SLOT], "b", in_minutes(1)), {IP_SLOT})
+        self.assertEqual(FaucetCooldownReservationModel.objects.get(slot=IP_SLOT).token, "b")
+
+    def test_release_only_own_slots(self):
+        self.repository.reserve([IP_SLOT], "a", in_minutes(-1))
+        self.repository.reserve([IP_SLOT, WALLET_SLOT], "b", in_minutes(1))
+
+        # "a" has lost its expired reservation and must not free the slot of "b"
+        self.repository.release([IP_SLOT], "a")
+        self.assertEqual(FaucetCooldownReservationModel.objects.count(), 2)
+
+        self.repository.release([IP_SLOT, WALLET_SLOT], "b")
+        self.assertFalse(FaucetCooldownReservationModel.objects.exists())
+
+
+class AsyncCooldownReservationTest(TransactionTestCase):
+    def test_async(self):
+        repository = DjangoCooldownRepository()
+
+        async def reserve_twice() -> tuple[set[str], set[str]]:
+            first = await repository.areserve([IP_SLOT, WALLET_SLOT], "a", in_minutes(1))
+            second = await repository.areserve([IP_SLOT, WALLET_SLOT], "b", in_minutes(1))
+            await repository.arelease([IP_SLOT, WALLET_SLOT], "a")
+            return first, second
+
+        self.assertEqual(asyncio.run(reserve_twice()), ({IP_SLOT, WALLET_SLOT}, set()))
+        self.assertFalse(FaucetCooldownReservationModel.objects.exists())
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "parallel claims are checked on PostgreSQL")
+class ParallelCooldownReservationTest(TransactionTestCase):
+    def test_one_winner(self):
+        repository = DjangoCooldownRepository()
+        barrier = Barrier(8)
+
+        def reserve(i: int) -> set[str]:
+            barrier.wait()
+            try:
+                return repository.reserve([f"ip:10.0.0.{i}", WALLET_SLOT], str(i), in_minutes(1))
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            claimed = list(executor.map(reserve, range(8)))
+
+        self.assertEqual(sum(WALLET_SLOT in slots for slots in claimed), 1)
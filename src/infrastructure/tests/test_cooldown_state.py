@@ -0,0 +1,66 @@
+import asyncio
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blockchain.domain.value_objects import TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+OTHER_WALLET = "0x0000000000000000000000000000000000000001"
+
+
+def create_transaction(ip_address: str, wallet: str, age: timedelta) -> FaucetTransactionModel:
+    obj = FaucetTransactionModel.objects.create(
+        status=TransactionStatus.SUCCESS.value, ip_address=ip_address, wallet=wallet, amount=1
+    )
+    # created_at is set on insert, the row is moved to the past afterwards
+    FaucetTransactionModel.objects.filter(pk=obj.pk).update(created_at=obj.created_at - age)
+    obj.refresh_from_db()
+    return obj
+
+
+class CooldownStateTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+        self.since = DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=10))
+
+    def test_empty_table(self):
+        state = self.repository.get_cooldown_state("10.0.0.1", WALLET, self.since)
+        self.assertIsNone(state.last_ip_tx_at)
+        self.assertIsNone(state.last_wallet_tx_at)
+
+    def test_last_times_in_one_query(self):
+        create_transaction("10.0.0.1", OTHER_WALLET, timedelta(minutes=5))
+        last_by_ip = create_transaction("10.0.0.1", OTHER_WALLET, timedelta(minutes=1))
+        last_by_wallet = create_transaction("10.0.0.2", WALLET, timedelta(minutes=2))
+
+        with CaptureQueriesContext(connection) as queries:
+            state = self.repository.get_cooldown_state("10.0.0.1", WALLET, self.since)
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(state.last_ip_tx_at, last_by_ip.created_at)
+        self.assertEqual(state.last_wallet_tx_at, last_by_wallet.created_at)
+
+    def test_older_transactions_ignored(self):
+        create_transaction("10.0.0.1", WALLET, timedelta(minutes=30))
+
+        state = self.repository.get_cooldown_state("10.0.0.1", WALLET, self.since)
+
+        self.assertIsNone(state.last_ip_tx_at)
+        self.assertIsNone(state.last_wallet_tx_at)
+
+
+class AsyncCooldownStateTest(TransactionTestCase):
+    def test_async(self):
+        last = create_transaction("10.0.0.1", WALLET, timedelta(minutes=1))
+        since = DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=10))
+
+        state = asyncio.run(DjangoFaucetTransactionsRepository().aget_cooldown_state("10.0.0.3", WALLET, since))
+
+        self.assertIsNone(state.last_ip_tx_at)
+        self.assertEqual(state.last_wallet_tx_at, last.created_at)
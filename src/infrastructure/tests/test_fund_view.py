@@ -0,0 +1,29 @@
+from unittest.mock import AsyncMock, Mock
+
+from dependency_injector import providers
+from django.test import TestCase, override_settings
+
+from apps.blockchain.application.exceptions import FaucetOutOfFundsError
+from user_interface.views.faucet import app_container
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+@override_settings(FAUCET_QUEUE_ENABLED=False)
+class FundWalletViewTest(TestCase):
+    def test_out_of_funds(self):
+        blockchain_service = Mock()
+        blockchain_service.send_funds.side_effect = FaucetOutOfFundsError(10**18)
+        with app_container.blockchain_service.override(providers.Object(blockchain_service)):
+            response = self.client.post("/api/faucet/fund", {"wallet_address": WALLET}, REMOTE_ADDR="10.0.0.1")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {"detail": "No faucet account has 1000000000000000000 wei to pay"})
+
+    def test_async_out_of_funds(self):
+        blockchain_service = Mock()
+        blockchain_service.send_funds = AsyncMock(side_effect=FaucetOutOfFundsError(10**18))
+        with app_container.async_blockchain_service.override(providers.Object(blockchain_service)):
+            response = self.client.post("/api/async/faucet/fund", {"wallet_address": WALLET}, REMOTE_ADDR="10.0.0.2")
+
+        self.assertEqual(response.status_code, 503)
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+from prometheus_client import REGISTRY, generate_latest
+
+from apps.blockchain.domain.value_objects import TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.metrics import metrics_registry
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+
+SRC_DIR = Path(__file__).resolve().parents[2]
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+# a gunicorn worker which rejects a request
+WORKER = """
+from infrastructure.metrics import PrometheusMetrics
+PrometheusMetrics().increment("cooldown_rejections", reason="ip", source="cache")
+"""
+EXPORT = """
+from prometheus_client import generate_latest
+from infrastructure.metrics import metrics_registry
+print(generate_latest(metrics_registry()).decode())
+"""
+
+
+def repository_calls(method: str) -> float:
+    return REGISTRY.get_sample_value("faucet_repository_seconds_count", {"method": method}) or 0
+
+
+class RepositoryMetricsTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+        FaucetTransactionModel.objects.create(
+            tx_hash=f"0x{1:064x}",
+            status=TransactionStatus.PENDING.value,
+            ip_address="10.0.0.1",
+            wallet=WALLET,
+            amount=1,
+        )
+
+    def test_methods_observed(self):
+        before = repository_calls("get_cooldown_state")
+        self.repository.get_cooldown_state("10.0.0.1", WALLET, DomainDateTime.now())
+        self.repository.get_cooldown_state("10.0.0.2", WALLET, DomainDateTime.now())
+        self.assertEqual(repository_calls("get_cooldown_state"), before + 2)
+
+    def test_generator_observed_once(self):
+        before = repository_calls("iter_pending_transactions")
+        pending = self.repository.iter_pending_transactions(chunk_size=1)
+        self.assertEqual(len(list(pending)), 1)
+        self.assertEqual(repository_calls("iter_pending_transactions"), before + 1)
+
+
+class MetricsExportTest(SimpleTestCase):
+    def test_metrics_exported(self):
+        exported = generate_latest(metrics_registry())
+
+        self.assertIn(b"# TYPE faucet_fund_wallet_seconds histogram", exported)
+        self.assertIn(b"# TYPE faucet_rpc_request_seconds histogram", exported)
+
+    def test_not_served_by_the_application(self):
+        # metrics have their own port, the public one doesn't expose them
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+
+    def test_workers_added_up(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": tmp_dir}
+            for _ in range(2):
+                subprocess.run([sys.executable, "-c", WORKER], cwd=SRC_DIR, env=env, check=True)
+            exported = subprocess.run(
+                [sys.executable, "-c", EXPORT], cwd=SRC_DIR, env=env, check=True, capture_output=True, text=True
+            ).stdout
+
+        self.assertIn('faucet_cooldown_rejections_total{reason="ip",source="cache"} 2.0', exported)
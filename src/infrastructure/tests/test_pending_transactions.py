@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+class IterPendingTransactionsTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+        FaucetTransactionModel.objects.bulk_create(
+            FaucetTransactionModel(
+                tx_hash=f"0x{i:064x}" if i != 3 else None,
+                status=(TransactionStatus.SUCCESS if i % 4 == 0 else TransactionStatus.PENDING).value,
+                ip_address="10.0.0.1",
+                wallet=WALLET,
+                amount=1,
+            )
+            for i in range(1, 11)
+        )
+
+    def test_streams_pending_in_chunks(self):
+        with CaptureQueriesContext(connection) as queries:
+            pending = list(self.repository.iter_pending_transactions(chunk_size=3))
+
+        # a pending row without hash can't be checked, it is skipped
+        self.assertEqual(
+            [tx.tx_hash for tx in pending], [TransactionHash(f"0x{i:064x}") for i in (1, 2, 5, 6, 7, 9, 10)]
+        )
+        self.assertEqual(len(queries.captured_queries), 3)
+
+    def test_resolving_between_chunks_does_not_skip_rows(self):
+        seen = []
+        for tx in self.repository.iter_pending_transactions(chunk_size=2):
+            seen.append(tx.tx_hash)
+            self.repository.update_statuses({tx.id: TransactionStatus.SUCCESS})
+
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(FaucetTransactionModel.objects.filter(status=TransactionStatus.PENDING.value).count(), 1)
+
+    def test_only_due_streamed(self):
+        now = DomainDateTime.now()
+        pending = list(self.repository.iter_pending_transactions(chunk_size=3))
+        self.repository.schedule_checks(
+            {
+                pending[0].id: (1, DomainDateTime(now.dt - timedelta(seconds=1))),
+                pending[1].id: (3, DomainDateTime(now.dt + timedelta(seconds=40))),
+            }
+        )
+
+        due = list(self.repository.iter_pending_transactions(chunk_size=3, due_before=now))
+
+        # the rest were never checked, they are due
+        self.assertEqual([tx.id for tx in due], [pending[0].id, *(tx.id for tx in pending[2:])])
+        self.assertEqual(due[0].attempts, 1)
+
+    def test_get_pending_by_hashes(self):
+        found = self.repository.get_pending_by_hashes(
+            {TransactionHash(f"0x{i:064x}") for i in (1, 4, 99)}  # 4 is resolved, 99 isn't ours
+        )
+
+        self.assertEqual([tx.tx_hash for tx in found], [TransactionHash(f"0x{1:064x}")])
+
+    def test_count_pending_transactions(self):
+        # rows without hash are pending as well
+        self.assertEqual(self.repository.count_pending_transactions(), 8)
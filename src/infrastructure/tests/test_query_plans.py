@@ -0,0 +1,80 @@
+import unittest
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blockchain.domain.value_objects import TransactionHash, TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "query plans are checked on PostgreSQL")
+class FaucetRepositoryQueryPlanTest(TestCase):
+    """Every hot query of the repository should be answered from an index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        FaucetTransactionModel.objects.bulk_create(
+            FaucetTransactionModel(
+                tx_hash=f"0x{i:064x}",
+                status=[TransactionStatus.SUCCESS, TransactionStatus.PENDING, TransactionStatus.QUEUED][i % 3].value,
+                ip_address=f"10.0.{i // 256}.{i % 256}",
+                wallet=WALLET,
+                amount=1,
+            )
+            for i in range(300)
+        )
+
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+        with connection.cursor() as cursor:
+            # the test table is tiny, without this the planner prefers to read it sequentially
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("ANALYZE faucet_transactions")
+
+    def assert_index_scans(self, call):
+        with CaptureQueriesContext(connection) as queries:
+            call()
+
+        # savepoints and writes by primary key or to stats buckets are not checked
+        selects = [query for query in queries.captured_queries if query["sql"].startswith("SELECT")]
+        self.assertTrue(selects)
+        for query in selects:
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN {query['sql']}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            self.assertNotIn("Seq Scan", plan, msg=query["sql"])
+            self.assertIn("Index", plan, msg=query["sql"])
+
+    def test_get_cooldown_state(self):
+        since = DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=1))
+        self.assert_index_scans(lambda: self.repository.get_cooldown_state("10.0.0.1", WALLET, since))
+
+    def test_get_pending_transactions(self):
+        self.assert_index_scans(self.repository.get_pending_transactions)
+
+    def test_iter_pending_transactions(self):
+        self.assert_index_scans(lambda: list(self.repository.iter_pending_transactions(chunk_size=30)))
+
+    def test_iter_due_transactions(self):
+        now = DomainDateTime.now()
+        self.assert_index_scans(lambda: list(self.repository.iter_pending_transactions(chunk_size=30, due_before=now)))
+
+    def test_count_pending_transactions(self):
+        self.assert_index_scans(self.repository.count_pending_transactions)
+
+    def test_get_pending_by_hashes(self):
+        hashes = {TransactionHash(f"0x{i:064x}") for i in range(10)}
+        self.assert_index_scans(lambda: self.repository.get_pending_by_hashes(hashes))
+
+    def test_claim_queued_transactions(self):
+        self.assert_index_scans(lambda: self.repository.claim_queued_transactions(10))
+
+    def test_cnt_stats(self):
+        since = DomainDateTime(DomainDateTime.now().dt - timedelta(hours=24))
+        self.assert_index_scans(lambda: self.repository.cnt_stats(since))
@@ -0,0 +1,119 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.shared.tracing import SpanExporter, Trace, Tracer, span
+from infrastructure.rpc_router import RoutingHTTPProvider
+
+TX_HASH = "0x" + "ab" * 32
+
+
+class FakeProvider:
+    def __init__(self, clock: list[float], endpoint_uri: str, delay: float = 0.0):
+        self.clock = clock
+        self.endpoint_uri = endpoint_uri
+        self.delay = delay
+        self.error: Exception | None = None
+        self.response: dict | None = None
+        self.calls = 0
+
+    def make_request(self, method, params):
+        with span("rpc", endpoint=self.endpoint_uri):
+            return self._make_request(method, params)
+
+    def _make_request(self, method, params):
+        self.calls += 1
+        self.clock[0] += self.delay
+        if self.error:
+            raise self.error
+        return self.response or {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "result": TX_HASH if method == "eth_sendRawTransaction" else "0x1",
+        }
+
+    def make_batch_request(self, requests):
+        return [self.make_request(method, params) for method, params in requests]
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.traces: list[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+class RoutingHTTPProviderTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = [1000.0]
+        patcher = patch("infrastructure.rpc_router.monotonic", lambda: self.clock[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.slow = FakeProvider(self.clock, "http://slow", delay=0.5)
+        self.fast = FakeProvider(self.clock, "http://fast", delay=0.1)
+        self.router = RoutingHTTPProvider([self.slow, self.fast], eject_seconds=30, probe_every=0)  # type: ignore
+
+    def test_reads_go_to_fastest_endpoint(self):
+        # both are measured first, unknown latency is tried before known
+        for _ in range(5):
+            self.router.make_request("eth_blockNumber", [])
+
+        self.assertEqual(self.slow.calls, 1)
+        self.assertEqual(self.fast.calls, 4)
+
+    def test_failed_endpoint_is_ejected_for_cooldown(self):
+        self.slow.error = ConnectionError("node is down")
+
+        self.assertEqual(self.router.make_request("eth_blockNumber", [])["result"], "0x1")
+        self.router.make_batch_request([("eth_blockNumber", [])])
+        self.assertEqual(self.slow.calls, 1)
+        self.assertEqual(self.fast.calls, 2)
+
+        self.slow.error = None
+        self.clock[0] += 30
+        self.fast.delay = 1.0
+        self.router.make_request("eth_blockNumber", [])
+        self.assertEqual(self.slow.calls, 2)
+
+    def test_rate_limited_endpoint_fails_over(self):
+        self.slow.response = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "limit exceeded"}}
+
+        self.assertEqual(self.router.make_request("eth_blockNumber", [])["result"], "0x1")
+        self.assertEqual(self.fast.calls, 1)
+
+    def test_all_endpoints_failed(self):
+        self.slow.error = ConnectionError("node is down")
+        self.fast.error = ConnectionError("node is down")
+
+        with self.assertRaises(ConnectionError):
+            self.router.make_request("eth_blockNumber", [])
+
+    def test_transaction_broadcast_to_several_endpoints(self):
+        self.fast.error = ConnectionError("node is down")
+
+        self.assertEqual(self.router.make_request("eth_sendRawTransaction", ["0x00"])["result"], TX_HASH)
+        # the first accepted answer is returned, wait for the other endpoint
+        self.router._executor.shutdown(wait=True)
+        self.assertEqual((self.slow.calls, self.fast.calls), (1, 1))
+
+    def test_broadcast_traced(self):
+        exporter = ListExporter()
+        with Tracer(exporter, sample_rate=1).trace("fund_wallet", "req-1"):
+            with span("send_raw_transaction"):
+                self.router.make_request("eth_sendRawTransaction", ["0x00"])
+                self.router._executor.shutdown(wait=True)
+
+        [trace] = exporter.traces
+        [parent] = [item for item in trace.spans if item.name == "send_raw_transaction"]
+        calls = [item for item in trace.spans if item.name == "rpc"]
+        self.assertEqual(sorted(call.attributes["endpoint"] for call in calls), ["http://fast", "http://slow"])
+        self.assertEqual({call.parent_id for call in calls}, {parent.span_id})
+
+    def test_transaction_error_returned_when_no_endpoint_accepts(self):
+        error = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "nonce too low"}}
+        self.slow.response = error
+        self.fast.response = error
+
+        self.assertEqual(self.router.make_request("eth_sendRawTransaction", ["0x00"]), error)
@@ -0,0 +1,88 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.test import TestCase
+
+from apps.blockchain.domain.entities import FaucetTransaction
+from apps.blockchain.domain.value_objects import (
+    IPAddress,
+    TokenAmount,
+    TransactionHash,
+    TransactionStatus,
+    WalletAddress,
+)
+from apps.shared.value_objects.datetime import DomainDateTime
+from apps.shared.value_objects.id import Id
+from infrastructure.models.faucet_stats_bucket import FaucetStatsBucketModel
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository, stats_bucket
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+class FaucetStatsBucketsTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+
+    def create(self, i: int, status: TransactionStatus) -> FaucetTransaction:
+        return self.repository.create(
+            FaucetTransaction(
+                id=Id(),
+                tx_hash=TransactionHash(f"0x{i:064x}"),
+                ip_address=IPAddress(f"10.0.0.{i}"),
+                wallet=WalletAddress(WALLET),
+                amount=TokenAmount.from_ether("0.0001"),
+                status=status,
+            )
+        )
+
+    def assert_buckets_match_transactions(self):
+        expected = Counter(
+            (stats_bucket(created_at), status)
+            for created_at, status in FaucetTransactionModel.objects.values_list("created_at", "status")
+        )
+        buckets = Counter(
+            {(bucket.bucket, bucket.status): bucket.count for bucket in FaucetStatsBucketModel.objects.all()}
+        )
+        # transitions leave zero counts behind, unary plus drops them
+        self.assertEqual(+buckets, expected)
+
+    def test_status_transitions_move_counts(self):
+        first = self.create(1, TransactionStatus.QUEUED)
+        second = self.create(2, TransactionStatus.PENDING)
+        third = self.create(3, TransactionStatus.PENDING)
+
+        first.status = TransactionStatus.PENDING
+        self.repository.update(first)
+        self.repository.update_statuses(
+            {
+                second.id: TransactionStatus.SUCCESS,
+                third.id: TransactionStatus.FAILED,
+                first.id: TransactionStatus.PENDING,
+            }
+        )
+
+        self.assert_buckets_match_transactions()
+        since = DomainDateTime(DomainDateTime.now().dt - timedelta(hours=24))
+        self.assertEqual(self.repository.cnt_stats(since), (1, 1, 1))
+
+    def test_partial_first_hour_counted_from_transactions(self):
+        tx = self.create(1, TransactionStatus.SUCCESS)
+        created_at = FaucetTransactionModel.objects.get(pk=tx.pk.value).created_at
+
+        self.assertEqual(self.repository.cnt_stats(DomainDateTime(created_at)), (1, 0, 0))
+        self.assertEqual(self.repository.cnt_stats(DomainDateTime(created_at + timedelta(microseconds=1))), (0, 0, 0))
+
+    def test_claim_moves_queued_to_sending(self):
+        first = self.create(1, TransactionStatus.QUEUED)
+        second = self.create(2, TransactionStatus.QUEUED)
+        self.create(3, TransactionStatus.PENDING)
+
+        claimed = self.repository.claim_queued_transactions(10)
+
+        self.assertEqual([tx.pk for tx in claimed], [first.pk, second.pk])
+        self.assertEqual({tx.status for tx in claimed}, {TransactionStatus.SENDING})
+        self.assertEqual(self.repository.claim_queued_transactions(10), [])
+        self.assert_buckets_match_transactions()
+        since = DomainDateTime(DomainDateTime.now().dt - timedelta(hours=24))
+        self.assertEqual(self.repository.cnt_stats(since), (0, 3, 0))
@@ -0,0 +1,76 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.shared.tracing import SpanExporter, Trace, Tracer
+from benchmarks.hot_paths import HotPaths
+from infrastructure.tracing import JsonLinesSpanExporter
+
+
+class ListExporter(SpanExporter):
+    def __init__(self):
+        self.traces: list[Trace] = []
+
+    def export(self, trace: Trace) -> None:
+        self.traces.append(trace)
+
+
+class FundWalletTraceTest(TestCase):
+    def test_stages_recorded(self):
+        exporter = ListExporter()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            hot_paths = HotPaths.create(str(Path(tmp_dir) / "cooldowns"))
+            with Tracer(exporter, sample_rate=1).trace("fund_wallet", "req-1"):
+                hot_paths.faucet_service.fund_wallet(f"0x{0xFA:040x}", "10.0.0.1")
+
+        [trace] = exporter.traces
+        names = [span.name for span in trace.spans]
+        self.assertEqual(
+            names,
+            [
+                "fund_wallet",
+                "cooldown",
+                "repository.reserve",
+                "repository.get_cooldown_state",
+                "send_funds",
+                "fees",
+                "account",
+                "gas_limit",
+                "nonce",
+                "sign_transaction",
+                "send_raw_transaction",
+                "repository.create",
+                "repository.release",
+            ],
+        )
+        spans = {span.name: span for span in trace.spans}
+        self.assertEqual(spans["repository.get_cooldown_state"].attributes, {"rows": 0})
+        self.assertEqual(spans["fees"].parent_id, spans["send_funds"].span_id)
+
+
+class JsonLinesSpanExporterTest(SimpleTestCase):
+    def test_one_line_per_trace(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "traces.jsonl"
+            tracer = Tracer(JsonLinesSpanExporter(str(path)), sample_rate=1)
+            for request_id in ("req-1", "req-2"):
+                with tracer.trace("fund_wallet", request_id, wallet="0x1"):
+                    pass
+
+            lines = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual([line["request_id"] for line in lines], ["req-1", "req-2"])
+        self.assertEqual(lines[0]["spans"][0]["name"], "fund_wallet")
+        self.assertEqual(lines[0]["spans"][0]["wallet"], "0x1")
+
+
+class RequestIdTest(SimpleTestCase):
+    def test_request_id_returned(self):
+        response = self.client.get("/metrics", headers={"X-Request-ID": "proxy-id.1"})
+        self.assertEqual(response["X-Request-ID"], "proxy-id.1")
+
+    def test_invalid_request_id_replaced(self):
+        response = self.client.get("/metrics", headers={"X-Request-ID": "bad id\nX-Injected: 1"})
+        self.assertRegex(response["X-Request-ID"], r"^[0-9a-f]{32}$")
@@ -0,0 +1,100 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.blockchain.domain.value_objects import GasFees, TransactionHash, TransactionStatus
+from apps.shared.value_objects.datetime import DomainDateTime
+from infrastructure.models.faucet_transaction import FaucetTransactionModel
+from infrastructure.repositories.django_faucet_repository import DjangoFaucetTransactionsRepository
+
+WALLET = "0x742d35Cc6634C0532925a3b844Bc454e4438f44e"
+
+
+def tx_hash(n: int) -> str:
+    return f"0x{n:064x}"
+
+
+def minutes_ago(minutes: float) -> DomainDateTime:
+    return DomainDateTime(DomainDateTime.now().dt - timedelta(minutes=minutes))
+
+
+class TransactionReplacementTest(TestCase):
+    def setUp(self):
+        self.repository = DjangoFaucetTransactionsRepository()
+        # 1 and 2 are paid by one batch, 3 was sent recently, 4 has no nonce (sent before nonces were stored)
+        FaucetTransactionModel.objects.bulk_create(
+            FaucetTransactionModel(
+                tx_hash=tx_hash(hash_n),
+                status=TransactionStatus.PENDING.value,
+                ip_address="10.0.0.1",
+                wallet=WALLET,
+                amount=1,
+                nonce=nonce,
+                max_fee_per_gas=100,
+                max_priority_fee_per_gas=10,
+                broadcast_at=broadcast_at.dt,
+            )
+            for hash_n, nonce, broadcast_at in [
+                (1, 7, minutes_ago(10)),
+                (1, 7, minutes_ago(10)),
+                (3, 8, minutes_ago(0)),
+                (4, None, minutes_ago(10)),
+            ]
+        )
+
+    def test_stuck_batch_returned_together(self):
+        stuck = self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=1)
+
+        self.assertEqual([tx.tx_hash for tx in stuck], [TransactionHash(tx_hash(1))] * 2)
+        self.assertEqual((stuck[0].nonce, stuck[0].fees), (7, GasFees(100, 10)))
+
+    def test_replacement_saved(self):
+        stuck = self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=10)
+        for tx in stuck:
+            tx.tx_hash = TransactionHash(tx_hash(101))
+            tx.fees = GasFees(113, 12)
+            tx.broadcast_at = DomainDateTime.now()
+        self.repository.save_replacement(stuck, TransactionHash(tx_hash(1)))
+        self.assertEqual(FaucetTransactionModel.objects.filter(replacements=1, max_fee_per_gas=113).count(), 2)
+
+        self.assertEqual(self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=10), [])
+        with CaptureQueriesContext(connection) as queries:
+            pending = [tx for tx in self.repository.iter_pending_transactions(chunk_size=10) if tx.replaced_hashes]
+        self.assertEqual(
+            [tx.hashes for tx in pending], [(TransactionHash(tx_hash(101)), TransactionHash(tx_hash(1)))] * 2
+        )
+        # the only chunk and the replaced hashes of its rows
+        self.assertEqual(len(queries.captured_queries), 2)
+
+    def test_found_by_replaced_hash(self):
+        [first, _] = self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=10)
+        self.repository.schedule_checks({first.id: (4, DomainDateTime.now())})
+        first.tx_hash = TransactionHash(tx_hash(101))
+        self.repository.save_replacement([first], TransactionHash(tx_hash(1)))
+
+        [found] = [
+            tx for tx in self.repository.get_pending_by_hashes({TransactionHash(tx_hash(1))}) if tx.id == first.id
+        ]
+        self.assertEqual(found.hashes, (TransactionHash(tx_hash(101)), TransactionHash(tx_hash(1))))
+        # the new hash is checked on the next sweep
+        self.assertEqual(found.attempts, 0)
+        self.assertIsNone(FaucetTransactionModel.objects.get(pk=first.pk.value).next_check_at)
+
+    def test_replacements_limited(self):
+        FaucetTransactionModel.objects.filter(tx_hash=tx_hash(1)).update(replacements=5)
+
+        self.assertEqual(self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=10), [])
+
+    def test_resolved_by_replaced_hash(self):
+        [first, _] = self.repository.get_stuck_transactions(minutes_ago(5), max_replacements=5, limit=10)
+        first.tx_hash = TransactionHash(tx_hash(101))
+        self.repository.save_replacement([first], TransactionHash(tx_hash(1)))
+
+        self.repository.update_statuses(
+            {first.id: TransactionStatus.SUCCESS}, mined_hashes={first.id: TransactionHash(tx_hash(1))}
+        )
+
+        row = FaucetTransactionModel.objects.get(pk=first.pk.value)
+        self.assertEqual((row.status, row.tx_hash), (TransactionStatus.SUCCESS.value, tx_hash(1)))
@@ -0,0 +1,88 @@
+import inspect
+import json
+import os
+from datetime import UTC, datetime
+from functools import wraps
+from typing import Callable, TypeVar
+
+from apps.shared.tracing import SpanExporter, Trace, span
+
+T = TypeVar("T")
+
+
+def traced_methods(prefix: str) -> Callable[[type[T]], type[T]]:
+    """
+    Class decorator, records a span named prefix.method for every public method called in a trace.
+
+    Generators are left alone, their consumer runs between the items, so they have no stage of their own.
+    """
+
+    def decorate(cls: type[T]) -> type[T]:
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method) or inspect.isgeneratorfunction(method):
+                continue
+            if inspect.iscoroutinefunction(method):
+                setattr(cls, name, _trace_coroutine(f"{prefix}.{name}", method))
+            else:
+                setattr(cls, name, _trace_function(f"{prefix}.{name}", method))
+        return cls
+
+    return decorate
+
+
+def _trace_function(name: str, method: Callable) -> Callable:
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with span(name):
+            return method(*args, **kwargs)
+
+    return wrapper
+
+
+def _trace_coroutine(name: str, method: Callable) -> Callable:
+    @wraps(method)
+    async def wrapper(*args, **kwargs):
+        with span(name):
+            return await method(*args, **kwargs)
+
+    return wrapper
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends every trace as one JSON line to a file, for local use and ad hoc analysis.
+
+    A line is written with one append-mode write, so gunicorn workers can share the file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(self.to_dict(trace), default=str) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode())
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def to_dict(trace: Trace) -> dict:
+        return {
+            "request_id": trace.request_id,
+            "name": trace.name,
+            "started_at": datetime.fromtimestamp(trace.started_at, UTC).isoformat(),
+            "duration_ms": round(trace.duration * 1000, 3),
+            "sampled": trace.sampled,
+            "spans": [
+                {
+                    "id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "name": span.name,
+                    "start_ms": round(span.start * 1000, 3),
+                    "duration_ms": round(span.duration * 1000, 3),
+                    **span.attributes,
+                }
+                for span in trace.spans
+            ],
+        }
@@ -0,0 +1,49 @@
+import json
+
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+
+from base.dto import BaseDTO
+from infrastructure.project.encoders import CustomJSONEncoder
+from infrastructure.project.exception_handlers import custom_exception_handler
+
+
+class AsyncAPIView(View):
+    """
+    Base view for async handlers, DRF APIView supports only sync handlers.
+
+    Takes the parts of APIView the faucet API needs: request data parsing, errors are converted
+    by the same exception handler and responses are rendered with the same encoder.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # like APIView, the API is used without sessions
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs) -> HttpResponse:  # type: ignore
+        try:
+            # handlers are async, so View.dispatch returns a coroutine
+            return await super().dispatch(request, *args, **kwargs)  # type: ignore
+        except Exception as exc:
+            response = custom_exception_handler(exc, {"view": self, "request": request})
+            if response is None:
+                raise
+            return JsonResponse(response.data, status=response.status_code, encoder=CustomJSONEncoder, safe=False)
+
+    @staticmethod
+    def get_data(request: HttpRequest) -> dict:
+        if request.content_type != "application/json":
+            return request.POST.dict()
+        try:
+            data: dict = json.loads(request.body or b"{}")
+        except ValueError as e:
+            raise ParseError(f"JSON parse error - {e}") from e
+        return data
+
+    @staticmethod
+    def render(data: BaseDTO, status_code: int = status.HTTP_200_OK) -> JsonResponse:
+        return JsonResponse(data, status=status_code, encoder=CustomJSONEncoder, safe=False)
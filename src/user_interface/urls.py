@@ -1,8 +1,12 @@
 from django.urls import path
 
-from user_interface.views import FundWalletView, StatsView
+from user_interface.views import AsyncFundWalletView, AsyncStatsView, FundRequestView, FundWalletView, StatsView
 
 urlpatterns = [
     path("faucet/fund", FundWalletView.as_view()),
+    path("faucet/fund/<str:request_id>", FundRequestView.as_view()),
     path("faucet/stats", StatsView.as_view()),
+    # async views, run natively under an ASGI server
+    path("async/faucet/fund", AsyncFundWalletView.as_view()),
+    path("async/faucet/stats", AsyncStatsView.as_view()),
 ]
@@ -1,3 +1,3 @@
-from .faucet import FundWalletView, StatsView
+from .faucet import AsyncFundWalletView, AsyncStatsView, FundRequestView, FundWalletView, StatsView
 
-__all__ = ["FundWalletView", "StatsView"]
+__all__ = ["FundWalletView", "FundRequestView", "StatsView", "AsyncFundWalletView", "AsyncStatsView"]
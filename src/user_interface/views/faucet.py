@@ -1,11 +1,13 @@
 from dataclasses import dataclass
 
+from django.conf import settings
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework_dataclasses.serializers import DataclassSerializer
 
-from apps.blockchain.application.dto import FaucetStatsDTO, FaucetTransactionDTO
+from apps.blockchain.application.dto import FaucetRequestDTO, FaucetStatsDTO, FaucetTransactionDTO
 from infrastructure.container import get_app_container
+from user_interface.async_view import AsyncAPIView
 from user_interface.utils import extend_schema
 
 from ..response import TypedResponse
@@ -18,23 +20,64 @@ class RequestParams:
     wallet_address: str
 
 
-class FundWalletView(APIView):
-    def _get_ip_address(self, request):
-        # TODO: Implement a better way to get the IP address
-        return request.META.get("REMOTE_ADDR")
+def get_ip_address(request):
+    # TODO: Implement a better way to get the IP address
+    return request.META.get("REMOTE_ADDR")
+
 
-    @extend_schema(request=RequestParams, responses={201: FaucetTransactionDTO})
-    def post(self, request) -> TypedResponse[FaucetTransactionDTO]:
+class FundWalletView(APIView):
+    @extend_schema(request=RequestParams, responses={201: FaucetTransactionDTO, 202: FaucetRequestDTO})
+    def post(self, request) -> TypedResponse[FaucetTransactionDTO] | TypedResponse[FaucetRequestDTO]:
         serializer: DataclassSerializer[RequestParams] = DataclassSerializer(data=request.data, dataclass=RequestParams)  # type: ignore
         serializer.is_valid(raise_exception=True)
 
-        transaction_dto = app_container.faucet_service().fund_wallet(
-            serializer.validated_data.wallet_address,
-            self._get_ip_address(request),
-        )
+        if settings.FAUCET_QUEUE_ENABLED:
+            # transaction is sent by the sender worker, client can check the request state later
+            request_dto = app_container.faucet_service().enqueue_funding(
+                serializer.validated_data.wallet_address,
+                get_ip_address(request),
+            )
+            return TypedResponse(request_dto, status=status.HTTP_202_ACCEPTED)
+
+        with app_container.tracer().trace("fund_wallet", request.request_id):
+            transaction_dto = app_container.faucet_service().fund_wallet(
+                serializer.validated_data.wallet_address,
+                get_ip_address(request),
+            )
         return TypedResponse(transaction_dto, status=status.HTTP_201_CREATED)
 
 
+class AsyncFundWalletView(AsyncAPIView):
+    """Async version of FundWalletView, the worker doesn't wait for the node with a blocked thread."""
+
+    async def post(self, request):
+        serializer: DataclassSerializer[RequestParams] = DataclassSerializer(
+            data=self.get_data(request), dataclass=RequestParams
+        )  # type: ignore
+        serializer.is_valid(raise_exception=True)
+
+        if settings.FAUCET_QUEUE_ENABLED:
+            request_dto = await app_container.async_faucet_service().aenqueue_funding(
+                serializer.validated_data.wallet_address,
+                get_ip_address(request),
+            )
+            return self.render(request_dto, status.HTTP_202_ACCEPTED)
+
+        with app_container.tracer().trace("afund_wallet", request.request_id):
+            transaction_dto = await app_container.async_faucet_service().afund_wallet(
+                serializer.validated_data.wallet_address,
+                get_ip_address(request),
+            )
+        return self.render(transaction_dto, status.HTTP_201_CREATED)
+
+
+class FundRequestView(APIView):
+    @extend_schema(responses={200: FaucetRequestDTO})
+    def get(self, request, request_id: str) -> TypedResponse[FaucetRequestDTO]:
+        request_dto = app_container.faucet_service().get_request(request_id)
+        return TypedResponse(request_dto, status=status.HTTP_200_OK)
+
+
 class StatsView(APIView):
     @extend_schema(responses={200: FaucetStatsDTO})
     def get(self, request) -> TypedResponse[FaucetStatsDTO]:
@@ -42,3 +85,9 @@ class StatsView(APIView):
         stats = app_container.faucet_service().get_stats()
 
         return TypedResponse(stats, status=status.HTTP_200_OK)
+
+
+class AsyncStatsView(AsyncAPIView):
+    async def get(self, request):
+        stats = await app_container.async_faucet_service().aget_stats()
+        return self.render(stats)